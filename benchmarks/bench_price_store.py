@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stocksTracker import price_store, tracker_scripts
+
+# Compares historical load latency of the legacy CSV path against the
+# packed bar store. Usage: python benchmarks/bench_price_store.py [bars ...]
+
+
+def write_synthetic_csv(symbol, n_bars):
+    dates = pd.bdate_range(end="2024-12-13", periods=n_bars)
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, n_bars))
+    df = pd.DataFrame({
+        "open": close + 0.5,
+        "high": close + 1.0,
+        "low": close - 1.0,
+        "close": close,
+        "volume": np.full(n_bars, 1_000_000),
+    }, index=pd.Index(dates.strftime("%Y-%m-%d"), name="date"))
+    # Alpha Vantage order: newest first.
+    df.iloc[::-1].to_csv(f"historical/{symbol}_historical.csv")
+
+
+def bench(n_bars, repeat=20):
+    symbol = f"SYN{n_bars}"
+    write_synthetic_csv(symbol, n_bars)
+
+    # The uncached reader: through get_stock_dataframe every run after the
+    # first would be a FRAME_CACHE hit and time neither path.
+    csv_df = timeit.timeit(lambda: tracker_scripts.read_stock_dataframe(symbol), number=repeat) / repeat
+    csv_last = timeit.timeit(lambda: tracker_scripts.fetch_historical_data_from_file(symbol), number=repeat) / repeat
+
+    price_store.write_bars(symbol, price_store.read_csv_bars(f"historical/{symbol}_historical.csv"))
+
+    store_df = timeit.timeit(lambda: tracker_scripts.read_stock_dataframe(symbol), number=repeat) / repeat
+    store_last = timeit.timeit(lambda: tracker_scripts.fetch_historical_data_from_file(symbol), number=repeat) / repeat
+    store_view = timeit.timeit(lambda: price_store.load_bars(symbol)["close"], number=repeat) / repeat
+
+    print(f"{n_bars:>8} bars | dataframe csv {csv_df * 1e3:8.2f} ms  store {store_df * 1e3:8.2f} ms"
+          f" | baseline csv {csv_last * 1e3:8.2f} ms  store {store_last * 1e3:8.3f} ms"
+          f" | close view {store_view * 1e6:7.1f} us")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000, 100000]
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        os.makedirs("historical")
+        for n_bars in sizes:
+            bench(n_bars)
@@ -0,0 +1,56 @@
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stocksTracker.tracker_scripts import calculate_moving_averages, generate_trade_signals
+
+# Times the vectorized crossover engine against the original per-row loop
+# (with the SELL label fixed), checking they agree. The equivalence itself is
+# tested in stocksTracker/tests/test_signals.py.
+# Usage: python benchmarks/bench_signals.py [bars ...]
+
+
+def loop_signals(df, symbol):
+    signals = []
+    for i in range(1, len(df)):
+        if df["MA_5"].iloc[i] > df["MA_20"].iloc[i] and df["MA_5"].iloc[i-1] <= df["MA_20"].iloc[i-1]:
+            signals.append({"stock": symbol, "date": df.index[i], "signal": "BUY"})
+        elif df["MA_5"].iloc[i] < df["MA_20"].iloc[i] and df["MA_5"].iloc[i-1] >= df["MA_20"].iloc[i-1]:
+            signals.append({"stock": symbol, "date": df.index[i], "signal": "SELL"})
+    return signals
+
+
+def synthetic_frame(n_bars, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n_bars))
+    # Repeated prices produce exact MA ties, which exercise the <= / >= edges.
+    close[rng.random(n_bars) < 0.05] = 100.0
+    dates = pd.bdate_range(end="2024-12-13", periods=n_bars, name="date")
+    return pd.DataFrame({"close": close}, index=dates)
+
+
+def bench(n_bars):
+    df = synthetic_frame(n_bars)
+    calculate_moving_averages(df)
+
+    expected = loop_signals(df, "SYN")
+    actual = generate_trade_signals(df, "SYN").to_dict("records")
+    if actual != expected:
+        raise AssertionError(f"signal mismatch at {n_bars} bars")
+
+    loop_time = timeit.timeit(lambda: loop_signals(df, "SYN"), number=1)
+    repeat = 50
+    vector_time = timeit.timeit(lambda: generate_trade_signals(df, "SYN"), number=repeat) / repeat
+    print(f"{n_bars:>8} bars | {len(expected):>5} signals | loop {loop_time * 1e3:9.2f} ms"
+          f" | vectorized {vector_time * 1e3:7.3f} ms | x{loop_time / vector_time:,.0f}")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    for n_bars in sizes:
+        bench(n_bars)
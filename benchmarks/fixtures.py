@@ -0,0 +1,147 @@
+import json
+import os
+import sys
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "provider")
+
+# Provider responses on disk, one file per request: {function}/{symbol}.json.
+# FixtureProvider replays them over local HTTP so the real fetch path
+# (session pool, scheduler, retries, parsing) runs without the network.
+# Symbols with no recording get another recording of the same function,
+# renamed. Bulk quote calls are answered from the GLOBAL_QUOTE recordings.
+#
+# To record real responses (needs ALPHA_VANTAGE_API_KEY and uses quota):
+#     python benchmarks/fixtures.py record AAPL MSFT GOOGL
+
+
+def fixture_path(function, symbol, directory=FIXTURE_DIR):
+    return os.path.join(directory, function, f"{symbol}.json")
+
+
+def load_fixtures(directory=FIXTURE_DIR):
+    fixtures = {}
+    if not os.path.isdir(directory):
+        return fixtures
+    for function in sorted(os.listdir(directory)):
+        for name in sorted(os.listdir(os.path.join(directory, function))):
+            if name.endswith(".json"):
+                with open(os.path.join(directory, function, name), "r") as file:
+                    fixtures.setdefault(function, {})[name[:-5]] = json.load(file)
+    return fixtures
+
+
+def renamed(payload, symbol):
+    payload = json.loads(json.dumps(payload))
+    if "Global Quote" in payload:
+        payload["Global Quote"]["01. symbol"] = symbol
+    if "Meta Data" in payload:
+        payload["Meta Data"]["2. Symbol"] = symbol
+    return payload
+
+
+def bulk_quotes(payloads):
+    # REALTIME_BULK_QUOTES layout, built from GLOBAL_QUOTE recordings.
+    data = []
+    for payload in payloads:
+        quote = payload.get("Global Quote")
+        if quote:
+            data.append({"symbol": quote["01. symbol"], "close": quote["05. price"], "volume": quote["06. volume"]})
+    return {"endpoint": "Realtime Bulk Quotes", "data": data}
+
+
+class FixtureProvider:
+    def __init__(self, directory=FIXTURE_DIR, port=0):
+        self.fixtures = load_fixtures(directory)
+        self.requests = 0
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; without this,
+            # delayed ACKs add ~40 ms to every keep-alive request.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                provider.requests += 1
+                if query.get("function") == "REALTIME_BULK_QUOTES":
+                    payload = bulk_quotes([provider.lookup("GLOBAL_QUOTE", symbol)
+                                           for symbol in query.get("symbol", "").split(",") if symbol])
+                else:
+                    payload = provider.lookup(query.get("function"), query.get("symbol", ""))
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+
+    def lookup(self, function, symbol):
+        recorded = self.fixtures.get(function, {})
+        if symbol in recorded:
+            return recorded[symbol]
+        if recorded:
+            return renamed(recorded[sorted(recorded)[zlib.crc32(symbol.encode()) % len(recorded)]], symbol)
+        return {"Error Message": f"No fixture for {function}."}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def write_fixture(function, symbol, payload, directory=FIXTURE_DIR):
+    path = fixture_path(function, symbol, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(payload, file, indent=1, sort_keys=True)
+    return path
+
+
+def record(symbols, directory=FIXTURE_DIR):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from stocksTracker.tracker_scripts import FETCH_ENGINE
+
+    for function, extra in (("GLOBAL_QUOTE", {}), ("TIME_SERIES_DAILY", {"outputsize": "compact"})):
+        payloads, errors = FETCH_ENGINE.fetch_batch(function, symbols, **extra)
+        for symbol, payload in payloads.items():
+            print(f"Recorded {write_fixture(function, symbol, payload, directory)}")
+        for symbol, e in errors.items():
+            print(f"Error recording {function} for {symbol}: {e}")
+
+
+def generate(symbols, directory=FIXTURE_DIR):
+    # Provider-format fixtures from the synthetic generator, for checkouts
+    # without an API key.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from synthetic import daily_series_payload, global_quote_payload, synthetic_bars
+
+    for seed, symbol in enumerate(symbols):
+        bars = synthetic_bars(100, seed)
+        write_fixture("TIME_SERIES_DAILY", symbol, daily_series_payload(symbol, bars), directory)
+        write_fixture("GLOBAL_QUOTE", symbol, global_quote_payload(symbol, float(bars["close"][-1])), directory)
+        print(f"Generated fixtures for {symbol}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("record", "generate"):
+        print("Usage: python benchmarks/fixtures.py record|generate SYMBOL [SYMBOL ...]")
+        sys.exit(2)
+    (record if sys.argv[1] == "record" else generate)(sys.argv[2:])
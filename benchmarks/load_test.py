@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import shlex
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import requests
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Serves the same view under a threaded WSGI worker and an ASGI worker, both
+# talking to a local stub provider that answers after a fixed delay, and
+# compares throughput. Quotes are never cached, so every request waits on
+# the provider.
+# Usage: python benchmarks/load_test.py [--clients 50] [--duration 10] [--latency 0.2]
+# Needs gunicorn and uvicorn (or pass --wsgi-cmd / --asgi-cmd).
+
+SERVERS = {
+    "wsgi": "gunicorn stocksTracker.wsgi:application --bind 127.0.0.1:{port} --workers 1 --threads {threads}",
+    "asgi": "uvicorn stocksTracker.asgi:application --host 127.0.0.1 --port {port} --workers 1 --log-level warning",
+}
+
+SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA"]
+
+SETTINGS = """from stocksTracker.settings import *
+DEBUG = False
+ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
+DATABASES["default"]["NAME"] = {db!r}
+TEMPLATES[0]["DIRS"] = [{templates!r}]
+"""
+
+
+def stub_provider(port, latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            time.sleep(latency)
+            if query.get("function") == "GLOBAL_QUOTE":
+                body = {"Global Quote": {"01. symbol": query["symbol"], "05. price": "100.0", "06. volume": "1000"}}
+            else:
+                body = {"Time Series (Daily)": {
+                    f"2024-12-{day:02d}": {"1. open": "90", "2. high": "110", "3. low": "80",
+                                           "4. close": str(90 + day), "5. volume": "1000"}
+                    for day in range(1, 29)
+                }}
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def start_server(command, port, threads, workdir, env):
+    argv = shlex.split(command.format(port=port, threads=threads))
+    process = subprocess.Popen(argv, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if not wait_for_port(port):
+        process.kill()
+        raise RuntimeError(f"Server did not start: {command}\n{process.stderr.read().decode()}")
+    return process
+
+
+def client_session(base_url):
+    # Each client creates its own portfolio, so requests carry a session.
+    session = requests.Session()
+    session.get(f"{base_url}/portfolio/create/")
+    session.post(f"{base_url}/portfolio/create/", data={
+        "csrfmiddlewaretoken": session.cookies.get("csrftoken"),
+        "name": "Load Test",
+        "email": "load@example.com",
+        "phone": "5550100",
+        "stocks": ", ".join(f"{symbol}:10" for symbol in SYMBOLS),
+    }, headers={"Referer": f"{base_url}/portfolio/create/"})
+    return session
+
+
+def run_load(base_url, path, clients, duration):
+    sessions = [client_session(base_url) for _ in range(clients)]
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+    start = threading.Barrier(clients + 1)
+    stop_at = [0.0]
+
+    def worker(i):
+        session = sessions[i]
+        start.wait()
+        while time.monotonic() < stop_at[0]:
+            began = time.perf_counter()
+            try:
+                response = session.get(f"{base_url}{path}", timeout=60)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            if ok:
+                latencies[i].append(time.perf_counter() - began)
+            else:
+                errors[i] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    stop_at[0] = time.monotonic() + duration
+    began = time.monotonic()
+    start.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - began
+
+    done = np.concatenate([np.asarray(l) for l in latencies]) if any(latencies) else np.empty(0)
+    return {
+        "requests": int(len(done)),
+        "errors": int(sum(errors)),
+        "req_per_s": len(done) / elapsed,
+        "p50_ms": float(np.percentile(done, 50) * 1000) if len(done) else None,
+        "p95_ms": float(np.percentile(done, 95) * 1000) if len(done) else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare WSGI and ASGI throughput against a stub provider.")
+    parser.add_argument("--path", default="/portfolio/value/")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub provider delay in seconds.")
+    parser.add_argument("--threads", type=int, default=4, help="Threads for the WSGI worker.")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--stub-port", type=int, default=8766)
+    parser.add_argument("--wsgi-cmd", default=SERVERS["wsgi"])
+    parser.add_argument("--asgi-cmd", default=SERVERS["asgi"])
+    parser.add_argument("--only", choices=sorted(SERVERS))
+    parser.add_argument("--json", help="Write the results to this file.")
+    args = parser.parse_args()
+
+    stub = stub_provider(args.stub_port, args.latency)
+    # Quotes, bars and the database all live in a scratch directory.
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    with open(os.path.join(workdir, "loadtest_settings.py"), "w") as file:
+        file.write(SETTINGS.format(
+            db=os.path.join(workdir, "db.sqlite3"),
+            templates=os.path.join(REPO_DIR, "templates"),
+        ))
+
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join([workdir, REPO_DIR, os.environ.get("PYTHONPATH", "")]),
+        DJANGO_SETTINGS_MODULE="loadtest_settings",
+        ALPHA_VANTAGE_BASE_URL=f"http://127.0.0.1:{args.stub_port}/",
+        ALPHA_VANTAGE_PER_MINUTE="1000000",
+        ALPHA_VANTAGE_PER_DAY="100000000",
+        ALPHA_VANTAGE_BUDGET_FILE=os.path.join(workdir, "provider_budget.json"),
+        MARKET_DATA_FETCH_ON_READ="1",
+        QUOTE_CACHE_TTL="0",
+    )
+    subprocess.run([sys.executable, os.path.join(REPO_DIR, "manage.py"), "migrate", "-v", "0"],
+                   cwd=workdir, env=env, check=True)
+
+    commands = {"wsgi": args.wsgi_cmd, "asgi": args.asgi_cmd}
+    results = {}
+    for mode in ([args.only] if args.only else sorted(commands, reverse=True)):
+        server = start_server(commands[mode], args.port, args.threads, workdir, env)
+        try:
+            results[mode] = run_load(f"http://127.0.0.1:{args.port}", args.path, args.clients, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+
+    stub.shutdown()
+    print(f"{args.path}: {args.clients} clients, {args.duration:g}s, provider latency {args.latency * 1000:.0f} ms")
+    for mode, result in results.items():
+        print(f"  {mode}: {result['req_per_s']:8.1f} req/s  p50 {result['p50_ms'] or 0:7.1f} ms  "
+              f"p95 {result['p95_ms'] or 0:7.1f} ms  errors {result['errors']}")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path[:0] = [REPO_DIR, BENCH_DIR]
+
+# Times the data, analytics, simulation and view hot paths over a grid of
+# symbols x bars on synthetic data, with the provider replaced by recorded
+# fixtures (see fixtures.py). Nothing touches the network or the project's
+# own data files: each grid point runs in a fresh scratch directory.
+#
+#     python benchmarks/run_benchmarks.py --json before.json
+#     python benchmarks/run_benchmarks.py --json after.json --compare before.json
+#     python benchmarks/run_benchmarks.py --diff before.json after.json
+#
+# A case regresses when its median is more than --threshold slower than the
+# baseline's; --compare and --diff exit with status 1 if any case does.
+
+SETTINGS = """from stocksTracker.settings import *
+DEBUG = False
+ALLOWED_HOSTS = ["testserver"]
+DATABASES["default"]["NAME"] = {db!r}
+TEMPLATES[0]["DIRS"] = [{templates!r}]
+"""
+
+
+def setup_environment(workdir, provider_url):
+    with open(os.path.join(workdir, "bench_settings.py"), "w") as file:
+        file.write(SETTINGS.format(
+            db=os.path.join(workdir, "db.sqlite3"),
+            templates=os.path.join(REPO_DIR, "templates"),
+        ))
+    sys.path.insert(0, workdir)
+    os.environ.update(
+        DJANGO_SETTINGS_MODULE="bench_settings",
+        ALPHA_VANTAGE_BASE_URL=provider_url,
+        ALPHA_VANTAGE_PER_MINUTE="100000000",
+        ALPHA_VANTAGE_PER_DAY="100000000",
+        ALPHA_VANTAGE_BUDGET_FILE=os.path.join(workdir, "provider_budget.json"),
+        MARKET_DATA_FETCH_ON_READ="0",
+        FETCH_RETRIES="0",
+        JOBS_RUN_INLINE="1",
+    )
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command("migrate", verbosity=0)
+    logging.disable(logging.WARNING)
+
+
+def measure(fn, min_time=0.2, min_runs=3, max_runs=50):
+    # One untimed warm-up call, then repeats until min_time has passed.
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+        began = time.perf_counter()
+        while len(times) < max_runs and (len(times) < min_runs or time.perf_counter() - began < min_time):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "mean_s": statistics.fmean(times),
+        "runs": len(times),
+    }
+
+
+def prepare(n_symbols, n_bars, directory):
+    # Fresh stores for one grid point: bars, one quote per symbol, and a
+    # portfolio holding every symbol.
+    from stocksTracker import tracker_scripts
+    from stocksTracker.bar_aggregator import BarAggregator
+    from stocksTracker.models import Holding, Portfolio
+    from stocksTracker.quote_cache import QuoteCache
+    from stocksTracker.tick_store import TickStore
+    from synthetic import symbol_universe, write_universe
+
+    os.makedirs(directory)
+    os.chdir(directory)
+    tracker_scripts.TICK_STORE = TickStore()
+    tracker_scripts.QUOTE_CACHE = QuoteCache(ttl=3600)
+    tracker_scripts.BAR_AGGREGATOR = BarAggregator(flush_at=10**9)
+    tracker_scripts.STREAMING_INDICATORS.clear()
+
+    symbols = symbol_universe(n_symbols)
+    last_closes = write_universe(symbols, n_bars)
+    tracker_scripts.TICK_STORE.append_many(
+        (symbol, close * 1.01, 1_000_000, None) for symbol, close in last_closes.items()
+    )
+
+    portfolio = Portfolio.objects.create(name="Benchmark", email="bench@example.com", phone="5550100")
+    Holding.objects.bulk_create([Holding(portfolio=portfolio, symbol=symbol, shares=10) for symbol in symbols])
+    return symbols, portfolio
+
+
+def cases(symbols, portfolio):
+    # {name: zero-argument callable}. Inputs a case only reads are built
+    # here so the timings cover just the call itself.
+    from django.test import Client
+
+    from stocksTracker import tracker_scripts as ts
+    from stocksTracker.models import load_portfolio
+    from stocksTracker.providers import AlphaVantageProvider
+    from stocksTracker.quote_cache import QuoteCache
+
+    portfolio_dict = load_portfolio(portfolio.pk)
+    frames = {symbol: ts.get_stock_dataframe(symbol) for symbol in symbols}
+    # calculate_moving_averages adds the MA columns in place and returns None.
+    ma_frames = {}
+    for symbol, frame in frames.items():
+        df = frame.copy()
+        ts.calculate_moving_averages(df)
+        ma_frames[symbol] = df
+    dates, panel_symbols, closes = ts.load_price_panel(symbols)
+    signals = ts.analyze_panel(dates, panel_symbols, closes)
+
+    def cold_quotes():
+        ts.QUOTE_CACHE = QuoteCache(ttl=3600)
+        for symbol in symbols:
+            ts.fetch_realtime_data_from_file(symbol)
+
+    def warm_quotes():
+        for symbol in symbols:
+            ts.fetch_realtime_data_from_file(symbol)
+
+    bulk_provider = AlphaVantageProvider(ts.FETCH_ENGINE, bulk=True)
+
+    def bulk_quotes():
+        default, ts.PROVIDER = ts.PROVIDER, bulk_provider
+        try:
+            ts.fetch_real_time_data_all(symbols)
+        finally:
+            ts.PROVIDER = default
+
+    client = Client()
+    session = client.session
+    session["portfolio_id"] = portfolio.pk
+    session.save()
+    # Runs the simulation (inline, JOBS_RUN_INLINE) so /run-simulation/
+    # renders its results.
+    client.post("/run-simulation/")
+
+    def view(path):
+        def get():
+            response = client.get(path)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+        return get
+
+    return {
+        "get_stock_dataframe": lambda: [ts.get_stock_dataframe(symbol) for symbol in symbols],
+        "fetch_realtime_data_from_file/cold": cold_quotes,
+        "fetch_realtime_data_from_file/warm": warm_quotes,
+        "calculate_moving_averages": lambda: [ts.calculate_moving_averages(df.copy()) for df in frames.values()],
+        "generate_trade_signals": lambda: [ts.generate_trade_signals(df, symbol) for symbol, df in ma_frames.items()],
+        "trade_analyzer": lambda: ts.trade_analyzer(symbols),
+        "simulate_trades": lambda: ts.simulate_trades(signals, dates, panel_symbols, closes),
+        "run_simulator": lambda: ts.run_simulator(portfolio_dict),
+        "fetch_real_time_data_all (fixtures)": lambda: ts.fetch_real_time_data_all(symbols),
+        "fetch_real_time_data_all bulk (fixtures)": bulk_quotes,
+        "sync_historical_data (fixtures)": lambda: ts.sync_historical_data(symbols),
+        "view /portfolio/value/": view("/portfolio/value/"),
+        "view /portfolio/performance/": view("/portfolio/performance/"),
+        "view /portfolio/summary/": view("/portfolio/summary/"),
+        "view /stocks/signals/": view("/stocks/signals/"),
+        "view /run-simulation/": view("/run-simulation/"),
+        "api /api/portfolios/valuation/": view(f"/api/portfolios/valuation/?ids={portfolio.pk}"),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    import django
+    import numpy
+    import pandas
+
+    return {
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "django": django.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run(symbol_counts, bar_counts, only=None, min_time=0.2):
+    from fixtures import FixtureProvider
+
+    provider = FixtureProvider().start()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        setup_environment(workdir, provider.url)
+        try:
+            for n_symbols in symbol_counts:
+                for n_bars in bar_counts:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        symbols, portfolio = prepare(n_symbols, n_bars, os.path.join(workdir, f"{n_symbols}x{n_bars}"))
+                        grid_cases = cases(symbols, portfolio)
+                    for name, fn in grid_cases.items():
+                        if only and not any(pattern in name for pattern in only):
+                            continue
+                        result = {"case": name, "symbols": n_symbols, "bars": n_bars, **measure(fn, min_time)}
+                        results.append(result)
+                        print(f"{name:<42} {n_symbols:>5} symbols {n_bars:>7} bars  "
+                              f"median {result['median_s'] * 1e3:10.3f} ms  min {result['min_s'] * 1e3:10.3f} ms  "
+                              f"({result['runs']} runs)", flush=True)
+        finally:
+            os.chdir(REPO_DIR)
+            provider.stop()
+    return {"meta": metadata(), "results": results}
+
+
+def compare(baseline, current, threshold):
+    # Prints current/baseline median ratios; returns the regressed cases.
+    key = lambda result: (result["case"], result["symbols"], result["bars"])
+    before = {key(result): result for result in baseline["results"]}
+    regressions = []
+    print(f"\nComparing against {baseline['meta'].get('commit')} ({baseline['meta'].get('created')}), "
+          f"threshold {threshold:.0%}")
+    for result in current["results"]:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        ratio = result["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        status = "REGRESSION" if ratio > 1 + threshold else ("faster" if ratio < 1 - threshold else "")
+        if status == "REGRESSION":
+            regressions.append(key(result))
+        print(f"{result['case']:<42} {result['symbols']:>5} symbols {result['bars']:>7} bars  "
+              f"{old['median_s'] * 1e3:10.3f} -> {result['median_s'] * 1e3:10.3f} ms  x{ratio:6.2f}  {status}")
+    print(f"{len(regressions)} regression(s)")
+    return regressions
+
+
+def parse_counts(value):
+    return [int(count) for count in value.split(",") if count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tracker's hot paths.")
+    parser.add_argument("--symbols", type=parse_counts, default=[3, 15, 50], help="Comma-separated symbol counts.")
+    parser.add_argument("--bars", type=parse_counts, default=[250, 2500], help="Comma-separated bar counts.")
+    parser.add_argument("--only", action="append", help="Run only cases whose name contains this (repeatable).")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds to spend timing each case.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare this run against a saved run.")
+    parser.add_argument("--diff", nargs=2, metavar=("BASELINE", "CURRENT"), help="Compare two saved runs.")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    if args.diff:
+        with open(args.diff[0]) as old, open(args.diff[1]) as new:
+            regressions = compare(json.load(old), json.load(new), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    current = run(args.symbols, args.bars, args.only, args.min_time)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(current, file, indent=2)
+        print(f"Results written to {args.json}")
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(json.load(file), current, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from stocksTracker import price_store
+from stocksTracker.tracker_scripts import STOCK_SYMBOLS
+
+# Deterministic market data for benchmarks: the same seed always gives the
+# same prices, so runs on different commits measure the same work.
+
+
+def symbol_universe(n_symbols):
+    # The tracker's own symbols first (views hard-code a few of them), then
+    # synthetic ones.
+    symbols = list(STOCK_SYMBOLS[:n_symbols])
+    symbols += [f"SYN{i:04d}" for i in range(n_symbols - len(symbols))]
+    return symbols
+
+
+def synthetic_bars(n_bars, seed=0, end="2024-12-13"):
+    # Random-walk daily OHLCV bars on business days ending at end.
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n_bars))
+    close = np.maximum(close, 1.0)
+    # Repeated prices produce exact MA ties, which exercise the <= / >= edges.
+    close[rng.random(n_bars) < 0.05] = 100.0
+    spread = np.abs(rng.normal(0, 0.5, n_bars))
+
+    bars = np.empty(n_bars, dtype=price_store.BAR_DTYPE)
+    bars["date"] = pd.bdate_range(end=end, periods=n_bars).values.astype("datetime64[ns]").view("i8")
+    bars["open"] = close + rng.normal(0, 0.25, n_bars)
+    bars["high"] = np.maximum(bars["open"], close) + spread
+    bars["low"] = np.minimum(bars["open"], close) - spread
+    bars["close"] = close
+    bars["volume"] = rng.integers(100_000, 5_000_000, n_bars)
+    return bars
+
+
+def synthetic_frame(n_bars, seed=0):
+    return price_store.bars_to_dataframe(synthetic_bars(n_bars, seed))
+
+
+def write_universe(symbols, n_bars, directory=price_store.STORE_DIR):
+    # Stores n_bars daily bars per symbol and returns {symbol: last close}.
+    last_closes = {}
+    for seed, symbol in enumerate(symbols):
+        bars = synthetic_bars(n_bars, seed)
+        price_store.write_bars(symbol, bars, directory)
+        last_closes[symbol] = float(bars["close"][-1])
+    return last_closes
+
+
+def global_quote_payload(symbol, price, volume=1_000_000):
+    return {
+        "Global Quote": {
+            "01. symbol": symbol,
+            "05. price": f"{price:.4f}",
+            "06. volume": str(volume),
+        }
+    }
+
+
+def daily_series_payload(symbol, bars):
+    # TIME_SERIES_DAILY layout: newest date first, every value a string.
+    series = {}
+    for bar in bars[::-1]:
+        day = pd.Timestamp(int(bar["date"])).strftime("%Y-%m-%d")
+        series[day] = {
+            "1. open": f"{bar['open']:.4f}",
+            "2. high": f"{bar['high']:.4f}",
+            "3. low": f"{bar['low']:.4f}",
+            "4. close": f"{bar['close']:.4f}",
+            "5. volume": str(int(bar["volume"])),
+        }
+    return {
+        "Meta Data": {"2. Symbol": symbol, "4. Output Size": "Compact"},
+        "Time Series (Daily)": series,
+    }
@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+
+
+class StockstrackerConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'stocksTracker'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import tracker_scripts
+        from .frame_cache import enable_copy_on_write
+
+        enable_copy_on_write()
+
+        tracker_scripts.FETCH_ON_READ = getattr(settings, "MARKET_DATA_FETCH_ON_READ", tracker_scripts.FETCH_ON_READ)
@@ -0,0 +1,71 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from asgiref.sync import sync_to_async
+
+from .models import load_portfolio
+from .tracker_scripts import (
+    PriceContext, fetch_historical_data_from_file, fetch_realtime_data_from_file, live_signals, trade_analyzer,
+)
+
+# Quote and bar loads block on the provider or the disk, not the CPU, so they
+# get a pool sized for waiting rather than the loop's small default one.
+LOAD_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("LOAD_WORKERS", 32)),
+    thread_name_prefix="load",
+)
+
+# Indicator work is numpy over memory-mapped bars, which releases the GIL for
+# the heavy parts, so a small thread pool keeps it off the event loop without
+# pickling frames across processes.
+ANALYSIS_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("ANALYSIS_WORKERS", os.cpu_count() or 1)),
+    thread_name_prefix="analysis",
+)
+
+
+async def acurrent_portfolio(request):
+    portfolio_id = await request.session.aget("portfolio_id")
+    if portfolio_id is None:
+        return {}
+    return await sync_to_async(load_portfolio)(portfolio_id) or {}
+
+
+async def _load_prices(symbols, loader):
+    # One blocking load per symbol, all in flight at once. None becomes NaN.
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*(loop.run_in_executor(LOAD_EXECUTOR, loader, symbol) for symbol in symbols))
+    return np.array([np.nan if price is None else price for price, _ in results], dtype=float)
+
+
+async def afetch_latest_prices(symbols):
+    return await _load_prices(symbols, fetch_realtime_data_from_file)
+
+
+async def afetch_baseline_prices(symbols):
+    return await _load_prices(symbols, fetch_historical_data_from_file)
+
+
+async def afetch_prices(symbols):
+    # (latest, baseline), both loaded concurrently.
+    return await asyncio.gather(afetch_latest_prices(symbols), afetch_baseline_prices(symbols))
+
+
+async def aprice_context(symbols):
+    # A PriceContext with every symbol's prices loaded up front, concurrently.
+    symbols = list(dict.fromkeys(symbols))
+    latest_prices, baseline_prices = await afetch_prices(symbols)
+    return PriceContext.from_prices(symbols, latest_prices, baseline_prices)
+
+
+async def atrade_analyzer(stocks_list, short_window=5, long_window=20):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ANALYSIS_EXECUTOR, trade_analyzer, stocks_list, short_window, long_window)
+
+
+async def alive_signals(symbols):
+    # One small state file per symbol; read off the event loop.
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(LOAD_EXECUTOR, live_signals, symbols)
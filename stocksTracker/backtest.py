@@ -0,0 +1,178 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .indicators import forward_fill, pack_panel, rolling_means_panel
+from .simulator import execute_events
+
+RESULT_COLUMNS = [
+    "short_window",
+    "long_window",
+    "initial_capital",
+    "position_size",
+    "final_value",
+    "return_pct",
+    "max_drawdown",
+    "trade_count",
+]
+
+
+def crossover_events(closes, short_window, long_window, packed=None):
+    # Chronological (row, column, direction) arrays for every crossover in
+    # a dates x symbols close panel.
+    packed, rows = pack_panel(closes) if packed is None else packed
+    means = rolling_means_panel(packed, (short_window, long_window))
+    short_ma, long_ma = means[short_window], means[long_window]
+
+    up = (short_ma[1:] > long_ma[1:]) & (short_ma[:-1] <= long_ma[:-1])
+    down = (short_ma[1:] < long_ma[1:]) & (short_ma[:-1] >= long_ma[:-1])
+    hits, cols = np.nonzero(up | down)
+    directions = np.where(up[hits, cols], 1, -1)
+    event_rows = rows[hits + 1, cols]
+
+    order = np.lexsort((cols, event_rows))
+    return event_rows[order], cols[order], directions[order]
+
+
+def backtest(closes, short_window, long_window, initial_capital=10000, position_size=1.0,
+             packed=None, prices=None):
+    # One MA-crossover strategy over the whole panel with shared cash. A BUY
+    # spends position_size of the available cash on the symbol, a SELL
+    # closes the position.
+    closes = np.asarray(closes, dtype=float)
+    prices = forward_fill(closes) if prices is None else prices
+    n_rows, n_symbols = closes.shape
+
+    rows, cols, directions = crossover_events(closes, short_window, long_window, packed)
+    result = execute_events(closes, rows, cols, directions, initial_capital,
+                            position_size=position_size, prices=prices)
+
+    cash_delta = np.zeros(n_rows)
+    share_delta = np.zeros((n_rows, n_symbols))
+    np.add.at(cash_delta, result["fill_rows"], -result["fill_shares"] * result["fill_prices"])
+    np.add.at(share_delta, (result["fill_rows"], result["fill_cols"]), result["fill_shares"])
+    trade_count = len(result["fill_rows"])
+
+    held = np.cumsum(share_delta, axis=0)
+    holdings_value = np.where(held != 0, held * prices, 0.0).sum(axis=1)
+    equity = initial_capital + np.cumsum(cash_delta) + holdings_value
+
+    if n_rows:
+        peak = np.maximum.accumulate(equity)
+        max_drawdown = float(np.max(1 - equity / peak))
+        final_value = float(equity[-1])
+    else:
+        max_drawdown = 0.0
+        final_value = float(initial_capital)
+
+    return {
+        "short_window": short_window,
+        "long_window": long_window,
+        "initial_capital": initial_capital,
+        "position_size": position_size,
+        "final_value": final_value,
+        "return_pct": (final_value - initial_capital) / initial_capital * 100,
+        "max_drawdown": max_drawdown,
+        "trade_count": trade_count,
+    }
+
+
+######################################## SWEEP ########################################
+
+_WORKER = {}
+
+
+def _attach_panel(name, shape):
+    # Runs once per worker process: maps the parent's panel instead of
+    # receiving a pickled copy with every task. Workers share the parent's
+    # resource tracker, and the parent alone unlinks the segment.
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+
+    closes = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _WORKER["shm"] = shm
+    _WORKER["closes"] = closes
+    _WORKER["packed"] = pack_panel(closes)
+    _WORKER["prices"] = forward_fill(closes)
+
+
+def _run_task(params):
+    return backtest(
+        _WORKER["closes"],
+        *params,
+        packed=_WORKER["packed"],
+        prices=_WORKER["prices"],
+    )
+
+
+def parameter_grid(short_windows, long_windows, initial_capitals=(10000,), position_sizes=(1.0,)):
+    return [
+        (short, long, capital, size)
+        for short, long, capital, size in itertools.product(
+            short_windows, long_windows, initial_capitals, position_sizes
+        )
+        if 0 < short < long
+    ]
+
+
+def rank_results(results):
+    table = pd.DataFrame(results, columns=RESULT_COLUMNS)
+    table = table.sort_values(["final_value", "max_drawdown"], ascending=[False, True], ignore_index=True)
+    table.index = pd.RangeIndex(1, len(table) + 1, name="rank")
+    return table
+
+
+def run_sweep(closes, short_windows, long_windows, initial_capitals=(10000,), position_sizes=(1.0,),
+              max_workers=None):
+    closes = np.ascontiguousarray(closes, dtype=np.float64)
+    grid = parameter_grid(short_windows, long_windows, initial_capitals, position_sizes)
+    if not grid or closes.size == 0:
+        return rank_results([])
+
+    shm = shared_memory.SharedMemory(create=True, size=closes.nbytes)
+    try:
+        np.ndarray(closes.shape, dtype=np.float64, buffer=shm.buf)[:] = closes
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_attach_panel,
+            initargs=(shm.name, closes.shape),
+        ) as pool:
+            chunksize = max(1, len(grid) // ((max_workers or os.cpu_count() or 1) * 4))
+            results = list(pool.map(_run_task, grid, chunksize=chunksize))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return rank_results(results)
+
+
+def sweep_symbols(stocks_list, short_windows, long_windows, initial_capitals=(10000,), position_sizes=(1.0,),
+                  max_workers=None):
+    from .tracker_scripts import load_price_panel
+
+    _, symbols, closes = load_price_panel(stocks_list)
+    if not symbols:
+        print("No price data available for the requested symbols.")
+        return rank_results([])
+    return run_sweep(closes, short_windows, long_windows, initial_capitals, position_sizes, max_workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank MA-crossover parameter sets across a symbol universe.")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--short", type=int, nargs="+", default=[5])
+    parser.add_argument("--long", type=int, nargs="+", default=[20])
+    parser.add_argument("--capital", type=float, nargs="+", default=[10000])
+    parser.add_argument("--size", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    table = sweep_symbols(args.symbols, args.short, args.long, args.capital, args.size, args.workers)
+    print(table.to_string())
@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from . import price_store
+
+INTRADAY_FREQUENCIES = ("1m", "5m", "1h")
+
+
+class BarAggregator:
+    """Builds intraday OHLCV bars from a stream of quotes.
+
+    Each (symbol, frequency) has one open bar in memory. A quote in a later
+    interval finishes it; finished bars wait in memory until flush() appends
+    them to the price store in one write per file. Quotes older than the
+    open bar are dropped.
+
+    GLOBAL_QUOTE volumes are cumulative for the trading day, so a bar's
+    volume is the growth of that figure over the bar (a drop means a new day
+    started and the figure restarts from zero).
+
+    Each symbol's open bars and last volume are saved to
+    open_bars/{symbol}.json on flush, for the symbols updated since the last
+    save, and read back the first time a symbol is seen. Short-lived
+    processes (one refresh per run) still build bars across runs, and
+    refreshers working on different shards never overwrite each other's
+    state.
+    """
+
+    def __init__(self, frequencies=INTRADAY_FREQUENCIES, directory=price_store.STORE_DIR, flush_at=256):
+        self.frequencies = tuple(frequencies)
+        self.intervals = [price_store.FREQUENCIES[frequency] for frequency in self.frequencies]
+        self.directory = directory
+        self.flush_at = flush_at
+
+        self._lock = threading.Lock()
+        self._open = {}
+        self._finished = {}
+        self._finished_count = 0
+        self._last_volume = {}
+        self._loaded = set()
+        self._dirty = set()
+
+        self.late = 0
+        self.flushed = 0
+
+    @property
+    def state_directory(self):
+        return os.path.join(self.directory, "open_bars")
+
+    def state_path(self, symbol):
+        return os.path.join(self.state_directory, f"{symbol}.json")
+
+    def _load_symbol(self, symbol):
+        # Reads symbol's saved state the first time it is seen; called with
+        # the lock held.
+        if symbol in self._loaded:
+            return
+        self._loaded.add(symbol)
+        try:
+            with open(self.state_path(symbol), "r") as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return
+        if state.get("last_volume") is not None:
+            self._last_volume[symbol] = state["last_volume"]
+        for frequency, bar in state.get("open", {}).items():
+            if frequency in self.frequencies:
+                self._open[(symbol, frequency)] = bar
+
+    def save_state(self):
+        # Writes the state of every symbol updated since the last save.
+        with self._lock:
+            dirty = self._dirty
+            self._dirty = set()
+            states = {
+                symbol: {
+                    "last_volume": self._last_volume.get(symbol),
+                    "open": {
+                        frequency: list(self._open[(symbol, frequency)])
+                        for frequency in self.frequencies if (symbol, frequency) in self._open
+                    },
+                }
+                for symbol in dirty
+            }
+        if not states:
+            return
+        try:
+            os.makedirs(self.state_directory, exist_ok=True)
+            for symbol, state in states.items():
+                path = self.state_path(symbol)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as file:
+                    json.dump(state, file)
+                os.replace(tmp_path, path)
+        except OSError:
+            # Try these symbols again on the next save.
+            with self._lock:
+                self._dirty.update(states)
+            raise
+
+    def update(self, symbol, price, volume, timestamp):
+        # timestamp is ns since the epoch. Returns True once enough finished
+        # bars are waiting that the caller should flush.
+        price = float(price)
+        with self._lock:
+            self._load_symbol(symbol)
+            self._dirty.add(symbol)
+            previous = self._last_volume.get(symbol)
+            self._last_volume[symbol] = volume
+            if previous is None:
+                traded = 0
+            elif volume >= previous:
+                traded = volume - previous
+            else:
+                traded = volume
+
+            for frequency, interval in zip(self.frequencies, self.intervals):
+                start = timestamp - timestamp % interval
+                key = (symbol, frequency)
+                bar = self._open.get(key)
+                if bar is not None and start < bar[0]:
+                    self.late += 1
+                    continue
+                if bar is not None and start == bar[0]:
+                    bar[2] = max(bar[2], price)
+                    bar[3] = min(bar[3], price)
+                    bar[4] = price
+                    bar[5] += traded
+                    continue
+                if bar is not None:
+                    self._finish(key, bar)
+                self._open[key] = [start, price, price, price, price, traded]
+            return self._finished_count >= self.flush_at
+
+    def _finish(self, key, bar):
+        self._finished.setdefault(key, []).append(tuple(bar))
+        self._finished_count += 1
+
+    def close_elapsed(self, now):
+        # Finishes open bars whose interval ended before now (ns), so a
+        # quiet symbol's last bar still reaches the store.
+        with self._lock:
+            for key, bar in list(self._open.items()):
+                if bar[0] + price_store.FREQUENCIES[key[1]] <= now:
+                    self._finish(key, bar)
+                    del self._open[key]
+                    self._dirty.add(key[0])
+
+    def open_bar(self, symbol, frequency):
+        # The in-progress bar as (start ns, open, high, low, close, volume).
+        with self._lock:
+            self._load_symbol(symbol)
+            bar = self._open.get((symbol, frequency))
+            return None if bar is None else tuple(bar)
+
+    def flush(self, now=None):
+        # Appends every finished bar to the store; returns how many were written.
+        if now is not None:
+            self.close_elapsed(now)
+        with self._lock:
+            finished = self._finished
+            self._finished = {}
+            self._finished_count = 0
+
+        written = 0
+        for (symbol, frequency), rows in finished.items():
+            bars = np.array(rows, dtype=price_store.BAR_DTYPE)
+            try:
+                written += price_store.append_bars(symbol, bars, self.directory, frequency)
+            except OSError as e:
+                print(f"Error writing {frequency} bars for {symbol}: {e}")
+        self.flushed += written
+        try:
+            self.save_state()
+        except OSError as e:
+            print(f"Error saving open bars: {e}")
+        return written
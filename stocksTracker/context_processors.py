@@ -0,0 +1,5 @@
+from .refresher import market_data_freshness
+
+
+def market_data(request):
+    return {"market_data": market_data_freshness()}
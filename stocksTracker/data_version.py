@@ -0,0 +1,42 @@
+import functools
+import os
+import threading
+import time
+
+# A marker file that is replaced whenever stored market data (quotes, bars,
+# the symbol universe) changes. Its inode and mtime are the data version:
+# every process, web workers and the refresher alike, sees a bump through
+# one stat() call, so caches keyed on the version are invalidated exactly
+# and without a TTL.
+VERSION_PATH = "market_data.version"
+
+
+def data_version(path=VERSION_PATH):
+    # (version token, last change as a Unix timestamp); ("0", None) until
+    # the first bump.
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "0", None
+    return f"{stat.st_ino:x}-{stat.st_mtime_ns:x}", stat.st_mtime
+
+
+def bump_data_version(path=VERSION_PATH):
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as file:
+        file.write(str(time.time_ns()))
+    os.replace(tmp_path, path)
+
+
+def per_version(fn):
+    # Memoizes a zero-argument function until the data version changes.
+    memo = {}
+
+    @functools.wraps(fn)
+    def wrapper():
+        version, _ = data_version()
+        entry = memo.get("entry")
+        if entry is None or entry[0] != version:
+            entry = memo["entry"] = (version, fn())
+        return entry[1]
+    return wrapper
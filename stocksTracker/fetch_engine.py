@@ -0,0 +1,107 @@
+import os
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+
+from .metrics import PROVIDER_ERRORS, PROVIDER_SECONDS
+from .rate_limiter import BULK, ProviderThrottled
+
+BASE_URL = "https://www.alphavantage.co/query"
+
+FETCH_CONCURRENCY = int(os.environ.get("FETCH_CONCURRENCY", 5))
+FETCH_TIMEOUT = float(os.environ.get("FETCH_TIMEOUT", 10))
+FETCH_RETRIES = int(os.environ.get("FETCH_RETRIES", 3))
+FETCH_BACKOFF = float(os.environ.get("FETCH_BACKOFF", 0.5))
+
+# Alpha Vantage answers over-quota calls with HTTP 200 and one of these keys
+# instead of the requested payload.
+THROTTLE_KEYS = ("Note", "Information")
+
+
+class FetchEngine:
+    """Pooled keep-alive HTTP client that fetches many symbols concurrently."""
+
+    def __init__(self, api_key=None, base_url=BASE_URL, concurrency=FETCH_CONCURRENCY,
+                 timeout=FETCH_TIMEOUT, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF,
+                 scheduler=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.scheduler = scheduler
+
+        # One connection pool shared by every worker thread, sized so that no
+        # worker ever has to open a fresh TCP/TLS connection.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _request(self, params):
+        function = params.get("function", "")
+        with PROVIDER_SECONDS.time(function=function):
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                if response.status_code >= 500 or response.status_code == 429:
+                    raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                payload = response.json()
+                if len(payload) == 1:
+                    for key in THROTTLE_KEYS:
+                        if key in payload:
+                            raise ProviderThrottled(payload[key])
+                return payload
+            except Exception as e:
+                PROVIDER_ERRORS.inc(function=function, kind=type(e).__name__)
+                raise
+
+    def get(self, params, priority=BULK):
+        params = dict(params)
+        if self.api_key is not None:
+            params.setdefault("apikey", self.api_key)
+        key = tuple(sorted((k, v) for k, v in params.items() if k != "apikey"))
+
+        attempt = 0
+        while True:
+            try:
+                if self.scheduler is None:
+                    return self._request(params)
+                return self.scheduler.run(key, lambda: self._request(params), priority)
+            except (requests.RequestException, ValueError):
+                if attempt >= self.retries:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt))
+                attempt += 1
+
+    def fetch_batch(self, function, symbols, priority=BULK, on_result=None, **extra_params):
+        # Returns ({symbol: payload}, {symbol: exception}) so callers can
+        # report failures per symbol without losing the rest of the batch.
+        # on_result(symbol, error_or_None) fires as each symbol completes.
+        results = {}
+        errors = {}
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return results, errors
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(symbols))) as pool:
+            futures = {
+                pool.submit(self.get, {"function": function, "symbol": symbol, **extra_params}, priority): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    results[symbol] = future.result()
+                except Exception as e:
+                    errors[symbol] = e
+                if on_result is not None:
+                    on_result(symbol, errors.get(symbol))
+        return results, errors
+
+    def fetch_daily_series(self, symbols, outputsize="compact", priority=BULK, on_result=None):
+        return self.fetch_batch("TIME_SERIES_DAILY", symbols, priority, on_result, outputsize=outputsize)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,101 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def copy_on_write_enabled():
+    # Always on from pandas 3; an opt-in mode before that.
+    return int(pd.__version__.split(".")[0]) >= 3 or pd.get_option("mode.copy_on_write") is True
+
+
+def enable_copy_on_write():
+    # Called at app start (StockstrackerConfig.ready) so pandas 2.x callers
+    # get shallow copies from the cache too.
+    if not copy_on_write_enabled():
+        pd.set_option("mode.copy_on_write", True)
+
+
+class FrameCache:
+    """Parsed DataFrames keyed by source file, bounded by a memory budget.
+
+    An entry is reused while its file's (mtime, size) is unchanged, so a
+    sync or an appended bar invalidates it without any explicit hook.
+    Least recently used frames are dropped once the cached frames take more
+    than max_bytes; a frame bigger than the whole budget is never kept.
+
+    Callers get their own copy. Under pandas copy-on-write (always on from
+    pandas 3, enabled at app start before that) it is a shallow copy that
+    costs nothing up front, and any column a caller adds or overwrites
+    lands in its own copy. Without copy-on-write an in-place edit would
+    reach the cached arrays, so callers get a deep copy instead.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path, loader):
+        # loader() returns a DataFrame or None; None is never cached. Files
+        # that don't exist yet are loaded every time (the loader may fetch
+        # them).
+        key = os.path.abspath(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return loader()
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._copy(entry[1])
+            self.misses += 1
+
+        frame = loader()
+        if frame is None:
+            return None
+
+        size = int(frame.memory_usage(index=True, deep=False).sum())
+        with self._lock:
+            self._discard(key)
+            if size <= self.max_bytes:
+                self._entries[key] = (version, frame, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    self._discard(next(iter(self._entries)))
+                    self.evictions += 1
+        return self._copy(frame)
+
+    def _copy(self, frame):
+        return frame.copy(deep=not copy_on_write_enabled())
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
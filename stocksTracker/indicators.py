@@ -0,0 +1,256 @@
+import numpy as np
+import pandas as pd
+
+SIGNAL_COLUMNS = ["stock", "date", "signal"]
+
+
+def ma_column(window):
+    return f"MA_{window}"
+
+
+def detect_crossovers(short_ma, long_ma):
+    # Returns (positions, directions): +1 where the short average crosses
+    # above the long one, -1 where it crosses below. NaN comparisons are
+    # False, so the warm-up period never produces a cross.
+    short_ma = np.asarray(short_ma, dtype=float)
+    long_ma = np.asarray(long_ma, dtype=float)
+
+    above = short_ma[1:] > long_ma[1:]
+    below = short_ma[1:] < long_ma[1:]
+    was_not_above = short_ma[:-1] <= long_ma[:-1]
+    was_not_below = short_ma[:-1] >= long_ma[:-1]
+
+    up = above & was_not_above
+    down = below & was_not_below
+
+    positions = np.flatnonzero(up | down)
+    directions = np.where(up[positions], 1, -1).astype(np.int8)
+    return positions + 1, directions
+
+
+def empty_signals():
+    return pd.DataFrame({
+        "stock": pd.Series(dtype=object),
+        "date": pd.Series(dtype="datetime64[ns]"),
+        "signal": pd.Series(dtype=object),
+    })
+
+
+def crossover_signals(dates, short_ma, long_ma, symbol):
+    positions, directions = detect_crossovers(short_ma, long_ma)
+    if len(positions) == 0:
+        return empty_signals()
+    return pd.DataFrame({
+        "stock": symbol,
+        "date": np.asarray(dates)[positions],
+        "signal": np.where(directions > 0, "BUY", "SELL"),
+    }, columns=SIGNAL_COLUMNS)
+
+
+######################################## PANEL ########################################
+
+def align_panel(series):
+    # series: {symbol: (int64 ns dates, values)} -> (DatetimeIndex, symbols,
+    # 2-D float array of shape dates x symbols, NaN where a symbol has no bar).
+    symbols = list(series)
+    if not symbols:
+        return pd.DatetimeIndex([], name="date"), symbols, np.empty((0, 0))
+
+    dates = np.unique(np.concatenate([np.asarray(d, dtype=np.int64) for d, _ in series.values()]))
+    values = np.full((len(dates), len(symbols)), np.nan)
+    for j, symbol in enumerate(symbols):
+        symbol_dates, symbol_values = series[symbol]
+        values[np.searchsorted(dates, symbol_dates), j] = symbol_values
+    return pd.DatetimeIndex(dates.view("datetime64[ns]"), name="date"), symbols, values
+
+
+def pack_panel(values):
+    # Moves each column's bars to the top, in date order, so windows and
+    # crossovers run over a symbol's own consecutive bars even when the
+    # symbols do not trade on exactly the same dates. Returns the packed
+    # values and, for each packed cell, the panel row it came from.
+    values = np.asarray(values, dtype=float)
+    rows = np.argsort(np.isnan(values), axis=0, kind="stable")
+    return np.take_along_axis(values, rows, axis=0), rows
+
+
+def rolling_means_panel(values, windows):
+    # Rolling means for every column and every window from one cumulative
+    # sum. A window touching a missing bar is NaN, like pandas' rolling.
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+
+    # Centering each column keeps the cumulative sums small, so differencing
+    # them loses no meaningful precision on long series.
+    offset = np.zeros(values.shape[1])
+    if values.size:
+        has_data = valid.any(axis=0)
+        offset[has_data] = np.nanmean(values[:, has_data], axis=0)
+    centered = np.where(valid, values - offset, 0.0)
+
+    n_rows = values.shape[0]
+    sums = np.zeros((n_rows + 1, values.shape[1]))
+    np.cumsum(centered, axis=0, out=sums[1:])
+    counts = np.zeros((n_rows + 1, values.shape[1]), dtype=np.int64)
+    np.cumsum(valid, axis=0, out=counts[1:])
+
+    means = {}
+    for window in dict.fromkeys(windows):
+        result = np.full(values.shape, np.nan)
+        if 0 < window <= n_rows:
+            window_sums = sums[window:] - sums[:-window]
+            window_counts = counts[window:] - counts[:-window]
+            result[window - 1:] = np.where(window_counts == window, window_sums / window + offset, np.nan)
+        means[window] = result
+    return means
+
+
+def panel_crossover_signals(dates, symbols, short_ma, long_ma, rows=None):
+    # Same rules as detect_crossovers, applied to every column at once.
+    # rows maps packed cells back to dates (see pack_panel).
+    short_ma = np.asarray(short_ma, dtype=float)
+    long_ma = np.asarray(long_ma, dtype=float)
+    if short_ma.shape[0] < 2:
+        return empty_signals()
+
+    up = (short_ma[1:] > long_ma[1:]) & (short_ma[:-1] <= long_ma[:-1])
+    down = (short_ma[1:] < long_ma[1:]) & (short_ma[:-1] >= long_ma[:-1])
+
+    hits, cols = np.nonzero(up | down)
+    if len(hits) == 0:
+        return empty_signals()
+
+    # Group by symbol (in request order), then by date.
+    order = np.lexsort((hits, cols))
+    hits, cols = hits[order], cols[order]
+    date_rows = hits + 1 if rows is None else rows[hits + 1, cols]
+    return pd.DataFrame({
+        "stock": np.asarray(symbols, dtype=object)[cols],
+        "date": np.asarray(dates)[date_rows],
+        "signal": np.where(up[hits, cols], "BUY", "SELL"),
+    }, columns=SIGNAL_COLUMNS)
+
+
+def forward_fill(values):
+    # Carries each column's last known value down over NaN gaps.
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return values.copy()
+    index = np.where(~np.isnan(values), np.arange(values.shape[0])[:, None], 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    return np.take_along_axis(values, index, axis=0)
+
+
+######################################## STREAMING ########################################
+
+class StreamingCrossover:
+    """Incremental short/long moving averages and crossover state for one symbol.
+
+    Keeps the last long_window closes in a ring buffer with running sums, so
+    each update is O(1). An update carrying the same date as the last one
+    replaces that bar (an intraday quote revising today's close) instead of
+    appending a new one.
+    """
+
+    # Running sums are rebuilt from the buffer this often to shed drift.
+    RESUM_EVERY = 10000
+
+    def __init__(self, short_window=5, long_window=20):
+        if not 0 < short_window <= long_window:
+            raise ValueError("short_window must be positive and no larger than long_window.")
+        self.short_window = short_window
+        self.long_window = long_window
+        self.ring = [0.0] * long_window
+        self.head = 0
+        self.count = 0
+        self.short_sum = 0.0
+        self.long_sum = 0.0
+        self.last_date = None
+        self.prev_short_ma = np.nan
+        self.prev_long_ma = np.nan
+        self.short_ma = np.nan
+        self.long_ma = np.nan
+        self.signal = None
+        self.updates = 0
+
+    def _recent(self, k):
+        return (self.head - 1 - k) % self.long_window
+
+    def _refresh(self):
+        self.short_ma = self.short_sum / self.short_window if self.count >= self.short_window else np.nan
+        self.long_ma = self.long_sum / self.long_window if self.count >= self.long_window else np.nan
+
+        if self.short_ma > self.long_ma and self.prev_short_ma <= self.prev_long_ma:
+            self.signal = "BUY"
+        elif self.short_ma < self.long_ma and self.prev_short_ma >= self.prev_long_ma:
+            self.signal = "SELL"
+        else:
+            self.signal = None
+
+    def _resum(self):
+        short = [self.ring[self._recent(k)] for k in range(min(self.count, self.short_window))]
+        long = [self.ring[self._recent(k)] for k in range(self.count)]
+        self.short_sum = float(sum(short))
+        self.long_sum = float(sum(long))
+
+    def update(self, price, date=None):
+        # Returns "BUY", "SELL" or None for the bar this update belongs to.
+        price = float(price)
+        if date is not None and date == self.last_date and self.count:
+            last = self._recent(0)
+            delta = price - self.ring[last]
+            self.ring[last] = price
+            self.short_sum += delta
+            self.long_sum += delta
+        else:
+            self.prev_short_ma = self.short_ma
+            self.prev_long_ma = self.long_ma
+            if self.count >= self.short_window:
+                self.short_sum -= self.ring[self._recent(self.short_window - 1)]
+            if self.count >= self.long_window:
+                self.long_sum -= self.ring[self.head]
+            self.ring[self.head] = price
+            self.head = (self.head + 1) % self.long_window
+            self.count = min(self.count + 1, self.long_window)
+            self.short_sum += price
+            self.long_sum += price
+            self.last_date = date
+
+        self.updates += 1
+        if self.updates % self.RESUM_EVERY == 0:
+            self._resum()
+        self._refresh()
+        return self.signal
+
+    @classmethod
+    def from_history(cls, closes, dates=None, short_window=5, long_window=20):
+        # Only the last long_window + 1 bars matter: enough for the current
+        # averages and the ones before them.
+        indicator = cls(short_window, long_window)
+        closes = np.asarray(closes, dtype=float)[-(long_window + 1):]
+        dates = [None] * len(closes) if dates is None else list(dates[len(dates) - len(closes):])
+        for price, date in zip(closes, dates):
+            indicator.update(price, date)
+        return indicator
+
+    def to_dict(self):
+        ordered = [self.ring[self._recent(k)] for k in reversed(range(self.count))]
+        return {
+            "short_window": self.short_window,
+            "long_window": self.long_window,
+            "closes": ordered,
+            "last_date": self.last_date,
+            "prev_short_ma": None if np.isnan(self.prev_short_ma) else self.prev_short_ma,
+            "prev_long_ma": None if np.isnan(self.prev_long_ma) else self.prev_long_ma,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        indicator = cls(state["short_window"], state["long_window"])
+        for price in state["closes"]:
+            indicator.update(price)
+        indicator.last_date = state["last_date"]
+        indicator.prev_short_ma = np.nan if state["prev_short_ma"] is None else state["prev_short_ma"]
+        indicator.prev_long_ma = np.nan if state["prev_long_ma"] is None else state["prev_long_ma"]
+        indicator._refresh()
+        return indicator
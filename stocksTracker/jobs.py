@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .data_version import data_version
+from .models import Job, RefreshRun, load_portfolio
+from .refresher import in_flight_run, run_refresh, start_run
+from .trade_history import TradeHistory
+from .tracker_scripts import run_simulator
+
+# Background jobs: submit_job queues a row in the Job table and
+# `manage.py run_jobs` workers claim and run it. Each kind has a handler,
+# handler(job, progress) -> (JSON result, artifact bytes or None), where
+# progress(completed, total) updates the job's progress.
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+
+
+def job_handler(kind):
+    def decorator(fn):
+        JOB_HANDLERS[kind] = fn
+        return fn
+    return decorator
+
+
+def dedup_key(kind, params):
+    return hashlib.sha1(json.dumps([kind, params], sort_keys=True).encode()).hexdigest()
+
+
+def submit_job(kind, params=None, reuse_finished=False):
+    # Queues a job unless an identical one is already pending or running,
+    # in which case that one is returned. With reuse_finished a successful
+    # identical job counts too, so its result is reused; failed ones are
+    # retried.
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind {kind!r}; expected one of {', '.join(sorted(JOB_HANDLERS))}.")
+    params = params or {}
+    key = dedup_key(kind, params)
+    states = [Job.PENDING, Job.RUNNING] + ([Job.DONE] if reuse_finished else [])
+    with transaction.atomic():
+        job = Job.objects.filter(dedup_key=key, state__in=states).order_by("-created_at").first()
+        if job is None:
+            job = Job.objects.create(kind=kind, params=params, dedup_key=key)
+    if job.state == Job.PENDING and settings.JOBS_RUN_INLINE:
+        claimed = claim_job(job.pk)
+        if claimed is not None:
+            return run_job(claimed)
+        # Another request claimed it first.
+        job.refresh_from_db()
+    return job
+
+
+def claim_job(pk=None):
+    # Atomically moves the oldest pending job (or job pk) to running, so two
+    # workers never run the same one.
+    queryset = Job.objects.filter(state=Job.PENDING)
+    if pk is not None:
+        queryset = queryset.filter(pk=pk)
+    for job in queryset.order_by("created_at"):
+        claimed = Job.objects.filter(pk=job.pk, state=Job.PENDING).update(state=Job.RUNNING, started_at=timezone.now())
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def requeue_stale_jobs(older_than):
+    # Jobs left running by a worker that died go back to the queue.
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    return Job.objects.filter(state=Job.RUNNING, started_at__lt=cutoff).update(state=Job.PENDING, started_at=None)
+
+
+def prune_jobs(older_than):
+    # Deletes finished jobs, stored results included, older than
+    # older_than seconds.
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    deleted, _ = Job.objects.filter(state__in=[Job.DONE, Job.FAILED], finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def run_job(job):
+    def progress(completed, total):
+        Job.objects.filter(pk=job.pk).update(completed=completed, total=total)
+
+    try:
+        result, artifact = JOB_HANDLERS[job.kind](job, progress)
+        Job.objects.filter(pk=job.pk).update(
+            state=Job.DONE, result=result, artifact=artifact, finished_at=timezone.now()
+        )
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job.pk, job.kind)
+        Job.objects.filter(pk=job.pk).update(state=Job.FAILED, error=str(e), finished_at=timezone.now())
+    job.refresh_from_db()
+    return job
+
+
+######################################## HANDLERS ########################################
+
+@job_handler("simulation")
+def simulation_job(job, progress):
+    portfolio = load_portfolio(job.params["portfolio_id"])
+    if not portfolio or not portfolio.get("stocks"):
+        raise ValueError(f"Portfolio {job.params['portfolio_id']} has no holdings.")
+    progress(0, 1)
+    total_capital, total_portfolio_value, history = run_simulator(portfolio)
+    progress(1, 1)
+    result = {
+        "total_capital": total_capital,
+        "total_portfolio_value": total_portfolio_value,
+        "trades": len(history),
+    }
+    return result, history.to_bytes()
+
+
+@job_handler("refresh")
+def refresh_job(job, progress):
+    # Goes through the same RefreshRun queue as refresh_market_data: a whole
+    # shard refresh serves a run requested from the data collection page.
+    # Symbol subsets get a run of their own. Skipped while the shard is
+    # already being refreshed.
+    shard = job.params.get("shard", "")
+    symbols = job.params.get("symbols")
+    run = start_run(shard, claim_requested=symbols is None)
+    if run is None:
+        return {"skipped": True, "in_flight": in_flight_run(shard).to_dict()}, None
+    run = run_refresh(run, symbols=symbols, full=job.params.get("full", False), on_step=progress)
+    if run.state == RefreshRun.FAILED:
+        raise RuntimeError(run.message)
+    return run.to_dict(), None
+
+
+def submit_simulation(portfolio_id):
+    # A simulation is valid until the market data changes, so identical
+    # requests under the same data version share one job and its result.
+    # Finished simulations of the portfolio under older data are superseded
+    # and deleted.
+    job = submit_job("simulation", {"portfolio_id": portfolio_id, "version": data_version()[0]}, reuse_finished=True)
+    simulation_jobs(portfolio_id).filter(state__in=[Job.DONE, Job.FAILED]).exclude(pk=job.pk).delete()
+    return job
+
+
+def simulation_jobs(portfolio_id):
+    # The portfolio's simulation jobs, newest first.
+    return Job.objects.filter(kind="simulation", params__portfolio_id=portfolio_id).order_by("-created_at")
+
+
+def latest_simulation(portfolio_id):
+    # The portfolio's most recent simulation job, or None.
+    return None if portfolio_id is None else simulation_jobs(portfolio_id).first()
+
+
+def simulation_result(job):
+    # (capital, value, TradeHistory) from a finished simulation job.
+    return job.result["total_capital"], job.result["total_portfolio_value"], TradeHistory.from_bytes(bytes(job.artifact))
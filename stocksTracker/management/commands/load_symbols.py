@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from stocksTracker.data_version import bump_data_version
+from stocksTracker.models import TrackedSymbol
+
+
+def read_symbols(path):
+    # One ticker per line; blank lines and # comments are skipped.
+    symbols = []
+    with open(path, "r") as file:
+        for line in file:
+            symbol = line.split("#", 1)[0].strip().upper()
+            if symbol:
+                symbols.append(symbol)
+    return list(dict.fromkeys(symbols))
+
+
+class Command(BaseCommand):
+    help = "Adds the symbols listed in a file to the tracked universe."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Text file with one ticker per line.")
+        parser.add_argument("--replace", action="store_true",
+                            help="Deactivate tracked symbols that are not in the file.")
+
+    def handle(self, *args, **options):
+        try:
+            symbols = read_symbols(options["path"])
+        except OSError as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+
+        with transaction.atomic():
+            known = set(TrackedSymbol.objects.values_list("symbol", flat=True))
+            TrackedSymbol.objects.bulk_create([TrackedSymbol(symbol=symbol) for symbol in symbols if symbol not in known])
+            reactivated = TrackedSymbol.objects.filter(symbol__in=symbols, active=False).update(active=True)
+            deactivated = 0
+            if options["replace"]:
+                deactivated = TrackedSymbol.objects.filter(active=True).exclude(symbol__in=symbols).update(active=False)
+
+        bump_data_version()
+        added = len([symbol for symbol in symbols if symbol not in known])
+        self.stdout.write(f"{added} added, {reactivated} reactivated, {deactivated} deactivated.")
@@ -0,0 +1,56 @@
+import argparse
+import time
+
+from django.core.management.base import BaseCommand
+
+from stocksTracker.refresher import claim_pending_run, run_refresh, start_run
+from stocksTracker.universe import parse_shard
+
+
+def shard_option(value):
+    try:
+        parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+class Command(BaseCommand):
+    help = "Keeps quotes and daily history fresh in the background so views only read the store."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run a single refresh and exit.")
+        parser.add_argument("--interval", type=int, default=900, help="Seconds between scheduled refreshes.")
+        parser.add_argument("--poll", type=float, default=5, help="Seconds between checks for requested refreshes.")
+        parser.add_argument("--full", action="store_true", help="Refetch the full history for every symbol.")
+        parser.add_argument("--shard", type=shard_option, metavar="i/N",
+                            help="Refresh only shard i of N of the symbol universe (see MARKET_DATA_SHARDS).")
+
+    def handle(self, *args, **options):
+        shard = options["shard"] or ""
+        if options["once"]:
+            run = start_run(shard)
+            if run is None:
+                self.stdout.write(f"A refresh{f' of shard {shard}' if shard else ''} is already running.")
+                return
+            self.report(run_refresh(run, full=options["full"]))
+            return
+
+        next_scheduled = time.monotonic()
+        while True:
+            run = claim_pending_run(shard)
+            if run is None and time.monotonic() >= next_scheduled:
+                run = start_run(shard)
+
+            if run is not None:
+                self.report(run_refresh(run, full=options["full"]))
+                next_scheduled = time.monotonic() + options["interval"]
+            else:
+                time.sleep(options["poll"])
+
+    def report(self, run):
+        self.stdout.write(
+            f"Refresh {run.pk}{f' shard {run.shard}' if run.shard else ''} {run.state}: "
+            f"{run.completed}/{run.total} done, {run.errors} errors"
+            + (f" ({run.message})" if run.message else "")
+        )
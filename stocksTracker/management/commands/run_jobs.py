@@ -0,0 +1,78 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+PRUNE_EVERY = 3600
+
+
+def work(poll, burst, stdout=None):
+    # One worker: claim, run, repeat. In burst mode it exits once the queue
+    # is empty. While idle it deletes expired jobs, at most once per
+    # PRUNE_EVERY seconds. Imports happen after setup so this also works as
+    # a spawned process's entry point.
+    import django
+    django.setup()
+    from django.conf import settings
+    from stocksTracker.jobs import claim_job, prune_jobs, run_job
+
+    pruned_at = time.monotonic()
+    while True:
+        job = claim_job()
+        if job is None:
+            if burst:
+                return
+            if time.monotonic() - pruned_at > PRUNE_EVERY:
+                prune_jobs(settings.JOBS_RETENTION_SECONDS)
+                pruned_at = time.monotonic()
+            time.sleep(poll)
+            continue
+        job = run_job(job)
+        message = f"Job {job.pk} ({job.kind}) {job.state}" + (f": {job.error}" if job.error else "")
+        if stdout is not None:
+            stdout.write(message)
+        else:
+            print(message, flush=True)
+
+
+class Command(BaseCommand):
+    help = "Runs queued simulations and refreshes from the database-backed job queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1, help="Worker processes to run.")
+        parser.add_argument("--poll", type=float, default=1, help="Seconds between checks of an empty queue.")
+        parser.add_argument("--burst", action="store_true", help="Exit once the queue is empty.")
+        parser.add_argument("--stale-after", type=int, default=3600,
+                            help="Requeue jobs left running for longer than this many seconds.")
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+        from stocksTracker.jobs import prune_jobs, requeue_stale_jobs
+
+        requeued = requeue_stale_jobs(options["stale_after"])
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale jobs.")
+        pruned = prune_jobs(settings.JOBS_RETENTION_SECONDS)
+        if pruned:
+            self.stdout.write(f"Deleted {pruned} expired jobs.")
+
+        if options["workers"] <= 1:
+            work(options["poll"], options["burst"], self.stdout)
+            return
+
+        # Children must not share the parent's database connections.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=work, args=(options["poll"], options["burst"]), name=f"job-worker-{i}")
+            for i in range(options["workers"])
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
@@ -0,0 +1,44 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .metrics import counter, histogram
+
+VIEW_SECONDS = histogram("stocks_view_seconds", "Time spent handling each view.")
+VIEW_RESPONSES = counter("stocks_view_responses_total", "Responses by view and status code.")
+
+
+class ViewTimingMiddleware:
+    """Times every request and labels it with the view's URL name.
+
+    Works under WSGI and ASGI: with an async handler chain it stays async,
+    so async views are not pushed onto a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, elapsed):
+        match = request.resolver_match
+        view = (match.view_name or match._func_path) if match else "unmatched"
+        VIEW_SECONDS.observe(elapsed, view=view, method=request.method)
+        VIEW_RESPONSES.inc(view=view, method=request.method, status=response.status_code)
@@ -0,0 +1,26 @@
+import glob
+import os
+import sys
+
+from .price_store import STORE_DIR, bars_path, read_csv_bars, write_bars
+
+# One-shot conversion of historical/{symbol}_historical.csv files into the
+# packed bar store. Run from the project root:
+#     python -m stocksTracker.migrate_historical [directory]
+
+
+def migrate_historical(directory=STORE_DIR):
+    migrated = []
+    for csv_file in sorted(glob.glob(os.path.join(directory, "*_historical.csv"))):
+        symbol = os.path.basename(csv_file)[:-len("_historical.csv")]
+        try:
+            count = write_bars(symbol, read_csv_bars(csv_file), directory)
+            migrated.append(symbol)
+            print(f"Migrated {count} bars for {symbol} to {bars_path(symbol, directory)}")
+        except Exception as e:
+            print(f"Error migrating {csv_file}: {e}")
+    return migrated
+
+
+if __name__ == "__main__":
+    migrate_historical(sys.argv[1] if len(sys.argv) > 1 else STORE_DIR)
@@ -0,0 +1,45 @@
+import csv
+import os
+import sys
+from datetime import datetime
+
+from .tick_store import TICK_DIR, TickStore, datetime_to_ns
+
+# One-shot import of the old real_time_stock_data.csv quote file into the
+# tick log. Run from the project root:
+#     python -m stocksTracker.migrate_quotes [csv_file] [tick_directory]
+
+LEGACY_QUOTES_CSV = "real_time_stock_data.csv"
+
+
+def migrate_quotes(csv_file=LEGACY_QUOTES_CSV, directory=TICK_DIR):
+    if not os.path.isfile(csv_file):
+        print(f"Error: Real-time data file '{csv_file}' not found.")
+        return 0
+
+    ticks = []
+    with open(csv_file, "r", newline="") as file:
+        for row in csv.DictReader(file):
+            try:
+                timestamp = datetime_to_ns(datetime.fromisoformat(row["timestamp"]))
+                price = float(row["price"])
+            except (KeyError, TypeError, ValueError):
+                print(f"Skipping unreadable row: {row}")
+                continue
+            try:
+                volume = int(row["volume"])
+            except ValueError:
+                volume = 0
+            ticks.append((row["symbol"], price, volume, timestamp))
+
+    # The file mixes truncating and appending writers, so order by time.
+    ticks.sort(key=lambda tick: tick[3])
+    store = TickStore(directory)
+    count = store.append_many(ticks)
+    store.close()
+    print(f"Imported {count} quotes from {csv_file} into {directory}")
+    return count
+
+
+if __name__ == "__main__":
+    migrate_quotes(*sys.argv[1:3])
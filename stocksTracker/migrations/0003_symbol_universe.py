@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:07
+
+from django.db import migrations, models
+
+
+# tracker_scripts.STOCK_SYMBOLS at the time of this migration.
+INITIAL_SYMBOLS = [
+    "AAPL", "GOOGL", "MSFT", "AMZN", "TSLA", "NVDA", "META", "JPM",
+    "V", "MA", "PYPL", "BAC", "DIS", "NFLX", "INTC",
+]
+
+
+def seed_symbols(apps, schema_editor):
+    TrackedSymbol = apps.get_model("stocksTracker", "TrackedSymbol")
+    TrackedSymbol.objects.bulk_create([TrackedSymbol(symbol=symbol) for symbol in INITIAL_SYMBOLS], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stocksTracker', '0002_refreshrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackedSymbol',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=16, unique=True)),
+                ('active', models.BooleanField(default=True)),
+                ('added_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='refreshrun',
+            name='shard',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.RunPython(seed_symbols, migrations.RunPython.noop),
+    ]
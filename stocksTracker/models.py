@@ -0,0 +1,172 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class Portfolio(models.Model):
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    phone = models.CharField(max_length=15)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.pk})"
+
+
+class Holding(models.Model):
+    portfolio = models.ForeignKey(Portfolio, on_delete=models.CASCADE, related_name="holdings")
+    symbol = models.CharField(max_length=16)
+    shares = models.PositiveIntegerField()
+
+    class Meta:
+        # The unique constraint doubles as the (portfolio, symbol) index.
+        constraints = [
+            models.UniqueConstraint(fields=["portfolio", "symbol"], name="unique_portfolio_symbol"),
+        ]
+        indexes = [
+            models.Index(fields=["symbol"], name="holding_symbol_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.symbol}: {self.shares}"
+
+
+def portfolio_to_dict(portfolio, holdings):
+    # The shape tracker_scripts and the templates already use.
+    return {
+        "id": portfolio.pk,
+        "name": portfolio.name,
+        "email": portfolio.email,
+        "phone": portfolio.phone,
+        "stocks": [{"stock": holding.symbol, "shares": holding.shares} for holding in holdings],
+    }
+
+
+def load_portfolio(portfolio_id):
+    # One query: holdings joined to their portfolio. Only an empty portfolio
+    # needs a second lookup.
+    holdings = list(
+        Holding.objects.select_related("portfolio").filter(portfolio_id=portfolio_id).order_by("pk")
+    )
+    if holdings:
+        return portfolio_to_dict(holdings[0].portfolio, holdings)
+
+    portfolio = Portfolio.objects.filter(pk=portfolio_id).first()
+    return None if portfolio is None else portfolio_to_dict(portfolio, [])
+
+
+def load_portfolios(portfolio_ids=None):
+    # Many portfolios with their holdings in two queries in total.
+    queryset = Portfolio.objects.prefetch_related("holdings").order_by("pk")
+    if portfolio_ids is not None:
+        queryset = queryset.filter(pk__in=portfolio_ids)
+    return [portfolio_to_dict(portfolio, portfolio.holdings.all()) for portfolio in queryset]
+
+
+class TrackedSymbol(models.Model):
+    # The symbol universe refreshed and analyzed by the app (see universe.py).
+    symbol = models.CharField(max_length=16, unique=True)
+    active = models.BooleanField(default=True)
+    added_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.symbol
+
+
+class RefreshRun(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    state = models.CharField(max_length=10, choices=STATES, default=PENDING)
+    # "i/N" when the run covers one shard of the universe, blank for all of it.
+    shard = models.CharField(max_length=16, blank=True)
+    phase = models.CharField(max_length=20, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    message = models.TextField(blank=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["state", "requested_at"], name="refresh_state_idx"),
+        ]
+
+    def __str__(self):
+        return f"Refresh {self.pk} ({self.state})"
+
+    def to_dict(self):
+        return {
+            "id": self.pk,
+            "state": self.state,
+            "shard": self.shard,
+            "phase": self.phase,
+            "total": self.total,
+            "completed": self.completed,
+            "errors": self.errors,
+            "message": self.message,
+            "requested_at": self.requested_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class Job(models.Model):
+    # A unit of background work (see jobs.py) picked up by `manage.py run_jobs`.
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=32)
+    params = models.JSONField(default=dict)
+    # Hash of (kind, params); identical submissions share one job.
+    dedup_key = models.CharField(max_length=40)
+    state = models.CharField(max_length=10, choices=STATES, default=PENDING)
+    total = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    # Results too big for JSON, e.g. a simulation's trade arrays.
+    artifact = models.BinaryField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["state", "created_at"], name="job_state_idx"),
+            models.Index(fields=["dedup_key", "state"], name="job_dedup_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} job {self.pk} ({self.state})"
+
+    def to_dict(self):
+        return {
+            "id": self.pk,
+            "kind": self.kind,
+            "params": self.params,
+            "state": self.state,
+            "total": self.total,
+            "completed": self.completed,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
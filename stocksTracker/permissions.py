@@ -0,0 +1,48 @@
+from rest_framework.permissions import BasePermission
+
+
+def requested_portfolio_ids(request):
+    # The stored portfolio ids a valuation request names: ?ids=1,2,3 on GET,
+    # "portfolio_ids" on POST. Malformed entries are skipped here; the view
+    # rejects them.
+    if request.method == "GET":
+        values = (request.query_params.get("ids") or "").split(",")
+    else:
+        values = request.data.get("portfolio_ids") if isinstance(request.data, dict) else None
+        if not isinstance(values, list):
+            values = []
+    ids = []
+    for value in values:
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+class OwnPortfoliosOnly(BasePermission):
+    """Stored portfolios can only be valued by the session that created
+    them, or by staff. Inline portfolios carry their own holdings and are
+    always allowed."""
+
+    message = "You can only value your own portfolio."
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        own = request.session.get("portfolio_id")
+        return all(pk == own for pk in requested_portfolio_ids(request))
+
+
+class StaffForRefreshJobs(BasePermission):
+    """Refresh jobs spend the provider quota, so only staff may queue them.
+    Simulations of the session's own portfolio are open to everyone."""
+
+    message = "Only staff can queue refresh jobs."
+
+    def has_permission(self, request, view):
+        if request.method != "POST" or not isinstance(request.data, dict):
+            return True
+        if request.data.get("kind") != "refresh":
+            return True
+        return bool(request.user and request.user.is_staff)
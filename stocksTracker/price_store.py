@@ -0,0 +1,167 @@
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from .file_lock import exclusive_lock
+
+STORE_DIR = "historical"
+
+# One fixed-width record per bar, sorted by date (int64 ns since epoch).
+# Appending is a single write at the end of the file, and every column is
+# a zero-copy strided view over the memory-mapped records.
+BAR_DTYPE = np.dtype([
+    ("date", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<i8"),
+])
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# Bar length in ns per frequency. Daily bars keep the original file name;
+# intraday ones live next to them as {symbol}.{frequency}.bars.
+DAILY = "1d"
+FREQUENCIES = {
+    "1m": 60 * 10**9,
+    "5m": 5 * 60 * 10**9,
+    "1h": 60 * 60 * 10**9,
+    DAILY: 24 * 60 * 60 * 10**9,
+}
+
+
+def bars_path(symbol, directory=STORE_DIR, frequency=DAILY):
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown bar frequency {frequency!r}; expected one of {', '.join(FREQUENCIES)}.")
+    if frequency == DAILY:
+        return os.path.join(directory, f"{symbol}.bars")
+    return os.path.join(directory, f"{symbol}.{frequency}.bars")
+
+
+def load_bars(symbol, directory=STORE_DIR, frequency=DAILY):
+    path = bars_path(symbol, directory, frequency)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+
+    # A torn append can leave a partial record at the end; ignore it.
+    count = size // BAR_DTYPE.itemsize
+    if count == 0:
+        return np.empty(0, dtype=BAR_DTYPE)
+    return np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(count,))
+
+
+def last_date(symbol, directory=STORE_DIR, frequency=DAILY):
+    bars = load_bars(symbol, directory, frequency)
+    if bars is None or len(bars) == 0:
+        return None
+    return pd.Timestamp(int(bars["date"][-1]))
+
+
+def _normalize(bars):
+    bars = np.asarray(bars, dtype=BAR_DTYPE)
+    order = np.argsort(bars["date"], kind="stable")
+    bars = bars[order]
+    # Keep the last occurrence of each date so newer data wins on merge.
+    keep = np.ones(len(bars), dtype=bool)
+    keep[:-1] = bars["date"][1:] != bars["date"][:-1]
+    return bars[keep]
+
+
+@contextmanager
+def symbol_lock(symbol, directory=STORE_DIR, frequency=DAILY):
+    # Serializes writers of one symbol's bars across threads and processes
+    # (shard and job workers) with an OS lock on {bars file}.lock.
+    os.makedirs(directory, exist_ok=True)
+    with open(f"{bars_path(symbol, directory, frequency)}.lock", "a+b") as file, exclusive_lock(file):
+        yield
+
+
+def _write_bars(symbol, bars, directory, frequency):
+    bars = _normalize(bars)
+    path = bars_path(symbol, directory, frequency)
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(bars.tobytes())
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+    return len(bars)
+
+
+def write_bars(symbol, bars, directory=STORE_DIR, frequency=DAILY):
+    with symbol_lock(symbol, directory, frequency):
+        return _write_bars(symbol, bars, directory, frequency)
+
+
+def merge_bars(symbol, bars, directory=STORE_DIR, frequency=DAILY):
+    # Rewrites the stored bars merged with bars; bars win where dates collide.
+    with symbol_lock(symbol, directory, frequency):
+        existing = load_bars(symbol, directory, frequency)
+        if existing is not None:
+            bars = np.concatenate([np.asarray(existing), np.asarray(bars, dtype=BAR_DTYPE)])
+            del existing
+        return _write_bars(symbol, bars, directory, frequency)
+
+
+def append_bars(symbol, bars, directory=STORE_DIR, frequency=DAILY):
+    # Bars newer than the last stored one are appended. A bar for the last
+    # stored date replaces it, so a bar saved mid-session can be corrected.
+    bars = _normalize(bars)
+    with symbol_lock(symbol, directory, frequency):
+        existing = load_bars(symbol, directory, frequency)
+        if existing is None:
+            return _write_bars(symbol, bars, directory, frequency)
+
+        kept = len(existing)
+        if kept:
+            bars = bars[bars["date"] >= existing["date"][-1]]
+            if len(bars) and bars["date"][0] == existing["date"][-1]:
+                if bars[0].tobytes() == existing[-1].tobytes():
+                    bars = bars[1:]
+                else:
+                    kept -= 1
+        if len(bars) == 0:
+            return 0
+
+        path = bars_path(symbol, directory, frequency)
+        whole = kept * BAR_DTYPE.itemsize
+        del existing
+        with open(path, "r+b") as file:
+            file.truncate(whole)
+            file.seek(whole)
+            file.write(bars.tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+        return len(bars)
+
+
+def bars_between(bars, start=None, end=None):
+    # Date-index lookup via binary search on the sorted date column.
+    dates = bars["date"]
+    lo = 0 if start is None else np.searchsorted(dates, pd.Timestamp(start).value, side="left")
+    hi = len(bars) if end is None else np.searchsorted(dates, pd.Timestamp(end).value, side="right")
+    return bars[lo:hi]
+
+
+def dataframe_to_bars(df):
+    dates = pd.to_datetime(df.index if "date" not in df.columns else df["date"])
+    bars = np.empty(len(df), dtype=BAR_DTYPE)
+    bars["date"] = dates.values.astype("datetime64[ns]").view("i8")
+    for column in PRICE_COLUMNS:
+        bars[column] = pd.to_numeric(df[column]).to_numpy()
+    return bars
+
+
+def bars_to_dataframe(bars):
+    index = pd.DatetimeIndex(np.asarray(bars["date"]).view("datetime64[ns]"), name="date")
+    return pd.DataFrame({column: bars[column] for column in PRICE_COLUMNS}, index=index)
+
+
+def read_csv_bars(csv_file):
+    return dataframe_to_bars(pd.read_csv(csv_file))
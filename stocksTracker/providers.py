@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .rate_limiter import BULK, INTERACTIVE
+
+# Market data providers behind the fetch functions in tracker_scripts.
+#
+# A provider returns quotes as {"symbol", "price", "volume"} dicts and daily
+# series as {date: {"1. open", ..., "5. volume"}}, the Alpha Vantage layout
+# daily_series_to_bars reads. Providers whose quote endpoint takes many
+# symbols set max_batch above 1 and fetch_quotes calls fetch_quote_batch;
+# the rest get fetch_quote called once per symbol, concurrently.
+
+
+class Provider(ABC):
+    name = "provider"
+    max_batch = 1
+    concurrency = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.round_trips = 0
+
+    def _count_round_trip(self):
+        with self._lock:
+            self.round_trips += 1
+
+    @abstractmethod
+    def fetch_quote(self, symbol, priority=INTERACTIVE):
+        """One quote dict, or None when the provider has nothing for symbol."""
+
+    @abstractmethod
+    def fetch_quote_batch(self, symbols, priority=BULK):
+        """{symbol: quote} for up to max_batch symbols in one round trip."""
+
+    @abstractmethod
+    def fetch_daily_series(self, symbols, outputsize="compact", priority=BULK, on_result=None):
+        """({symbol: series}, {symbol: exception}); on_result(symbol,
+        error_or_None) fires as each symbol completes."""
+
+    def fetch_quotes(self, symbols, priority=BULK, on_result=None):
+        # Returns ({symbol: quote}, {symbol: exception}), one request per
+        # max_batch symbols with the requests running concurrently.
+        # on_result(symbol, error_or_None) fires as each symbol completes.
+        symbols = list(dict.fromkeys(symbols))
+        quotes = {}
+        errors = {}
+        if not symbols:
+            return quotes, errors
+
+        if self.max_batch > 1:
+            chunks = [symbols[i:i + self.max_batch] for i in range(0, len(symbols), self.max_batch)]
+            fetch = lambda chunk: self.fetch_quote_batch(chunk, priority)
+        else:
+            chunks = [[symbol] for symbol in symbols]
+            fetch = lambda chunk: {chunk[0]: self.fetch_quote(chunk[0], priority)}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(chunks)))) as pool:
+            futures = {pool.submit(fetch, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    received = future.result()
+                    failure = None
+                except Exception as e:
+                    received = {}
+                    failure = e
+                for symbol in futures[future]:
+                    quote = received.get(symbol)
+                    if quote is not None:
+                        quotes[symbol] = quote
+                    else:
+                        errors[symbol] = failure or LookupError(f"No quote returned for {symbol}.")
+                    if on_result is not None:
+                        on_result(symbol, errors.get(symbol))
+        return quotes, errors
+
+    def close(self):
+        pass
+
+
+def global_quote_to_quote(data):
+    # GLOBAL_QUOTE's "Global Quote" object; None when it is empty (unknown
+    # symbol).
+    if not data:
+        return None
+    return {
+        "symbol": data.get("01. symbol", "N/A"),
+        "price": data.get("05. price", "N/A"),
+        "volume": data.get("06. volume", "N/A"),
+    }
+
+
+class AlphaVantageProvider(Provider):
+    """Alpha Vantage through a FetchEngine (pool, rate limits, retries).
+
+    With bulk=True quotes come from REALTIME_BULK_QUOTES, up to 100 symbols
+    per call; that endpoint needs a premium key. Without it every symbol
+    costs one GLOBAL_QUOTE call.
+    """
+
+    name = "alphavantage"
+    BULK_LIMIT = 100
+
+    def __init__(self, engine, bulk=False):
+        super().__init__()
+        self.engine = engine
+        self.max_batch = self.BULK_LIMIT if bulk else 1
+        self.concurrency = engine.concurrency
+
+    def _get(self, params, priority):
+        self._count_round_trip()
+        return self.engine.get(params, priority)
+
+    def fetch_quote(self, symbol, priority=INTERACTIVE):
+        payload = self._get({"function": "GLOBAL_QUOTE", "symbol": symbol}, priority)
+        return global_quote_to_quote(payload.get("Global Quote", {}))
+
+    def fetch_quote_batch(self, symbols, priority=BULK):
+        payload = self._get({"function": "REALTIME_BULK_QUOTES", "symbol": ",".join(symbols)}, priority)
+        quotes = {}
+        for item in payload.get("data", []):
+            if item.get("symbol") in symbols and item.get("close") is not None:
+                quotes[item["symbol"]] = {"symbol": item["symbol"], "price": item["close"], "volume": item.get("volume", "N/A")}
+        return quotes
+
+    def fetch_daily_series(self, symbols, outputsize="compact", priority=BULK, on_result=None):
+        symbols = list(dict.fromkeys(symbols))
+        with self._lock:
+            self.round_trips += len(symbols)
+        payloads, errors = self.engine.fetch_daily_series(symbols, outputsize, priority, on_result)
+        return {symbol: payload.get("Time Series (Daily)", {}) for symbol, payload in payloads.items()}, errors
+
+    def close(self):
+        self.engine.close()
+
+
+class FileReplayProvider(Provider):
+    """Serves recorded Alpha Vantage responses from disk, for offline runs.
+
+    Recordings live at {directory}/{function}/{symbol}.json (the layout
+    benchmarks/fixtures.py records into). Any number of symbols is one
+    round trip, and nothing is rate limited.
+    """
+
+    name = "replay"
+    max_batch = 10**6
+    concurrency = 1
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+
+    def _load(self, function, symbol):
+        with open(os.path.join(self.directory, function, f"{symbol}.json"), "r") as file:
+            return json.load(file)
+
+    def fetch_quote(self, symbol, priority=INTERACTIVE):
+        return self.fetch_quote_batch([symbol], priority).get(symbol)
+
+    def fetch_quote_batch(self, symbols, priority=BULK):
+        self._count_round_trip()
+        quotes = {}
+        for symbol in symbols:
+            try:
+                quote = global_quote_to_quote(self._load("GLOBAL_QUOTE", symbol).get("Global Quote", {}))
+            except FileNotFoundError:
+                continue
+            if quote is not None:
+                quotes[symbol] = quote
+        return quotes
+
+    def fetch_daily_series(self, symbols, outputsize="compact", priority=BULK, on_result=None):
+        symbols = list(dict.fromkeys(symbols))
+        if symbols:
+            self._count_round_trip()
+        series = {}
+        errors = {}
+        for symbol in symbols:
+            try:
+                series[symbol] = self._load("TIME_SERIES_DAILY", symbol).get("Time Series (Daily)", {})
+            except (OSError, ValueError) as e:
+                errors[symbol] = e
+            if on_result is not None:
+                on_result(symbol, errors.get(symbol))
+        return series, errors
+
+
+def build_provider(name, engine, replay_dir=None, bulk=False):
+    if name == AlphaVantageProvider.name:
+        return AlphaVantageProvider(engine, bulk=bulk)
+    if name == FileReplayProvider.name:
+        return FileReplayProvider(replay_dir)
+    raise ValueError(f"Unknown market data provider {name!r}; expected alphavantage or replay.")
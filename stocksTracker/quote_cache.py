@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class QuoteCache:
+    """Latest (price, volume) per symbol with TTL, LRU eviction and single-flight loads."""
+
+    def __init__(self, ttl=300.0, max_entries=1024, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._warm = False
+        self._warm_version = None
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def warm(self, rows_loader, version=None):
+        # rows_loader yields (symbol, price, volume); later rows win. Runs
+        # once per process, and again only when a caller passes a version
+        # (e.g. the market data version) different from the last load; the
+        # entries cached under the old version are dropped then, so nothing
+        # older than the store outlives a version change.
+        with self._lock:
+            if self._warm and (version is None or version == self._warm_version):
+                return
+            if self._warm:
+                self._entries.clear()
+            self._warm = True
+            self._warm_version = version
+            now = self.clock()
+            for symbol, price, volume in rows_loader():
+                self._store(symbol, price, volume, now)
+
+    def _store(self, symbol, price, volume, now):
+        self._entries[symbol] = (price, volume, now)
+        self._entries.move_to_end(symbol)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def put(self, symbol, price, volume):
+        with self._lock:
+            self._store(symbol, price, volume, self.clock())
+
+    def peek(self, symbol):
+        # Returns (price, volume, age_seconds) without loading, or None.
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None:
+                return None
+            price, volume, loaded_at = entry
+            return price, volume, self.clock() - loaded_at
+
+    def get(self, symbol, loader):
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None and self.clock() - entry[2] < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(symbol)
+                return entry[0], entry[1]
+
+            if entry is None:
+                self.misses += 1
+            else:
+                self.stale += 1
+
+            future = self._loading.get(symbol)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._loading[symbol] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = loader(symbol) or (None, None)
+            price, volume = result
+            with self._lock:
+                self.loads += 1
+                if price is not None:
+                    self._store(symbol, price, volume, self.clock())
+                elif entry is not None:
+                    # Upstream failed; a stale quote beats no quote.
+                    price, volume = entry[0], entry[1]
+            future.set_result((price, volume))
+            return price, volume
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(symbol, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,214 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager, nullcontext
+
+from .file_lock import exclusive_lock
+
+# Lower value is served first.
+INTERACTIVE = 0
+BULK = 1
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class QuotaExceeded(RateLimitError):
+    pass
+
+
+class ProviderThrottled(RateLimitError):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, capacity, period, clock=time.monotonic):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def wait_time(self, now):
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now):
+        self._refill(now)
+        self.tokens -= 1
+
+    def drain(self, now):
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+
+class SharedBudget:
+    """Token-bucket state kept in a JSON file, read and written under an
+    exclusive lock, so every process spending one API key (web and job
+    workers, refresh shards, cron runs) draws from the same budget instead
+    of each getting a full one. Bucket times are stored as they are, so
+    schedulers sharing a budget must use a wall clock (time.time)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    @contextmanager
+    def sync(self, buckets):
+        # Loads the stored state into buckets ({name: TokenBucket}), yields,
+        # then stores theirs back, all while holding the lock.
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a+") as file, exclusive_lock(file):
+            file.seek(0)
+            try:
+                state = json.loads(file.read() or "{}")
+            except ValueError:
+                state = {}
+            for name, bucket in buckets.items():
+                if name in state:
+                    bucket.tokens = min(bucket.capacity, float(state[name]["tokens"]))
+                    bucket.updated = float(state[name]["updated"])
+            yield
+            file.seek(0)
+            file.truncate()
+            json.dump({name: {"tokens": bucket.tokens, "updated": bucket.updated} for name, bucket in buckets.items()}, file)
+            file.flush()
+
+
+class RequestScheduler:
+    """Token-bucket gate in front of every outbound provider call.
+
+    Callers wait in a priority queue for a token from both the per-minute and
+    the per-day bucket. Calls sharing a key while one is already in flight
+    wait for that call's result instead of spending another token. With a
+    SharedBudget the buckets are shared with every other process using it.
+    """
+
+    def __init__(self, per_minute, per_day, max_wait=60.0, clock=time.monotonic, budget=None):
+        self.clock = clock
+        self.minute_bucket = TokenBucket(per_minute, 60.0, clock)
+        self.day_bucket = TokenBucket(per_day, 86400.0, clock)
+        self.max_wait = max_wait
+        self.budget = budget
+
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._in_flight = {}
+
+        self.requests = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def run(self, key, fn, priority=BULK):
+        with self._cond:
+            self.requests += 1
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            self._acquire(priority)
+            try:
+                result = fn()
+            except ProviderThrottled:
+                self.report_throttled()
+                raise
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._cond:
+                self._in_flight.pop(key, None)
+
+    def _buckets(self):
+        # Brings the buckets up to date with the shared budget for the block.
+        if self.budget is None:
+            return nullcontext()
+        return self.budget.sync({"minute": self.minute_bucket, "day": self.day_bucket})
+
+    def report_throttled(self):
+        # The provider says the budget is gone even though our buckets
+        # disagree, so stop sending until the minute bucket refills.
+        with self._cond:
+            self.throttled += 1
+            with self._buckets():
+                self.minute_bucket.drain(self.clock())
+            self._cond.notify_all()
+
+    def _acquire(self, priority):
+        with self._cond:
+            enqueued = self.clock()
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = self.clock()
+                    timeout = None
+                    if self._waiters[0] == entry:
+                        with self._buckets():
+                            day_wait = self.day_bucket.wait_time(now)
+                            wait = max(self.minute_bucket.wait_time(now), day_wait)
+                            if wait <= 0:
+                                self.minute_bucket.take(now)
+                                self.day_bucket.take(now)
+                        if wait <= 0:
+                            break
+                        if (now - enqueued) + wait > self.max_wait:
+                            self.rejected += 1
+                            raise QuotaExceeded(
+                                f"Provider budget exhausted, next slot in {wait:.0f}s"
+                            )
+                        timeout = wait
+                    self._cond.wait(timeout)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+            waited = self.clock() - enqueued
+            self.wait_count += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def metrics(self):
+        with self._cond:
+            return {
+                "queue_depth": len(self._waiters),
+                "in_flight": len(self._in_flight),
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "throttled": self.throttled,
+                "wait_avg": self.wait_total / self.wait_count if self.wait_count else 0.0,
+                "wait_max": self.wait_max,
+                "minute_tokens": self.minute_bucket.tokens,
+                "day_tokens": self.day_bucket.tokens,
+            }
@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .data_version import bump_data_version, per_version
+from .models import RefreshRun
+from .tracker_scripts import fetch_historical_data_in_file_all, fetch_real_time_data_all
+from .universe import shard_labels, shard_symbols, symbol_universe
+
+
+def request_refresh():
+    # Queues a refresh for the background workers, one run per shard
+    # (MARKET_DATA_SHARDS), skipping shards that already have one waiting
+    # or running.
+    runs = []
+    with transaction.atomic():
+        for shard in shard_labels(settings.MARKET_DATA_SHARDS):
+            run = RefreshRun.objects.filter(shard=shard, state__in=[RefreshRun.PENDING, RefreshRun.RUNNING]).first()
+            runs.append(run or RefreshRun.objects.create(shard=shard))
+    return runs
+
+
+def claim_pending_run(shard="", pk=None):
+    # Atomically moves the shard's oldest pending run (or run pk) to running,
+    # so two workers never pick up the same one. Nothing is claimed while
+    # another run of the shard is in flight; if two claims of different runs
+    # race, whoever then sees the other backs off and its run stays pending.
+    running = RefreshRun.objects.filter(shard=shard, state=RefreshRun.RUNNING)
+    if running.exists():
+        return None
+    pending = RefreshRun.objects.filter(state=RefreshRun.PENDING, shard=shard)
+    if pk is not None:
+        pending = pending.filter(pk=pk)
+    for run in pending.order_by("requested_at"):
+        claimed = RefreshRun.objects.filter(pk=run.pk, state=RefreshRun.PENDING).update(
+            state=RefreshRun.RUNNING, started_at=timezone.now()
+        )
+        if claimed:
+            if running.exclude(pk=run.pk).exists():
+                RefreshRun.objects.filter(pk=run.pk).update(state=RefreshRun.PENDING, started_at=None)
+                return None
+            run.refresh_from_db()
+            return run
+    return None
+
+
+def fail_stale_runs(older_than):
+    # Runs left running by a worker that died would block their shard.
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    return RefreshRun.objects.filter(state=RefreshRun.RUNNING, started_at__lt=cutoff).update(
+        state=RefreshRun.FAILED, message="Worker stopped before finishing.", finished_at=timezone.now()
+    )
+
+
+def start_run(shard="", claim_requested=True):
+    # Starts refreshing a shard now: a requested run if one is waiting (and
+    # claim_requested), otherwise a new one. The refresh_market_data worker
+    # and refresh jobs both start runs here, so a shard is never refreshed
+    # twice at once; None means one is already in flight.
+    fail_stale_runs(settings.MARKET_DATA_REFRESH_TIMEOUT)
+    if claim_requested:
+        run = claim_pending_run(shard)
+        if run is not None:
+            return run
+    run = RefreshRun.objects.create(shard=shard)
+    claimed = claim_pending_run(shard, pk=run.pk)
+    if claimed is None:
+        RefreshRun.objects.filter(pk=run.pk, state=RefreshRun.PENDING).delete()
+    return claimed
+
+
+def in_flight_run(shard=""):
+    return RefreshRun.objects.filter(shard=shard, state=RefreshRun.RUNNING).first()
+
+
+def run_refresh(run, symbols=None, full=False, on_step=None):
+    # Refreshes the given symbols, by default the run's shard of the universe.
+    # on_step(completed, total) follows the run's progress.
+    symbols = shard_symbols(symbol_universe(), run.shard) if symbols is None else list(symbols)
+    steps = {"completed": 0, "total": 2 * len(symbols)}
+
+    def on_progress(symbol, error):
+        RefreshRun.objects.filter(pk=run.pk).update(
+            completed=F("completed") + 1,
+            errors=F("errors") + (0 if error is None else 1),
+        )
+        steps["completed"] += 1
+        if on_step is not None:
+            on_step(steps["completed"], steps["total"])
+
+    RefreshRun.objects.filter(pk=run.pk).update(
+        state=RefreshRun.RUNNING,
+        started_at=run.started_at or timezone.now(),
+        total=steps["total"],
+        completed=0,
+        errors=0,
+    )
+    try:
+        RefreshRun.objects.filter(pk=run.pk).update(phase="quotes")
+        fetch_real_time_data_all(symbols, on_progress=on_progress)
+
+        RefreshRun.objects.filter(pk=run.pk).update(phase="history")
+        fetch_historical_data_in_file_all(full=full, symbols=symbols, on_progress=on_progress)
+
+        RefreshRun.objects.filter(pk=run.pk).update(state=RefreshRun.DONE, phase="", finished_at=timezone.now())
+    except Exception as e:
+        RefreshRun.objects.filter(pk=run.pk).update(
+            state=RefreshRun.FAILED, message=str(e), finished_at=timezone.now()
+        )
+    # After the run is marked finished, so a reader that sees the new
+    # version also sees the new refresh time.
+    bump_data_version()
+    run.refresh_from_db()
+    return run
+
+
+def latest_refresh():
+    return RefreshRun.objects.order_by("-requested_at").first()
+
+
+def last_finished(shard):
+    run = RefreshRun.objects.filter(state=RefreshRun.DONE, shard=shard).order_by("-finished_at").first()
+    return run.finished_at if run else None
+
+
+@per_version
+def refreshed_as_of():
+    # With shards the data is only as fresh as the shard refreshed longest
+    # ago; a full refresh covers them all. Every finished run bumps the data
+    # version, so this is queried once per version.
+    as_of = last_finished("")
+    shards = shard_labels(settings.MARKET_DATA_SHARDS)
+    if shards != [""]:
+        finished = [last_finished(shard) for shard in shards]
+        if None not in finished and (as_of is None or min(finished) > as_of):
+            as_of = min(finished)
+    return as_of
+
+
+def market_data_freshness():
+    # When the stored data was last refreshed and whether that is older
+    # than MARKET_DATA_STALE_AFTER.
+    as_of = refreshed_as_of()
+    stale_after = timedelta(seconds=settings.MARKET_DATA_STALE_AFTER)
+    return {
+        "as_of": as_of,
+        "stale": as_of is None or timezone.now() - as_of > stale_after,
+    }
@@ -0,0 +1,74 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from .models import TrackedSymbol
+from .universe import parse_shard
+
+
+class HoldingSerializer(serializers.Serializer):
+    stock = serializers.CharField(max_length=16)
+    shares = serializers.IntegerField(min_value=0)
+
+
+class InlinePortfolioSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False)
+    name = serializers.CharField(max_length=100, required=False)
+    stocks = HoldingSerializer(many=True)
+
+
+class ValuationRequestSerializer(serializers.Serializer):
+    portfolio_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    portfolios = InlinePortfolioSerializer(many=True, required=False)
+
+    def validate(self, attrs):
+        count = len(attrs.get("portfolio_ids", [])) + len(attrs.get("portfolios", []))
+        if not count:
+            raise serializers.ValidationError("Provide portfolio_ids and/or portfolios.")
+        if count > settings.VALUATION_MAX_PORTFOLIOS:
+            raise serializers.ValidationError(f"At most {settings.VALUATION_MAX_PORTFOLIOS} portfolios per request.")
+        return attrs
+
+
+class TradeSerializer(serializers.Serializer):
+    date = serializers.DateTimeField()
+    stock = serializers.CharField()
+    action = serializers.CharField()
+    price = serializers.FloatField()
+
+
+class ValuationSerializer(serializers.Serializer):
+    id = serializers.CharField(allow_null=True)
+    name = serializers.CharField(allow_null=True)
+    current_value = serializers.FloatField()
+    initial_value = serializers.FloatField()
+    portfolio_gain_loss = serializers.FloatField(allow_null=True)
+    gains = serializers.DictField(child=serializers.FloatField())
+
+
+class JobRequestSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=["simulation", "refresh"])
+    # simulation
+    portfolio_id = serializers.IntegerField(required=False)
+    # refresh
+    shard = serializers.CharField(required=False, allow_blank=True, default="")
+    symbols = serializers.ListField(child=serializers.CharField(max_length=16), required=False, allow_empty=False)
+    full = serializers.BooleanField(required=False, default=False)
+
+    def validate_symbols(self, value):
+        # Only tracked symbols, at most JOBS_MAX_REFRESH_SYMBOLS of them.
+        symbols = sorted({symbol.upper() for symbol in value})
+        if len(symbols) > settings.JOBS_MAX_REFRESH_SYMBOLS:
+            raise serializers.ValidationError(f"At most {settings.JOBS_MAX_REFRESH_SYMBOLS} symbols per job.")
+        tracked = set(TrackedSymbol.objects.filter(active=True, symbol__in=symbols).values_list("symbol", flat=True))
+        unknown = [symbol for symbol in symbols if symbol not in tracked]
+        if unknown:
+            raise serializers.ValidationError(f"Not tracked: {', '.join(unknown)}.")
+        return symbols
+
+    def validate_shard(self, value):
+        if value:
+            try:
+                parse_shard(value)
+            except ValueError as e:
+                raise serializers.ValidationError(str(e))
+        return value
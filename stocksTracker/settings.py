@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,9 +38,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'rest_framework',
+    'stocksTracker',
 ]
 
 MIDDLEWARE = [
+    'stocksTracker.middleware.ViewTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,6 +66,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'stocksTracker.context_processors.market_data',
             ],
         },
     },
@@ -117,7 +122,41 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Market data
+# Views only read stored data; `python manage.py refresh_market_data` keeps it
+# fresh. Pages flag the data as stale once the last refresh is this old.
+
+MARKET_DATA_FETCH_ON_READ = os.environ.get("MARKET_DATA_FETCH_ON_READ", "0") == "1"
+
+MARKET_DATA_STALE_AFTER = 60 * 60
+
+# Number of refresh_market_data workers splitting the symbol universe, each
+# started with --shard i/N. A requested refresh queues one run per shard.
+MARKET_DATA_SHARDS = int(os.environ.get("MARKET_DATA_SHARDS", 1))
+
+# A run still marked running after this many seconds is assumed dead and
+# failed, so its shard can be refreshed again.
+MARKET_DATA_REFRESH_TIMEOUT = int(os.environ.get("MARKET_DATA_REFRESH_TIMEOUT", 6 * 3600))
+
+# Background jobs
+# Simulations and on-demand refreshes are queued in the database and run by
+# `python manage.py run_jobs`. With JOBS_RUN_INLINE=1 they run inside the
+# submitting request instead, for setups without a worker.
+
+JOBS_RUN_INLINE = os.environ.get("JOBS_RUN_INLINE", "0") == "1"
+# How long a finished simulation's trade history stays loaded in the cache,
+# and how long finished jobs are kept before run_jobs deletes them.
+JOBS_RESULT_CACHE_SECONDS = int(os.environ.get("JOBS_RESULT_CACHE_SECONDS", 300))
+JOBS_RETENTION_SECONDS = int(os.environ.get("JOBS_RETENTION_SECONDS", 7 * 24 * 3600))
+# Most symbols one refresh job submitted through /api/jobs/ may name.
+JOBS_MAX_REFRESH_SYMBOLS = int(os.environ.get("JOBS_MAX_REFRESH_SYMBOLS", 100))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Portfolio valuation API
+# Most portfolios (stored ids plus inline ones) one request may value.
+
+VALUATION_MAX_PORTFOLIOS = int(os.environ.get("VALUATION_MAX_PORTFOLIOS", 100))
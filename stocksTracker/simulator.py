@@ -0,0 +1,99 @@
+import numpy as np
+
+from .indicators import forward_fill
+
+BUY = 1
+SELL = -1
+
+
+def execute_events(closes, rows, cols, directions, initial_capital=10000, initial_positions=None,
+                   position_size=None, prices=None):
+    # Walks a chronological event stream once. closes is a dates x symbols
+    # panel and each event (rows[i], cols[i], directions[i]) fills at its
+    # own symbol's close on its own date.
+    #
+    # position_size=None trades one share per signal. Otherwise a BUY spends
+    # that fraction of the cash and a SELL closes the whole position.
+    #
+    # Returns a dict with the final cash and positions, the fills as parallel
+    # arrays (row, col, signed shares, price) and the mark-to-market equity
+    # after each step (one step per distinct event date).
+    closes = np.asarray(closes, dtype=float)
+    prices = forward_fill(closes) if prices is None else prices
+    n_symbols = closes.shape[1]
+    positions = np.zeros(n_symbols) if initial_positions is None else np.array(initial_positions, dtype=float)
+    cash = float(initial_capital)
+
+    fill_rows = []
+    fill_cols = []
+    fill_shares = []
+    fill_prices = []
+    step_rows = []
+    step_equity = []
+    skipped = 0
+
+    n_events = len(rows)
+    for i in range(n_events):
+        row, col, direction = rows[i], cols[i], directions[i]
+        price = closes[row, col]
+
+        if np.isnan(price):
+            skipped += 1
+        elif direction > 0:
+            shares = 1.0 if position_size is None else np.floor(cash * position_size / price)
+            if shares <= 0 or cash < shares * price:
+                skipped += 1
+            else:
+                cash -= shares * price
+                positions[col] += shares
+                fill_rows.append(row)
+                fill_cols.append(col)
+                fill_shares.append(shares)
+                fill_prices.append(price)
+        else:
+            held = positions[col]
+            shares = min(1.0, held) if position_size is None else held
+            if shares <= 0:
+                skipped += 1
+            else:
+                cash += shares * price
+                positions[col] -= shares
+                fill_rows.append(row)
+                fill_cols.append(col)
+                fill_shares.append(-shares)
+                fill_prices.append(price)
+
+        # Mark to market once per date, after its last event.
+        if i == n_events - 1 or rows[i + 1] != row:
+            step_rows.append(row)
+            step_equity.append(cash + np.dot(positions, np.nan_to_num(prices[row])))
+
+    return {
+        "cash": cash,
+        "positions": positions,
+        "fill_rows": np.asarray(fill_rows, dtype=np.int64),
+        "fill_cols": np.asarray(fill_cols, dtype=np.int64),
+        "fill_shares": np.asarray(fill_shares, dtype=float),
+        "fill_prices": np.asarray(fill_prices, dtype=float),
+        "step_rows": np.asarray(step_rows, dtype=np.int64),
+        "step_equity": np.asarray(step_equity, dtype=float),
+        "skipped": skipped,
+    }
+
+
+def signals_to_events(signals, dates, symbols):
+    # Merges every symbol's signals into one date-sorted event stream of
+    # panel coordinates; signals outside the panel are dropped.
+    if len(signals) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.int8)
+
+    rows = dates.get_indexer(signals["date"].to_numpy().astype("datetime64[ns]"))
+    column_of = {symbol: j for j, symbol in enumerate(symbols)}
+    cols = np.array([column_of.get(symbol, -1) for symbol in signals["stock"]], dtype=np.int64)
+    directions = np.where(signals["signal"].to_numpy() == "BUY", BUY, SELL).astype(np.int8)
+
+    keep = (rows >= 0) & (cols >= 0)
+    rows, cols, directions = rows[keep], cols[keep], directions[keep]
+    order = np.lexsort((cols, rows))
+    return rows[order], cols[order], directions[order]
@@ -0,0 +1,45 @@
+from multiprocessing import shared_memory
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from stocksTracker import backtest
+from stocksTracker.backtest import parameter_grid, rank_results, run_sweep
+
+
+class SweepTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.closes = 100 + np.cumsum(rng.normal(0, 1, (300, 4)), axis=0)
+        # A late listing and a gap, so the panel has NaNs like real data.
+        self.closes[:80, 2] = np.nan
+        self.closes[150:160, 3] = np.nan
+
+    def test_sweep_matches_serial_backtests(self):
+        segments = []
+        create = shared_memory.SharedMemory
+
+        def tracked(*args, **kwargs):
+            segment = create(*args, **kwargs)
+            segments.append(segment.name)
+            return segment
+
+        grid = parameter_grid([3, 5, 10], [20, 30], initial_capitals=(10000,), position_sizes=(0.5, 1.0))
+        with mock.patch.object(backtest.shared_memory, "SharedMemory", side_effect=tracked):
+            table = run_sweep(self.closes, [3, 5, 10], [20, 30], position_sizes=(0.5, 1.0), max_workers=2)
+
+        serial = rank_results([backtest.backtest(self.closes, *params) for params in grid])
+        self.assertEqual(len(table), 12)
+        pd.testing.assert_frame_equal(table, serial)
+        self.assertGreater(table["trade_count"].min(), 0)
+
+        # The parent unlinks the panel once the workers are done.
+        self.assertEqual(len(segments), 1)
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=segments[0])
+
+    def test_empty_grid_or_panel(self):
+        self.assertEqual(len(run_sweep(self.closes, [20], [5])), 0)
+        self.assertEqual(len(run_sweep(np.empty((0, 0)), [5], [20])), 0)
@@ -0,0 +1,55 @@
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+
+from stocksTracker import price_store
+from stocksTracker.bar_aggregator import BarAggregator
+
+MINUTE = 60 * 10**9
+START = 1_702_000_800 * 10**9  # a whole hour
+
+
+class BarAggregatorTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def aggregator(self):
+        return BarAggregator(frequencies=("1m", "5m"), directory=self.directory)
+
+    def test_quotes_build_bars_and_flush_to_the_store(self):
+        bars = self.aggregator()
+        bars.update("AAPL", 10.0, 100, START)
+        bars.update("AAPL", 12.0, 150, START + 10 * 10**9)
+        bars.update("AAPL", 9.0, 175, START + 20 * 10**9)
+        bars.update("AAPL", 11.0, 200, START + MINUTE)
+        self.assertEqual(bars.open_bar("AAPL", "5m"), (START, 10.0, 12.0, 9.0, 11.0, 100))
+        self.assertEqual(bars.flush(), 1)
+
+        stored = price_store.load_bars("AAPL", self.directory, "1m")
+        self.assertEqual(len(stored), 1)
+        self.assertEqual((stored["open"][0], stored["high"][0], stored["low"][0], stored["close"][0]), (10.0, 12.0, 9.0, 9.0))
+        self.assertEqual(stored["volume"][0], 75)
+
+    def test_state_survives_a_restart(self):
+        bars = self.aggregator()
+        bars.update("AAPL", 10.0, 100, START)
+        bars.flush()
+
+        restarted = self.aggregator()
+        restarted.update("AAPL", 11.0, 130, START + 10 * 10**9)
+        self.assertEqual(restarted.open_bar("AAPL", "1m"), (START, 10.0, 11.0, 10.0, 11.0, 30))
+
+    def test_shards_do_not_overwrite_each_others_state(self):
+        shard_a, shard_b = self.aggregator(), self.aggregator()
+        shard_a.update("AAPL", 10.0, 100, START)
+        shard_b.update("MSFT", 20.0, 200, START)
+        shard_a.flush()
+        shard_b.flush()
+        shard_a.update("AAPL", 10.5, 110, START + 10 * 10**9)
+        shard_a.flush()
+
+        restarted = self.aggregator()
+        self.assertEqual(restarted.open_bar("AAPL", "1m")[4], 10.5)
+        self.assertEqual(restarted.open_bar("MSFT", "1m"), (START, 20.0, 20.0, 20.0, 20.0, 0))
@@ -0,0 +1,88 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from django.test import SimpleTestCase
+
+from stocksTracker.fetch_engine import FetchEngine
+from stocksTracker.rate_limiter import ProviderThrottled
+
+
+class StubProvider(BaseHTTPRequestHandler):
+    # Answers like Alpha Vantage: GLOBAL_QUOTE for any symbol, except
+    # THROTTLE (over-quota note), BROKEN (HTTP 500) and FLAKY (HTTP 500 on
+    # the first call only).
+    def do_GET(self):
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        server = self.server
+        with server.lock:
+            server.calls.append(params)
+            calls = sum(1 for call in server.calls if call.get("symbol") == params.get("symbol"))
+        symbol = params.get("symbol")
+        if symbol == "BROKEN" or (symbol == "FLAKY" and calls == 1):
+            self.send_response(500)
+            self.end_headers()
+            return
+        if symbol == "THROTTLE":
+            payload = {"Note": "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day."}
+        else:
+            payload = {"Global Quote": {"01. symbol": symbol, "05. price": "101.5000", "06. volume": "1200"}}
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FetchEngineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubProvider)
+        cls.server.lock = threading.Lock()
+        cls.server.calls = []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        with self.server.lock:
+            self.server.calls.clear()
+        self.engine = FetchEngine(api_key="demo", base_url=f"http://127.0.0.1:{self.server.server_port}/",
+                                  concurrency=4, timeout=5, retries=1, backoff=0)
+        self.addCleanup(self.engine.close)
+
+    def test_get_sends_api_key(self):
+        payload = self.engine.get({"function": "GLOBAL_QUOTE", "symbol": "AAPL"})
+        self.assertEqual(payload["Global Quote"]["05. price"], "101.5000")
+        self.assertEqual(self.server.calls[0]["apikey"], "demo")
+
+    def test_batch_returns_each_symbol_and_keeps_failures_separate(self):
+        done = []
+        results, errors = self.engine.fetch_batch(
+            "GLOBAL_QUOTE", ["AAPL", "MSFT", "BROKEN", "AAPL"], on_result=lambda symbol, error: done.append(symbol)
+        )
+        self.assertEqual(sorted(results), ["AAPL", "MSFT"])
+        self.assertEqual(list(errors), ["BROKEN"])
+        self.assertIsInstance(errors["BROKEN"], requests.HTTPError)
+        self.assertEqual(sorted(done), ["AAPL", "BROKEN", "MSFT"])
+
+    def test_server_errors_are_retried(self):
+        payload = self.engine.get({"function": "GLOBAL_QUOTE", "symbol": "FLAKY"})
+        self.assertEqual(payload["Global Quote"]["01. symbol"], "FLAKY")
+        self.assertEqual(len(self.server.calls), 2)
+
+    def test_throttle_note_raises_without_retry(self):
+        with self.assertRaises(ProviderThrottled):
+            self.engine.get({"function": "GLOBAL_QUOTE", "symbol": "THROTTLE"})
+        self.assertEqual(len(self.server.calls), 1)
@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from stocksTracker import frame_cache
+from stocksTracker.frame_cache import FrameCache
+
+
+class FrameCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "AAPL.bars")
+        with open(self.path, "w") as file:
+            file.write("v1")
+        self.loads = 0
+
+    def loader(self):
+        self.loads += 1
+        return pd.DataFrame({"close": [1.0, 2.0, 3.0]}, index=pd.date_range("2024-12-11", periods=3, name="date"))
+
+    def assertIsolated(self, cache):
+        frame = cache.get(self.path, self.loader)
+        frame.loc[frame.index[0], "close"] = 99.0
+        frame["close"] *= 2
+        frame["MA_5"] = frame["close"].rolling(5).mean()
+        frame.drop(frame.index[-1], inplace=True)
+
+        again = cache.get(self.path, self.loader)
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(again["close"].tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(list(again.columns), ["close"])
+
+    def test_callers_cannot_change_the_cached_frame(self):
+        self.assertIsolated(FrameCache())
+
+    def test_without_copy_on_write_callers_get_deep_copies(self):
+        with mock.patch.object(frame_cache, "copy_on_write_enabled", return_value=False):
+            self.assertIsolated(FrameCache())
+
+    def test_file_change_reloads(self):
+        cache = FrameCache()
+        cache.get(self.path, self.loader)
+        with open(self.path, "w") as file:
+            file.write("v2 longer")
+        cache.get(self.path, self.loader)
+        self.assertEqual(self.loads, 2)
+
+    def test_memory_budget_evicts(self):
+        cache = FrameCache(max_bytes=1)
+        cache.get(self.path, self.loader)
+        cache.get(self.path, self.loader)
+        self.assertEqual((self.loads, cache.stats()["entries"]), (2, 0))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from stocksTracker.indicators import align_panel, pack_panel, rolling_means_panel
+from stocksTracker.tracker_scripts import analyze_panel, calculate_moving_averages, generate_trade_signals
+
+
+def random_walk(rng, count):
+    return 100 + np.cumsum(rng.normal(0, 1, count))
+
+
+class PanelTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        calendar = pd.bdate_range(end="2024-12-13", periods=400, name="date")
+        # Unequal histories: a full one, a late listing, a short one, one
+        # with trading gaps and one too short for the long window.
+        self.frames = {}
+        for symbol, dates in {
+            "FULL": calendar,
+            "LATE": calendar[150:],
+            "SHORT": calendar[-30:],
+            "GAPS": calendar[rng.random(len(calendar)) > 0.2],
+            "TINY": calendar[-12:],
+        }.items():
+            self.frames[symbol] = pd.DataFrame({"close": random_walk(rng, len(dates))}, index=dates)
+
+    def loop_signals(self):
+        # The per-symbol path: moving averages and crossovers one frame at a time.
+        frames = []
+        for symbol, df in self.frames.items():
+            df = df.copy()
+            calculate_moving_averages(df)
+            frames.append(generate_trade_signals(df, symbol))
+        return pd.concat(frames, ignore_index=True)
+
+    def panel(self):
+        return align_panel({
+            symbol: (df.index.values.astype("datetime64[ns]").view("i8"), df["close"].to_numpy())
+            for symbol, df in self.frames.items()
+        })
+
+    def test_panel_signals_match_the_per_symbol_loop(self):
+        expected = self.loop_signals()
+        actual = analyze_panel(*self.panel())
+        self.assertGreater(len(expected), 20)
+        pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected, check_dtype=False)
+
+    def test_rolling_means_match_pandas_on_each_symbols_own_bars(self):
+        _, symbols, closes = self.panel()
+        packed, rows = pack_panel(closes)
+        means = rolling_means_panel(packed, (5, 20))
+        for j, symbol in enumerate(symbols):
+            close = self.frames[symbol]["close"]
+            count = len(close)
+            for window in (5, 20):
+                np.testing.assert_allclose(means[window][:count, j], close.rolling(window).mean().to_numpy(),
+                                           rtol=1e-10, equal_nan=True)
+                self.assertTrue(np.isnan(means[window][count:, j]).all())
+            # Packed cells point back at the symbol's own dates.
+            np.testing.assert_array_equal(np.sort(rows[:count, j]), np.flatnonzero(~np.isnan(closes[:, j])))
+
+    def test_empty_panel(self):
+        dates, symbols, closes = align_panel({})
+        self.assertEqual(len(analyze_panel(dates, symbols, closes)), 0)
@@ -0,0 +1,189 @@
+from datetime import timedelta
+
+import pandas as pd
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from stocksTracker.jobs import (
+    JOB_HANDLERS, claim_job, job_handler, prune_jobs, requeue_stale_jobs, run_job, submit_job,
+)
+from stocksTracker.models import Holding, Job, Portfolio, TrackedSymbol
+from stocksTracker.trade_history import TradeHistory
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        @job_handler("test-echo")
+        def echo(job, progress):
+            progress(1, 2)
+            progress(2, 2)
+            return {"echo": job.params}, b"artifact"
+
+        @job_handler("test-fail")
+        def fail(job, progress):
+            raise RuntimeError("boom")
+
+        self.addCleanup(JOB_HANDLERS.pop, "test-echo")
+        self.addCleanup(JOB_HANDLERS.pop, "test-fail")
+
+    def test_identical_pending_jobs_are_shared(self):
+        job = submit_job("test-echo", {"a": 1, "b": 2})
+        self.assertEqual(submit_job("test-echo", {"b": 2, "a": 1}).pk, job.pk)
+        self.assertNotEqual(submit_job("test-echo", {"a": 2}).pk, job.pk)
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_unknown_kind_is_rejected(self):
+        with self.assertRaises(ValueError):
+            submit_job("nope")
+
+    def test_reuse_finished_reuses_done_but_retries_failed(self):
+        done = run_job(claim_job(submit_job("test-echo", {"a": 1}).pk))
+        self.assertEqual(submit_job("test-echo", {"a": 1}, reuse_finished=True).pk, done.pk)
+        self.assertNotEqual(submit_job("test-echo", {"a": 1}).pk, done.pk)
+
+        with self.assertLogs("stocksTracker.jobs", "ERROR"):
+            failed = run_job(claim_job(submit_job("test-fail").pk))
+        self.assertNotEqual(submit_job("test-fail", reuse_finished=True).pk, failed.pk)
+
+    def test_claim_takes_the_oldest_pending_job_once(self):
+        first = submit_job("test-echo", {"n": 1})
+        second = submit_job("test-echo", {"n": 2})
+        self.assertEqual(claim_job().pk, first.pk)
+        self.assertIsNone(claim_job(first.pk))
+        claimed = claim_job()
+        self.assertEqual(claimed.pk, second.pk)
+        self.assertEqual(claimed.state, Job.RUNNING)
+        self.assertIsNotNone(claimed.started_at)
+        self.assertIsNone(claim_job())
+
+    def test_run_job_stores_result_artifact_and_progress(self):
+        job = run_job(claim_job(submit_job("test-echo", {"a": 1}).pk))
+        self.assertEqual(job.state, Job.DONE)
+        self.assertEqual(job.result, {"echo": {"a": 1}})
+        self.assertEqual(bytes(job.artifact), b"artifact")
+        self.assertEqual((job.completed, job.total), (2, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failures_are_logged_and_kept_on_the_job(self):
+        with self.assertLogs("stocksTracker.jobs", "ERROR") as logs:
+            job = run_job(claim_job(submit_job("test-fail").pk))
+        self.assertEqual(job.state, Job.FAILED)
+        self.assertEqual(job.error, "boom")
+        self.assertIn("RuntimeError: boom", logs.output[0])
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = claim_job(submit_job("test-echo").pk)
+        self.assertEqual(requeue_stale_jobs(3600), 0)
+        Job.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(requeue_stale_jobs(3600), 1)
+        self.assertEqual(claim_job().pk, job.pk)
+
+    def test_prune_deletes_only_old_finished_jobs(self):
+        old = run_job(claim_job(submit_job("test-echo", {"n": 1}).pk))
+        recent = run_job(claim_job(submit_job("test-echo", {"n": 2}).pk))
+        pending = submit_job("test-echo", {"n": 3})
+        Job.objects.filter(pk=old.pk).update(finished_at=timezone.now() - timedelta(days=30))
+        self.assertEqual(prune_jobs(7 * 24 * 3600), 1)
+        self.assertEqual(set(Job.objects.values_list("pk", flat=True)), {recent.pk, pending.pk})
+
+    @override_settings(JOBS_RUN_INLINE=True)
+    def test_inline_mode_runs_the_job_in_the_caller(self):
+        job = submit_job("test-echo", {"a": 1})
+        self.assertEqual(job.state, Job.DONE)
+        self.assertEqual(job.result, {"echo": {"a": 1}})
+
+
+class SimulationJobViewTests(TestCase):
+    def setUp(self):
+        self.owner = self.client_for(self.create_portfolio("Owner"))
+        self.other = self.client_for(self.create_portfolio("Other"))
+        self.portfolio_id = self.owner.session["portfolio_id"]
+
+    def create_portfolio(self, name):
+        portfolio = Portfolio.objects.create(name=name, email=f"{name.lower()}@example.com", phone="5550100")
+        Holding.objects.create(portfolio=portfolio, symbol="AAPL", shares=10)
+        return portfolio
+
+    def client_for(self, portfolio):
+        client = self.client_class()
+        session = client.session
+        session["portfolio_id"] = portfolio.pk
+        session.save()
+        return client
+
+    def finished_simulation(self):
+        history = TradeHistory(pd.DatetimeIndex(["2024-12-12", "2024-12-13"], name="date"), ["AAPL"],
+                               [0, 1], [0, 0], [10, -10], [100.0, 110.0])
+        return Job.objects.create(
+            kind="simulation", params={"portfolio_id": self.portfolio_id, "version": "test"}, dedup_key="test",
+            state=Job.DONE, finished_at=timezone.now(), artifact=history.to_bytes(),
+            result={"total_capital": 10100.0, "total_portfolio_value": 0.0, "trades": 2},
+        )
+
+    def test_reading_the_results_page_queues_nothing(self):
+        response = self.owner.get("/run-simulation/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Job.objects.count(), 0)
+        self.assertEqual(self.owner.get("/api/simulation/trades/").status_code, 404)
+
+    def test_post_queues_one_simulation(self):
+        response = self.owner.post("/run-simulation/")
+        job = Job.objects.get()
+        self.assertRedirects(response, f"/run-simulation/?job={job.pk}", fetch_redirect_response=False)
+        self.assertEqual(job.params["portfolio_id"], self.portfolio_id)
+        self.owner.post("/run-simulation/")
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_owner_reads_results_and_trades(self):
+        job = self.finished_simulation()
+        result = self.owner.get(f"/api/jobs/{job.pk}/result/").json()
+        self.assertEqual(result["trades"], 2)
+        trades = self.owner.get(result["trades_url"]).json()
+        self.assertEqual([trade["action"] for trade in trades["results"]], ["BUY", "SELL"])
+
+        page = self.owner.get(f"/run-simulation/?job={job.pk}").content.decode()
+        self.assertIn(f"/api/simulation/trades.csv?job={job.pk}", page)
+
+    def test_other_sessions_cannot_see_the_simulation(self):
+        job = self.finished_simulation()
+        for url in [f"/api/jobs/{job.pk}/", f"/api/jobs/{job.pk}/result/",
+                    f"/api/simulation/trades/?job={job.pk}", f"/api/simulation/trades.csv?job={job.pk}"]:
+            self.assertEqual(self.other.get(url).status_code, 404, url)
+        self.assertNotContains(self.other.get(f"/run-simulation/?job={job.pk}"), "Final Capital")
+
+    def test_api_only_simulates_the_sessions_portfolio(self):
+        response = self.other.post("/api/jobs/", {"kind": "simulation", "portfolio_id": self.portfolio_id},
+                                   content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+        response = self.other.post("/api/jobs/", {"kind": "simulation"}, content_type="application/json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Job.objects.get().params["portfolio_id"], self.other.session["portfolio_id"])
+
+
+class RefreshJobApiTests(TestCase):
+    def setUp(self):
+        # AAPL and MSFT come with the seeded universe.
+        TrackedSymbol.objects.update_or_create(symbol="OLD", defaults={"active": False})
+
+    def post(self, **data):
+        return self.client.post("/api/jobs/", {"kind": "refresh", **data}, content_type="application/json")
+
+    def test_only_staff_can_queue_refreshes(self):
+        self.assertEqual(self.post(symbols=["AAPL"]).status_code, 403)
+        self.client.force_login(User.objects.create_user("user", password="x"))
+        self.assertEqual(self.post(symbols=["AAPL"], full=True).status_code, 403)
+        self.assertEqual(Job.objects.count(), 0)
+
+    def test_staff_refresh_only_tracked_symbols(self):
+        self.client.force_login(User.objects.create_user("ops", password="x", is_staff=True))
+        self.assertEqual(self.post(symbols=["AAPL", "NOPE"]).status_code, 400)
+        self.assertEqual(self.post(symbols=["OLD"]).status_code, 400)
+        response = self.post(symbols=["msft", "AAPL"])
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Job.objects.get().params["symbols"], ["AAPL", "MSFT"])
+
+    @override_settings(JOBS_MAX_REFRESH_SYMBOLS=1)
+    def test_request_size_is_limited(self):
+        self.client.force_login(User.objects.create_user("ops", password="x", is_staff=True))
+        self.assertEqual(self.post(symbols=["AAPL", "MSFT"]).status_code, 400)
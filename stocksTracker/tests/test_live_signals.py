@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from stocksTracker import tracker_scripts
+
+
+class LiveSignalTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        for patcher in [
+            mock.patch.object(tracker_scripts, "INDICATOR_STATE_DIR", self.directory),
+            mock.patch.object(tracker_scripts, "STREAMING_INDICATORS", {}),
+            mock.patch.object(tracker_scripts, "LIVE_DIRTY", set()),
+            # No stored bars: every symbol starts from an empty indicator.
+            mock.patch.object(tracker_scripts.price_store, "load_bars", return_value=None),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def feed(self, symbol, prices):
+        start = datetime(2024, 12, 1, 16)
+        for day, price in enumerate(prices):
+            tracker_scripts.update_live_signal({"symbol": symbol, "price": str(price), "timestamp": start + timedelta(days=day)})
+
+    def test_state_is_saved_once_per_batch(self):
+        self.feed("AAPL", [10.0] * 25)
+        self.assertEqual(os.listdir(self.directory), [])
+
+        tracker_scripts.save_live_signals()
+        self.assertEqual(os.listdir(self.directory), ["AAPL.json"])
+        self.assertEqual(tracker_scripts.LIVE_DIRTY, set())
+
+    def test_readers_see_the_last_saved_batch(self):
+        self.feed("AAPL", [10.0] * 20 + [20.0])
+        tracker_scripts.save_live_signals()
+
+        # A reader with no in-memory state, like a web process.
+        with mock.patch.object(tracker_scripts, "STREAMING_INDICATORS", {}):
+            signal = tracker_scripts.live_signal("AAPL")
+        self.assertEqual(signal["signal"], "BUY")
+        self.assertEqual(signal["date"], "2024-12-21")
+        self.assertAlmostEqual(signal["MA_5"], 12.0)
+        self.assertAlmostEqual(signal["MA_20"], 10.5)
+
+    def test_symbols_without_state_or_history_are_skipped(self):
+        self.feed("AAPL", [10.0, 11.0])
+        tracker_scripts.save_live_signals()
+        signals = tracker_scripts.live_signals(["AAPL", "MSFT"])
+        self.assertEqual([signal["stock"] for signal in signals], ["AAPL"])
+        self.assertIsNone(signals[0]["MA_20"])
@@ -0,0 +1,28 @@
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from stocksTracker import price_store, tracker_scripts
+
+
+def daily_bars(count):
+    df = pd.DataFrame(
+        {column: np.arange(count, dtype=float) + 1 for column in price_store.PRICE_COLUMNS},
+        index=pd.date_range("1999-11-01", periods=count, freq="D"),
+    )
+    return price_store.dataframe_to_bars(df)
+
+
+class PerformanceBaselineTests(SimpleTestCase):
+    def baseline(self, bars):
+        with mock.patch.object(tracker_scripts, "load_bars", return_value=bars):
+            return tracker_scripts.fetch_historical_data_from_file("AAPL")
+
+    def test_full_history_is_measured_over_the_window(self):
+        # A full sync stores far more than the window; the baseline must not move.
+        self.assertEqual(self.baseline(daily_bars(5000)), (4901.0, 4901.0))
+
+    def test_short_history_starts_at_the_oldest_bar(self):
+        self.assertEqual(self.baseline(daily_bars(30)), (1.0, 1.0))
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import threading
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from stocksTracker import price_store
+
+
+def bars(rows):
+    # rows: [(date, close)]; the other prices follow the close.
+    df = pd.DataFrame(
+        {column: [close for _, close in rows] for column in price_store.PRICE_COLUMNS},
+        index=pd.DatetimeIndex([date for date, _ in rows]),
+    )
+    return price_store.dataframe_to_bars(df)
+
+
+class PriceStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def closes(self):
+        stored = price_store.bars_to_dataframe(price_store.load_bars("AAPL", self.directory))
+        return {date.strftime("%Y-%m-%d"): close for date, close in stored["close"].items()}
+
+    def test_append_adds_only_newer_bars(self):
+        price_store.write_bars("AAPL", bars([("2024-12-12", 1.0), ("2024-12-13", 2.0)]), self.directory)
+        written = price_store.append_bars("AAPL", bars([("2024-12-11", 9.0), ("2024-12-13", 2.0), ("2024-12-16", 3.0)]),
+                                          self.directory)
+        self.assertEqual(written, 1)
+        self.assertEqual(self.closes(), {"2024-12-12": 1.0, "2024-12-13": 2.0, "2024-12-16": 3.0})
+
+    def test_append_revises_the_last_stored_bar(self):
+        # A close saved mid-session is corrected by the next sync.
+        price_store.write_bars("AAPL", bars([("2024-12-12", 1.0), ("2024-12-13", 2.0)]), self.directory)
+        written = price_store.append_bars("AAPL", bars([("2024-12-13", 2.9), ("2024-12-16", 3.0)]), self.directory)
+        self.assertEqual(written, 2)
+        self.assertEqual(self.closes(), {"2024-12-12": 1.0, "2024-12-13": 2.9, "2024-12-16": 3.0})
+
+    def test_unchanged_bars_write_nothing(self):
+        price_store.write_bars("AAPL", bars([("2024-12-13", 2.0)]), self.directory)
+        self.assertEqual(price_store.append_bars("AAPL", bars([("2024-12-13", 2.0)]), self.directory), 0)
+        self.assertEqual(self.closes(), {"2024-12-13": 2.0})
+
+    def test_merge_keeps_stored_history(self):
+        price_store.write_bars("AAPL", bars([("2024-12-12", 1.0), ("2024-12-13", 2.0)]), self.directory)
+        price_store.merge_bars("AAPL", bars([("2024-12-13", 2.9), ("2024-12-16", 3.0)]), self.directory)
+        self.assertEqual(self.closes(), {"2024-12-12": 1.0, "2024-12-13": 2.9, "2024-12-16": 3.0})
+
+    def test_concurrent_writers_never_tear_the_file(self):
+        days = pd.date_range("2024-01-01", periods=200, freq="D")
+        full = bars([(day, float(i)) for i, day in enumerate(days)])
+        errors = []
+
+        def writer(offset):
+            try:
+                for i in range(20):
+                    if i % 2:
+                        price_store.write_bars("AAPL", full[:100 + offset], self.directory)
+                    else:
+                        price_store.append_bars("AAPL", full[:150 + offset], self.directory)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        path = price_store.bars_path("AAPL", self.directory)
+        self.assertEqual(os.path.getsize(path) % price_store.BAR_DTYPE.itemsize, 0)
+        stored = price_store.load_bars("AAPL", self.directory)
+        self.assertTrue((stored == full[:len(stored)]).all())
+        self.assertEqual([name for name in os.listdir(self.directory) if name.endswith(".tmp")], [])
@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+
+from stocksTracker.providers import AlphaVantageProvider, FileReplayProvider, Provider, build_provider
+
+
+class FakeEngine:
+    concurrency = 2
+
+    def __init__(self, payloads):
+        # {(function, symbol): payload}; unknown calls raise.
+        self.payloads = payloads
+        self.calls = []
+
+    def get(self, params, priority):
+        self.calls.append(params)
+        key = (params["function"], params["symbol"])
+        if key not in self.payloads:
+            raise RuntimeError(f"unexpected call {key}")
+        return self.payloads[key]
+
+    def fetch_daily_series(self, symbols, outputsize, priority, on_result):
+        return {symbol: self.payloads[("TIME_SERIES_DAILY", symbol)] for symbol in symbols}, {}
+
+    def close(self):
+        pass
+
+
+def bulk_item(symbol, close):
+    return {"symbol": symbol, "timestamp": "2024-12-13 16:00:00", "open": "1", "close": close, "volume": "900"}
+
+
+class ProviderTests(SimpleTestCase):
+    def test_base_provider_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Provider()
+
+    def test_unknown_provider_is_rejected(self):
+        with self.assertRaises(ValueError):
+            build_provider("nope", FakeEngine({}))
+
+
+class AlphaVantageProviderTests(SimpleTestCase):
+    def test_bulk_quotes_are_parsed_per_symbol(self):
+        engine = FakeEngine({("REALTIME_BULK_QUOTES", "AAPL,MSFT,NOPE,IBM"): {"data": [
+            bulk_item("AAPL", "250.1"),
+            bulk_item("MSFT", "440.5"),
+            # Not requested, and no close: both ignored.
+            bulk_item("TSLA", "400.0"),
+            {"symbol": "IBM", "close": None},
+        ]}})
+        provider = AlphaVantageProvider(engine, bulk=True)
+        quotes, errors = provider.fetch_quotes(["AAPL", "MSFT", "NOPE", "IBM"])
+        self.assertEqual(quotes, {
+            "AAPL": {"symbol": "AAPL", "price": "250.1", "volume": "900"},
+            "MSFT": {"symbol": "MSFT", "price": "440.5", "volume": "900"},
+        })
+        self.assertEqual(sorted(errors), ["IBM", "NOPE"])
+        self.assertIsInstance(errors["NOPE"], LookupError)
+        self.assertEqual(provider.round_trips, 1)
+
+    def test_bulk_requests_are_chunked(self):
+        symbols = [f"S{i:03d}" for i in range(150)]
+        engine = FakeEngine({
+            ("REALTIME_BULK_QUOTES", ",".join(chunk)): {"data": [bulk_item(symbol, "1.0") for symbol in chunk]}
+            for chunk in (symbols[:100], symbols[100:])
+        })
+        provider = AlphaVantageProvider(engine, bulk=True)
+        quotes, errors = provider.fetch_quotes(symbols)
+        self.assertEqual((len(quotes), errors, provider.round_trips), (150, {}, 2))
+
+    def test_a_failed_bulk_call_fails_its_symbols(self):
+        provider = AlphaVantageProvider(FakeEngine({}), bulk=True)
+        quotes, errors = provider.fetch_quotes(["AAPL", "MSFT"])
+        self.assertEqual(quotes, {})
+        self.assertIsInstance(errors["AAPL"], RuntimeError)
+
+    def test_without_bulk_each_symbol_is_a_global_quote(self):
+        engine = FakeEngine({
+            ("GLOBAL_QUOTE", "AAPL"): {"Global Quote": {"01. symbol": "AAPL", "05. price": "250.1", "06. volume": "9"}},
+            ("GLOBAL_QUOTE", "NOPE"): {"Global Quote": {}},
+        })
+        quotes, errors = AlphaVantageProvider(engine).fetch_quotes(["AAPL", "NOPE"])
+        self.assertEqual(quotes, {"AAPL": {"symbol": "AAPL", "price": "250.1", "volume": "9"}})
+        self.assertEqual(list(errors), ["NOPE"])
+
+
+class FileReplayProviderTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.record("GLOBAL_QUOTE", "AAPL", {"Global Quote": {"01. symbol": "AAPL", "05. price": "250.1", "06. volume": "9"}})
+        self.record("GLOBAL_QUOTE", "EMPTY", {"Global Quote": {}})
+        self.series = {"2024-12-13": {"1. open": "1", "2. high": "2", "3. low": "0.5", "4. close": "1.5", "5. volume": "10"}}
+        self.record("TIME_SERIES_DAILY", "AAPL", {"Time Series (Daily)": self.series})
+        self.provider = build_provider("replay", None, replay_dir=self.directory)
+
+    def record(self, function, symbol, payload):
+        os.makedirs(os.path.join(self.directory, function), exist_ok=True)
+        with open(os.path.join(self.directory, function, f"{symbol}.json"), "w") as file:
+            json.dump(payload, file)
+
+    def test_quotes_come_from_recordings_in_one_round_trip(self):
+        quotes, errors = self.provider.fetch_quotes(["AAPL", "EMPTY", "MISSING"])
+        self.assertEqual(quotes, {"AAPL": {"symbol": "AAPL", "price": "250.1", "volume": "9"}})
+        self.assertEqual(sorted(errors), ["EMPTY", "MISSING"])
+        self.assertEqual(self.provider.round_trips, 1)
+        self.assertEqual(self.provider.fetch_quote("AAPL")["price"], "250.1")
+
+    def test_daily_series_reports_missing_recordings(self):
+        done = []
+        series, errors = self.provider.fetch_daily_series(["AAPL", "MISSING"],
+                                                          on_result=lambda symbol, error: done.append(symbol))
+        self.assertEqual(series, {"AAPL": self.series})
+        self.assertIsInstance(errors["MISSING"], FileNotFoundError)
+        self.assertEqual(done, ["AAPL", "MISSING"])
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from stocksTracker.quote_cache import QuoteCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class QuoteCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = QuoteCache(ttl=60, max_entries=3, clock=self.clock)
+        self.loads = []
+
+    def loader(self, symbol):
+        self.loads.append(symbol)
+        return 100.0 + len(self.loads), 10
+
+    def test_hit_within_ttl_and_reload_after(self):
+        self.assertEqual(self.cache.get("AAPL", self.loader), (101.0, 10))
+        self.clock.now = 59
+        self.assertEqual(self.cache.get("AAPL", self.loader), (101.0, 10))
+        self.clock.now = 61
+        self.assertEqual(self.cache.get("AAPL", self.loader), (102.0, 10))
+        stats = self.cache.stats()
+        self.assertEqual((stats["misses"], stats["hits"], stats["stale"], stats["loads"]), (1, 1, 1, 2))
+
+    def test_stale_quote_is_kept_when_the_reload_fails(self):
+        self.cache.put("AAPL", 150.0, 5)
+        self.clock.now = 120
+        self.assertEqual(self.cache.get("AAPL", lambda symbol: (None, None)), (150.0, 5))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        for symbol in ["A", "B", "C"]:
+            self.cache.put(symbol, 1.0, 1)
+        self.cache.get("A", self.loader)
+        self.cache.put("D", 1.0, 1)
+        self.assertIsNone(self.cache.peek("B"))
+        self.assertIsNotNone(self.cache.peek("A"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_concurrent_misses_load_once(self):
+        release = threading.Event()
+        calls = []
+
+        def slow(symbol):
+            calls.append(symbol)
+            release.wait(5)
+            return 42.0, 1
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get("AAPL", slow))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while not calls:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, [(42.0, 1)] * 5)
+        self.assertEqual(calls, ["AAPL"])
+
+    def test_warm_runs_once_per_version(self):
+        rows = [("AAPL", 10.0, 1), ("MSFT", 20.0, 2)]
+        self.cache.warm(lambda: rows, version="v1")
+        self.cache.put("GOOGL", 30.0, 3)
+        rows = [("AAPL", 11.0, 1)]
+        self.cache.warm(lambda: rows, version="v1")
+        self.assertEqual(self.cache.peek("AAPL")[0], 10.0)
+
+        # A new version drops everything cached under the old one.
+        self.cache.warm(lambda: rows, version="v2")
+        self.assertEqual(self.cache.peek("AAPL")[0], 11.0)
+        self.assertIsNone(self.cache.peek("MSFT"))
+        self.assertIsNone(self.cache.peek("GOOGL"))
@@ -0,0 +1,145 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from stocksTracker.rate_limiter import BULK, INTERACTIVE, QuotaExceeded, RequestScheduler, SharedBudget, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_refills_at_capacity_per_period(self):
+        clock = FakeClock()
+        bucket = TokenBucket(5, 60.0, clock)
+        for _ in range(5):
+            self.assertEqual(bucket.wait_time(clock()), 0.0)
+            bucket.take(clock())
+        self.assertAlmostEqual(bucket.wait_time(clock()), 12.0)
+
+        clock.now += 12.0
+        self.assertEqual(bucket.wait_time(clock()), 0.0)
+
+        # Never refills past capacity.
+        clock.now += 3600
+        bucket.wait_time(clock())
+        self.assertEqual(bucket.tokens, 5.0)
+
+    def test_drain_empties_the_bucket(self):
+        clock = FakeClock()
+        bucket = TokenBucket(5, 60.0, clock)
+        bucket.drain(clock())
+        self.assertAlmostEqual(bucket.wait_time(clock()), 12.0)
+
+
+class RequestSchedulerTests(SimpleTestCase):
+    def test_rejects_when_the_wait_exceeds_max_wait(self):
+        scheduler = RequestScheduler(per_minute=2, per_day=100, max_wait=5, clock=FakeClock())
+        self.assertEqual(scheduler.run("a", lambda: 1), 1)
+        self.assertEqual(scheduler.run("b", lambda: 2), 2)
+        with self.assertRaises(QuotaExceeded):
+            scheduler.run("c", lambda: 3)
+        self.assertEqual(scheduler.metrics()["rejected"], 1)
+
+    def test_daily_budget_is_enforced(self):
+        scheduler = RequestScheduler(per_minute=100, per_day=1, max_wait=5, clock=FakeClock())
+        scheduler.run("a", lambda: 1)
+        with self.assertRaises(QuotaExceeded):
+            scheduler.run("b", lambda: 2)
+
+    def test_provider_throttle_drains_the_minute_bucket(self):
+        scheduler = RequestScheduler(per_minute=10, per_day=100, max_wait=1, clock=FakeClock())
+        scheduler.report_throttled()
+        with self.assertRaises(QuotaExceeded):
+            scheduler.run("a", lambda: 1)
+        self.assertEqual(scheduler.metrics()["throttled"], 1)
+
+    def test_identical_calls_in_flight_share_one_request(self):
+        scheduler = RequestScheduler(per_minute=100, per_day=100)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "quote"
+
+        results = []
+        owner = threading.Thread(target=lambda: results.append(scheduler.run("AAPL", slow)))
+        owner.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(scheduler.run("AAPL", slow)))
+        follower.start()
+        while scheduler.metrics()["coalesced"] == 0:
+            time.sleep(0.01)
+        release.set()
+        owner.join(5)
+        follower.join(5)
+
+        self.assertEqual(results, ["quote", "quote"])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(scheduler.metrics()["coalesced"], 1)
+
+    def test_interactive_calls_are_served_before_queued_bulk_calls(self):
+        # Two tokens a second, drained, so both callers have to queue.
+        scheduler = RequestScheduler(per_minute=120, per_day=1000, max_wait=10)
+        scheduler.report_throttled()
+        order = []
+
+        bulk = threading.Thread(target=scheduler.run, args=("bulk", lambda: order.append("bulk"), BULK))
+        bulk.start()
+        while scheduler.metrics()["queue_depth"] < 1:
+            time.sleep(0.005)
+        interactive = threading.Thread(target=scheduler.run, args=("ui", lambda: order.append("interactive"), INTERACTIVE))
+        interactive.start()
+        bulk.join(10)
+        interactive.join(10)
+
+        self.assertEqual(order, ["interactive", "bulk"])
+
+
+class SharedBudgetTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "budget.json")
+        self.clock = FakeClock()
+
+    def scheduler(self, per_minute=2, per_day=100):
+        # One per process spending the key.
+        return RequestScheduler(per_minute=per_minute, per_day=per_day, max_wait=5,
+                                clock=self.clock, budget=SharedBudget(self.path))
+
+    def test_processes_share_one_budget(self):
+        first, second = self.scheduler(), self.scheduler()
+        first.run("a", lambda: 1)
+        second.run("b", lambda: 2)
+        with self.assertRaises(QuotaExceeded):
+            first.run("c", lambda: 3)
+        with self.assertRaises(QuotaExceeded):
+            second.run("d", lambda: 4)
+
+        self.clock.now += 30
+        self.assertEqual(second.run("e", lambda: 5), 5)
+
+    def test_a_restarted_process_keeps_the_daily_budget(self):
+        self.scheduler(per_minute=100, per_day=1).run("a", lambda: 1)
+        with self.assertRaises(QuotaExceeded):
+            self.scheduler(per_minute=100, per_day=1).run("b", lambda: 2)
+
+    def test_throttling_is_shared(self):
+        self.scheduler(per_minute=10).report_throttled()
+        with self.assertRaises(QuotaExceeded):
+            RequestScheduler(per_minute=10, per_day=100, max_wait=1, clock=self.clock,
+                             budget=SharedBudget(self.path)).run("a", lambda: 1)
@@ -0,0 +1,71 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from stocksTracker.jobs import claim_job, run_job, submit_job
+from stocksTracker.models import RefreshRun
+from stocksTracker.refresher import claim_pending_run, request_refresh, start_run
+
+
+def finish(run, symbols=None, full=False, on_step=None):
+    RefreshRun.objects.filter(pk=run.pk).update(state=RefreshRun.DONE, finished_at=timezone.now())
+    run.refresh_from_db()
+    return run
+
+
+class RefreshQueueTests(TestCase):
+    def test_start_run_claims_a_requested_run(self):
+        requested, = request_refresh()
+        run = start_run()
+        self.assertEqual(run.pk, requested.pk)
+        self.assertEqual(run.state, RefreshRun.RUNNING)
+
+    def test_a_shard_is_never_refreshed_twice_at_once(self):
+        running = start_run()
+        self.assertIsNone(start_run())
+        self.assertEqual(request_refresh(), [running])
+        # A request that raced in waits for the running refresh to finish.
+        waiting = RefreshRun.objects.create()
+        self.assertIsNone(claim_pending_run())
+        finish(running)
+        self.assertEqual(claim_pending_run().pk, waiting.pk)
+
+    def test_other_shards_are_independent(self):
+        self.assertIsNotNone(start_run("0/2"))
+        self.assertIsNotNone(start_run("1/2"))
+
+    def test_stale_runs_are_failed(self):
+        stale = start_run()
+        RefreshRun.objects.filter(pk=stale.pk).update(started_at=timezone.now() - timedelta(days=1))
+        self.assertIsNotNone(start_run())
+        stale.refresh_from_db()
+        self.assertEqual(stale.state, RefreshRun.FAILED)
+
+
+@mock.patch("stocksTracker.jobs.run_refresh", side_effect=finish)
+class RefreshJobTests(TestCase):
+    def run_refresh_job(self, **params):
+        return run_job(claim_job(submit_job("refresh", {"shard": "", "full": False, **params}).pk))
+
+    def test_refresh_job_serves_the_requested_run(self, run_refresh):
+        requested, = request_refresh()
+        job = self.run_refresh_job(symbols=None)
+        self.assertEqual(job.result["id"], requested.pk)
+        self.assertEqual(RefreshRun.objects.get().state, RefreshRun.DONE)
+
+    def test_symbol_subsets_leave_the_request_waiting(self, run_refresh):
+        requested, = request_refresh()
+        job = self.run_refresh_job(symbols=["AAPL"])
+        self.assertNotEqual(job.result["id"], requested.pk)
+        requested.refresh_from_db()
+        self.assertEqual(requested.state, RefreshRun.PENDING)
+
+    def test_refresh_job_skips_a_shard_in_flight(self, run_refresh):
+        running = start_run()
+        job = self.run_refresh_job(symbols=["AAPL"])
+        self.assertTrue(job.result["skipped"])
+        self.assertEqual(job.result["in_flight"]["id"], running.pk)
+        run_refresh.assert_not_called()
+        self.assertEqual(RefreshRun.objects.count(), 1)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from stocksTracker.tracker_scripts import calculate_moving_averages, generate_trade_signals
+
+
+def loop_signals(df, symbol):
+    # The original per-row crossover loop (with the SELL label fixed), kept
+    # as the reference for the vectorized version.
+    signals = []
+    for i in range(1, len(df)):
+        if df["MA_5"].iloc[i] > df["MA_20"].iloc[i] and df["MA_5"].iloc[i-1] <= df["MA_20"].iloc[i-1]:
+            signals.append({"stock": symbol, "date": df.index[i], "signal": "BUY"})
+        elif df["MA_5"].iloc[i] < df["MA_20"].iloc[i] and df["MA_5"].iloc[i-1] >= df["MA_20"].iloc[i-1]:
+            signals.append({"stock": symbol, "date": df.index[i], "signal": "SELL"})
+    return signals
+
+
+def frame(close):
+    dates = pd.bdate_range(end="2024-12-13", periods=len(close), name="date")
+    df = pd.DataFrame({"close": np.asarray(close, dtype=float)}, index=dates)
+    calculate_moving_averages(df)
+    return df
+
+
+class GenerateTradeSignalsTests(SimpleTestCase):
+    def assertMatchesLoop(self, df):
+        self.assertEqual(generate_trade_signals(df, "SYN").to_dict("records"), loop_signals(df, "SYN"))
+
+    def test_random_walk_matches_loop(self):
+        rng = np.random.default_rng(0)
+        close = 100 + np.cumsum(rng.normal(0, 1, 2000))
+        # Repeated prices produce exact MA ties, which exercise the <= / >= edges.
+        close[rng.random(len(close)) < 0.05] = 100.0
+        df = frame(close)
+        self.assertMatchesLoop(df)
+        self.assertGreater(len(loop_signals(df, "SYN")), 10)
+
+    def test_single_crossover_each_way(self):
+        df = frame([10.0] * 25 + [20.0] * 25 + [5.0] * 25)
+        signals = generate_trade_signals(df, "SYN").to_dict("records")
+        self.assertEqual([signal["signal"] for signal in signals], ["BUY", "SELL"])
+        self.assertEqual(signals[0]["date"], df.index[25])
+        self.assertMatchesLoop(df)
+
+    def test_flat_series_has_no_signals(self):
+        df = frame([50.0] * 40)
+        self.assertEqual(len(generate_trade_signals(df, "SYN")), 0)
+        self.assertMatchesLoop(df)
+
+    def test_shorter_than_long_window(self):
+        df = frame(np.arange(10.0))
+        self.assertEqual(len(generate_trade_signals(df, "SYN")), 0)
+        self.assertMatchesLoop(df)
@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from stocksTracker.simulator import BUY, SELL, execute_events
+from stocksTracker.trade_history import TradeHistory
+from stocksTracker.tracker_scripts import analyze_panel, simulate_trades
+
+DATES = pd.bdate_range(end="2024-12-13", periods=60, name="date")
+SYMBOLS = ["AAPL", "MSFT"]
+# Straight ramps, so the moving averages never tie. AAPL falls, rises and
+# falls again: MA_5 crosses MA_20 upwards on row 27 (close 28) and downwards
+# on row 47 (close 32). MSFT falls then rises, crossing up on row 34 (close 35).
+CLOSES = np.column_stack([
+    np.concatenate([np.linspace(40, 20, 20), np.linspace(21, 40, 20), np.linspace(39, 20, 20)]),
+    np.concatenate([np.linspace(40, 30, 30), np.linspace(31, 60, 30)]),
+])
+
+
+class SimulateTradesTests(SimpleTestCase):
+    def simulate(self, **kwargs):
+        signals = analyze_panel(DATES, SYMBOLS, CLOSES)
+        return simulate_trades(signals, DATES, SYMBOLS, CLOSES, **kwargs)
+
+    def test_crossovers_become_fills(self):
+        cash, value, history = self.simulate(initial_capital=10000)
+        self.assertEqual(list(history), [
+            {"date": DATES[27], "stock": "AAPL", "action": "BUY", "price": 28.0},
+            {"date": DATES[34], "stock": "MSFT", "action": "BUY", "price": 35.0},
+            {"date": DATES[47], "stock": "AAPL", "action": "SELL", "price": 32.0},
+        ])
+        self.assertEqual(cash, 10000 - 28 - 35 + 32)
+        # One MSFT share left, marked at its last close.
+        self.assertEqual(value, 60.0)
+
+    def test_initial_positions_are_sold_into(self):
+        cash, value, history = self.simulate(initial_capital=0, initial_positions=[3, 0])
+        # No cash for the buys; the SELL closes one of the three AAPL shares.
+        self.assertEqual([(trade["stock"], trade["action"]) for trade in history], [("AAPL", "SELL")])
+        self.assertEqual((cash, value), (32.0, 2 * 20.0))
+
+    def test_csv_export(self):
+        _, _, history = self.simulate()
+        lines = "".join(history.iter_csv(chunk_size=2)).splitlines()
+        self.assertEqual(lines, [
+            "date,stock,action,price",
+            f"{DATES[27].isoformat()},AAPL,BUY,28.0",
+            f"{DATES[34].isoformat()},MSFT,BUY,35.0",
+            f"{DATES[47].isoformat()},AAPL,SELL,32.0",
+        ])
+        records = [json.loads(line) for line in "".join(history.iter_ndjson(chunk_size=2)).splitlines()]
+        self.assertEqual([record["action"] for record in records], ["BUY", "BUY", "SELL"])
+
+
+class ExecuteEventsTests(SimpleTestCase):
+    def test_position_size_spends_a_fraction_and_sells_everything(self):
+        closes = np.array([[10.0], [20.0]])
+        result = execute_events(closes, [0, 1], [0, 0], [BUY, SELL], initial_capital=100, position_size=0.5)
+        self.assertEqual(result["fill_shares"].tolist(), [5.0, -5.0])
+        self.assertEqual(result["cash"], 150.0)
+        self.assertEqual(result["step_equity"].tolist(), [100.0, 150.0])
+
+    def test_unfillable_events_are_skipped(self):
+        closes = np.array([[np.nan, 50.0], [10.0, 50.0]])
+        # NaN price, SELL with nothing held, BUY without enough cash.
+        result = execute_events(closes, [0, 1, 1], [0, 0, 1], [BUY, SELL, BUY], initial_capital=20)
+        self.assertEqual(result["skipped"], 3)
+        self.assertEqual(len(result["fill_rows"]), 0)
+        self.assertEqual(result["positions"].tolist(), [0.0, 0.0])
+
+
+class TradeHistoryTests(SimpleTestCase):
+    def setUp(self):
+        self.history = TradeHistory(DATES[:3], SYMBOLS, [0, 1, 2], [0, 1, 0], [1, 1, -1], [10.0, 11.0, 12.0])
+
+    def test_indexing_and_slicing(self):
+        self.assertEqual(len(self.history), 3)
+        self.assertEqual(self.history[-1], {"date": DATES[2], "stock": "AAPL", "action": "SELL", "price": 12.0})
+        self.assertEqual([trade["price"] for trade in self.history[1:]], [11.0, 12.0])
+        with self.assertRaises(IndexError):
+            self.history[3]
+        self.assertFalse(TradeHistory(DATES, SYMBOLS, [], [], [], []))
+
+    def test_bytes_round_trip(self):
+        restored = TradeHistory.from_bytes(self.history.to_bytes())
+        self.assertEqual(list(restored), list(self.history))
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+from django.test import SimpleTestCase
+
+from stocksTracker.tick_store import NS_PER_DAY, TICK_DTYPE, TickStore, datetime_to_ns, ns_to_datetime
+
+DAY = 19_700 * NS_PER_DAY  # 2023-12-09 UTC
+
+
+class TickStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = self.open_store()
+
+    def open_store(self, **kwargs):
+        store = TickStore(self.directory, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_latest_keeps_the_newest_tick(self):
+        self.store.append_many([
+            ("AAPL", 10.0, 1, DAY + 2),
+            ("MSFT", 20.0, 2, DAY + 1),
+            ("AAPL", 9.0, 3, DAY + 1),
+        ])
+        self.assertEqual(self.store.latest("AAPL"), (10.0, 1, DAY + 2))
+        self.assertIsNone(self.store.latest("GOOGL"))
+        self.assertEqual(self.store.latest_all(), {"AAPL": (10.0, 1, DAY + 2), "MSFT": (20.0, 2, DAY + 1)})
+
+    def test_another_store_sees_appends(self):
+        reader = self.open_store()
+        self.assertIsNone(reader.latest("AAPL"))
+        self.store.append("AAPL", 10.0, 1, DAY)
+        self.assertEqual(reader.latest("AAPL"), (10.0, 1, DAY))
+        self.store.append("AAPL", 11.0, 1, DAY + 1)
+        self.assertEqual(reader.latest("AAPL")[0], 11.0)
+
+    def test_segments_rotate_by_day_and_size(self):
+        store = self.open_store(max_segment_bytes=2 * TICK_DTYPE.itemsize)
+        for i in range(3):
+            store.append("AAPL", 1.0, 1, DAY + i)
+        store.append("AAPL", 2.0, 1, DAY + NS_PER_DAY)
+        names = [os.path.basename(path) for path in store.segments()]
+        self.assertEqual(names, ["20231209-000000.ticks", "20231209-000001.ticks", "20231210-000000.ticks"])
+
+    def test_replay_filters_by_window_and_symbol(self):
+        self.store.append_many([("AAPL", float(i), i, DAY + i) for i in range(5)])
+        self.store.append_many([("MSFT", 50.0, 1, DAY + 2)])
+        rows = list(self.store.replay_rows(start=DAY + 1, end=DAY + 3, symbols=["AAPL"]))
+        self.assertEqual(rows, [("AAPL", 1.0, 1, DAY + 1), ("AAPL", 2.0, 2, DAY + 2), ("AAPL", 3.0, 3, DAY + 3)])
+        self.assertEqual(len(list(self.store.replay_rows())), 6)
+
+    def test_rebuild_index_from_segments(self):
+        self.store.append_many([("AAPL", 10.0, 1, DAY + 5), ("AAPL", 12.0, 1, DAY + 9), ("MSFT", 20.0, 2, DAY)])
+        self.store.close()
+        os.remove(self.store.index_path)
+
+        store = self.open_store()
+        self.assertIsNone(store.latest("AAPL"))
+        store.rebuild_index()
+        self.assertEqual(store.latest("AAPL"), (12.0, 1, DAY + 9))
+        self.assertEqual(store.latest("MSFT"), (20.0, 2, DAY))
+
+    def test_torn_record_is_dropped_before_appending(self):
+        self.store.append("AAPL", 10.0, 1, DAY)
+        self.store.close()
+        with open(self.store.segments()[0], "ab") as file:
+            file.write(b"\x01\x02\x03")
+
+        store = self.open_store()
+        store.append("AAPL", 11.0, 1, DAY + 1)
+        self.assertEqual([row[1] for row in store.replay_rows()], [10.0, 11.0])
+
+    def test_datetime_round_trip_is_exact(self):
+        value = datetime(2024, 12, 13, 15, 30, 1, 123456)
+        self.assertEqual(ns_to_datetime(datetime_to_ns(value)), value)
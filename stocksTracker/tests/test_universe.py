@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+
+from stocksTracker.universe import parse_shard, shard_for, shard_labels, shard_symbols
+
+SYMBOLS = [f"S{i:04d}" for i in range(2000)]
+
+
+class ShardingTests(SimpleTestCase):
+    def test_shards_partition_the_universe(self):
+        for count in (1, 2, 4, 7):
+            shards = [shard_symbols(SYMBOLS, label) for label in shard_labels(count)]
+            combined = [symbol for shard in shards for symbol in shard]
+            self.assertEqual(sorted(combined), SYMBOLS)
+            self.assertEqual(len(combined), len(set(combined)))
+            if count > 1:
+                # Roughly even.
+                self.assertTrue(all(abs(len(shard) - len(SYMBOLS) / count) < len(SYMBOLS) / count * 0.2
+                                    for shard in shards))
+
+    def test_assignment_is_stable(self):
+        # Fixed values, so a change of hash breaks this instead of silently
+        # reshuffling every worker's symbols.
+        self.assertEqual([shard_for(symbol, 4) for symbol in ["AAPL", "MSFT", "GOOGL", "AMZN"]], [3, 0, 0, 3])
+        self.assertEqual(shard_symbols(SYMBOLS, "1/4"), shard_symbols(list(reversed(SYMBOLS)), "1/4")[::-1])
+        self.assertEqual(shard_symbols(SYMBOLS[:100], "2/3"),
+                         [symbol for symbol in shard_symbols(SYMBOLS, "2/3") if symbol in SYMBOLS[:100]])
+
+    def test_adding_a_shard_moves_only_its_share(self):
+        for count in (1, 4, 9):
+            moved = [symbol for symbol in SYMBOLS if shard_for(symbol, count) != shard_for(symbol, count + 1)]
+            # Only symbols the new shard wins move, about 1/(N+1) of them.
+            self.assertTrue(all(shard_for(symbol, count + 1) == count for symbol in moved))
+            self.assertAlmostEqual(len(moved) / len(SYMBOLS), 1 / (count + 1), delta=0.03)
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/5"), (2, 5))
+        for value in ["5/5", "-1/2", "1/0", "x", "1/2/3"]:
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+        self.assertEqual(shard_labels(1), [""])
+        self.assertEqual(shard_symbols(SYMBOLS[:3]), SYMBOLS[:3])
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from stocksTracker import async_loaders, tracker_scripts
+from stocksTracker.models import Holding, Portfolio
+
+URL = "/api/portfolios/valuation/"
+
+
+class PortfolioValuationApiTests(TestCase):
+    def setUp(self):
+        self.own = self.create_portfolio("Own")
+        self.other = self.create_portfolio("Other")
+        session = self.client.session
+        session["portfolio_id"] = self.own.pk
+        session.save()
+
+    def create_portfolio(self, name):
+        portfolio = Portfolio.objects.create(name=name, email=f"{name.lower()}@example.com", phone="5550100")
+        Holding.objects.create(portfolio=portfolio, symbol="AAPL", shares=10)
+        return portfolio
+
+    def test_values_the_sessions_portfolio(self):
+        response = self.client.get(URL, {"ids": str(self.own.pk)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.json()], [str(self.own.pk)])
+
+    def test_ids_are_required(self):
+        self.assertEqual(self.client.get(URL).status_code, 400)
+        self.assertEqual(self.client.get(URL, {"ids": "1,x"}).status_code, 400)
+
+    def test_other_portfolios_are_forbidden(self):
+        self.assertEqual(self.client.get(URL, {"ids": f"{self.own.pk},{self.other.pk}"}).status_code, 403)
+        response = self.client.post(URL, {"portfolio_ids": [self.other.pk]}, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client_class().get(URL, {"ids": str(self.own.pk)}).status_code, 403)
+
+    def test_staff_may_value_any_portfolio(self):
+        self.client.force_login(User.objects.create_user("ops", password="x", is_staff=True))
+        response = self.client.get(URL, {"ids": f"{self.own.pk},{self.other.pk}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_inline_portfolios_need_no_session(self):
+        response = self.client_class().post(URL, {"portfolios": [{"stocks": [{"stock": "AAPL", "shares": 1}]}]},
+                                            content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(VALUATION_MAX_PORTFOLIOS=2)
+    def test_request_size_is_limited(self):
+        self.client.force_login(User.objects.create_user("ops", password="x", is_staff=True))
+        self.assertEqual(self.client.get(URL, {"ids": "1,2,3"}).status_code, 400)
+        inline = [{"stocks": [{"stock": "AAPL", "shares": 1}]}] * 2
+        response = self.client.post(URL, {"portfolio_ids": [self.own.pk], "portfolios": inline},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+
+LATEST = {"AAPL": 12.0, "MSFT": 30.0, "GOOGL": 7.0}
+BASELINE = {"AAPL": 10.0, "MSFT": 25.0}  # GOOGL has no stored history
+
+
+def latest(symbol):
+    return LATEST.get(symbol), None
+
+
+def baseline(symbol):
+    return BASELINE.get(symbol), None
+
+
+class PortfolioValuePageTests(TestCase):
+    def setUp(self):
+        portfolio = Portfolio.objects.create(name="Own", email="own@example.com", phone="5550100")
+        for symbol, shares in {"AAPL": 10, "MSFT": 2, "GOOGL": 5}.items():
+            Holding.objects.create(portfolio=portfolio, symbol=symbol, shares=shares)
+        self.portfolio_id = portfolio.pk
+        session = self.client.session
+        session["portfolio_id"] = portfolio.pk
+        session.save()
+        for module in (tracker_scripts, async_loaders):
+            for patcher in [
+                mock.patch.object(module, "fetch_realtime_data_from_file", latest),
+                mock.patch.object(module, "fetch_historical_data_from_file", baseline),
+            ]:
+                patcher.start()
+                self.addCleanup(patcher.stop)
+
+    def test_page_and_api_agree(self):
+        with self.assertLogs("stocksTracker.views", "WARNING") as logs:
+            page = self.client.get("/portfolio/value/")
+        api = self.client.get(URL, {"ids": str(self.portfolio_id)}).json()[0]
+        self.assertEqual(api["current_value"], 12.0 * 10 + 30.0 * 2)
+        self.assertContains(page, f"Total Portfolio Value: {api['current_value']}")
+        self.assertIn("GOOGL", logs.output[0])
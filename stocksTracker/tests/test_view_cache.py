@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from stocksTracker import view_cache
+from stocksTracker.view_cache import cache_on_data_version
+
+
+class ViewCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.version = ("v1", 1_734_000_000.0)
+        self.stale = False
+        for patcher in [
+            mock.patch.object(view_cache, "data_version", lambda: self.version),
+            mock.patch.object(view_cache, "market_data_freshness", lambda: {"stale": self.stale}),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.calls = []
+
+    def view(self, **options):
+        @cache_on_data_version("test", **options)
+        def page(request):
+            self.calls.append(request)
+            return HttpResponse(f"page {len(self.calls)} for {request.session.get('portfolio_id')}")
+        return page
+
+    def get(self, view, portfolio_id=None, **headers):
+        request = RequestFactory().get("/page/", headers=headers)
+        request.session = {"portfolio_id": portfolio_id}
+        return view(request)
+
+    def test_second_request_is_served_from_cache(self):
+        page = self.view()
+        first, second = self.get(page), self.get(page)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertIn("Last-Modified", first)
+
+    def test_matching_if_none_match_gets_304(self):
+        page = self.view()
+        etag = self.get(page)["ETag"]
+        response = self.get(page, If_None_Match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.get(page, If_None_Match='"other"').status_code, 200)
+
+    def test_bumping_the_data_version_misses(self):
+        page = self.view()
+        first = self.get(page)
+        self.version = ("v2", 1_734_000_060.0)
+        response = self.get(page, If_None_Match=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.calls), 2)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+
+    def test_private_views_keep_an_entry_per_user(self):
+        page = self.view(vary=lambda request: [request.session.get("portfolio_id")], private=True)
+        first, second = self.get(page, 1), self.get(page, 2)
+        self.assertEqual((first.content, second.content), (b"page 1 for 1", b"page 2 for 2"))
+        self.assertNotEqual(first["ETag"], second["ETag"])
+        self.assertEqual(self.get(page, 1).content, b"page 1 for 1")
+        self.assertEqual(len(self.calls), 2)
+        # Another user's ETag never matches, and no shared Last-Modified.
+        self.assertEqual(self.get(page, 2, If_None_Match=first["ETag"]).status_code, 200)
+        self.assertNotIn("Last-Modified", first)
+        self.assertIn("private", first["Cache-Control"])
+
+    def test_stale_data_bypasses_the_cache(self):
+        self.stale = True
+        page = self.view()
+        response = self.get(page)
+        self.get(page)
+        self.assertEqual(len(self.calls), 2)
+        self.assertNotIn("ETag", response)
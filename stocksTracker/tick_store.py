@@ -0,0 +1,282 @@
+import glob
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+TICK_DIR = "ticks"
+MAX_SEGMENT_BYTES = int(os.environ.get("TICK_SEGMENT_BYTES", 64 * 1024 * 1024))
+
+# One fixed-width record per quote. Segments are append-only and named
+# {UTC day}-{sequence}.ticks, so sorting the names sorts them in time.
+TICK_DTYPE = np.dtype([
+    ("timestamp", "<i8"),
+    ("symbol", "<i4"),
+    ("price", "<f8"),
+    ("volume", "<i8"),
+])
+
+NS_PER_DAY = 86400 * 10**9
+
+
+def segment_day(timestamp):
+    return time.strftime("%Y%m%d", time.gmtime(timestamp // 10**9))
+
+
+def datetime_to_ns(value):
+    # Exact, unlike value.timestamp() * 1e9, which rounds at this magnitude.
+    return int(value.replace(microsecond=0).timestamp()) * 10**9 + value.microsecond * 1000
+
+
+def ns_to_datetime(timestamp):
+    return datetime.fromtimestamp(timestamp // 10**9).replace(microsecond=timestamp % 10**9 // 1000)
+
+
+def load_segment(path):
+    # Read-only view of a segment; a torn append at the end is ignored.
+    try:
+        count = os.path.getsize(path) // TICK_DTYPE.itemsize
+    except OSError:
+        return np.empty(0, dtype=TICK_DTYPE)
+    if count == 0:
+        return np.empty(0, dtype=TICK_DTYPE)
+    return np.memmap(path, dtype=TICK_DTYPE, mode="r", shape=(count,))
+
+
+class TickStore:
+    """Append-only quote log with a latest-quote index.
+
+    symbols.txt maps symbol ids (line numbers) to symbols. latest.idx holds
+    one TICK_DTYPE slot per symbol id with that symbol's newest tick; it is
+    memory-mapped, so lookups are an array index and see other processes'
+    appends. The index can always be rebuilt from the segments.
+    """
+
+    def __init__(self, directory=TICK_DIR, max_segment_bytes=MAX_SEGMENT_BYTES):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self._lock = threading.Lock()
+        self._symbols = []
+        self._ids = {}
+        self._index = None
+        self._segment = None
+        self._segment_path = None
+        self._segment_day = None
+
+    @property
+    def symbols_path(self):
+        return os.path.join(self.directory, "symbols.txt")
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, "latest.idx")
+
+    def segments(self):
+        return sorted(glob.glob(os.path.join(self.directory, "*.ticks")))
+
+    ######## symbols ########
+
+    def _load_symbols(self):
+        try:
+            with open(self.symbols_path, "r") as file:
+                symbols = file.read().split("\n")
+        except OSError:
+            return
+        # A half-written last line belongs to a writer that has not finished.
+        for symbol in symbols[len(self._symbols):-1]:
+            self._ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+
+    def _symbol_id(self, symbol):
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            self._load_symbols()
+            symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.symbols_path, "a") as file:
+                file.write(f"{symbol}\n")
+            self._load_symbols()
+            symbol_id = self._ids[symbol]
+        return symbol_id
+
+    def symbol_of(self, symbol_id):
+        if symbol_id >= len(self._symbols):
+            self._load_symbols()
+        return self._symbols[symbol_id]
+
+    ######## latest index ########
+
+    def _slots(self, needed=0):
+        # Maps the index, growing the file first when a writer needs a slot
+        # past its end, and remapping when another process has grown it.
+        try:
+            size = os.path.getsize(self.index_path) // TICK_DTYPE.itemsize
+        except OSError:
+            size = 0
+        if needed > size:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.index_path, "ab") as file:
+                # Never shrink: another process may have grown it meanwhile.
+                if os.fstat(file.fileno()).st_size < needed * TICK_DTYPE.itemsize:
+                    file.truncate(needed * TICK_DTYPE.itemsize)
+                size = os.fstat(file.fileno()).st_size // TICK_DTYPE.itemsize
+        if self._index is None or len(self._index) != size:
+            self._index = None
+            if size:
+                self._index = np.memmap(self.index_path, dtype=TICK_DTYPE, mode="r+", shape=(size,))
+        return self._index
+
+    def latest(self, symbol):
+        # Returns (price, volume, timestamp ns) for the newest tick, or None.
+        with self._lock:
+            symbol_id = self._ids.get(symbol)
+            if symbol_id is None:
+                self._load_symbols()
+                symbol_id = self._ids.get(symbol)
+            if symbol_id is None:
+                return None
+            index = self._index
+            if index is None or symbol_id >= len(index):
+                index = self._slots()
+            if index is None or symbol_id >= len(index) or index["timestamp"][symbol_id] == 0:
+                return None
+            slot = index[symbol_id]
+            return float(slot["price"]), int(slot["volume"]), int(slot["timestamp"])
+
+    def latest_all(self):
+        # {symbol: (price, volume, timestamp ns)} for every symbol with a tick.
+        with self._lock:
+            self._load_symbols()
+            index = self._slots()
+            if index is None:
+                return {}
+            slots = np.array(index)
+        return {
+            self._symbols[i]: (float(slots["price"][i]), int(slots["volume"][i]), int(slots["timestamp"][i]))
+            for i in np.flatnonzero(slots["timestamp"][:len(self._symbols)])
+        }
+
+    def rebuild_index(self):
+        # Recomputes every symbol's newest tick from the segments.
+        with self._lock:
+            self._load_symbols()
+            latest = np.zeros(len(self._symbols), dtype=TICK_DTYPE)
+            for path in self.segments():
+                ticks = np.array(load_segment(path))
+                ticks = ticks[(ticks["symbol"] >= 0) & (ticks["symbol"] < len(latest))]
+                if len(ticks) == 0:
+                    continue
+                # Newest tick per symbol; on equal timestamps the later append wins.
+                ticks = ticks[np.lexsort((ticks["timestamp"], ticks["symbol"]))]
+                newest = ticks[np.flatnonzero(np.r_[ticks["symbol"][1:] != ticks["symbol"][:-1], True])]
+                newer = newest["timestamp"] >= latest["timestamp"][newest["symbol"]]
+                latest[newest["symbol"][newer]] = newest[newer]
+            index = self._slots(len(latest))
+            if index is not None:
+                index[:len(latest)] = latest
+                index.flush()
+
+    ######## appends ########
+
+    def _open_segment(self, timestamp, incoming):
+        day = segment_day(timestamp)
+        if self._segment is not None:
+            full = self._segment.tell() + incoming > self.max_segment_bytes
+            if day == self._segment_day and not full:
+                return self._segment
+            self._segment.close()
+            self._segment = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        existing = sorted(glob.glob(os.path.join(self.directory, f"{day}-*.ticks")))
+        sequence = int(os.path.basename(existing[-1])[9:-6]) if existing else 0
+        path = existing[-1] if existing else None
+        if path is None or os.path.getsize(path) + incoming > self.max_segment_bytes:
+            path = os.path.join(self.directory, f"{day}-{sequence + (1 if existing else 0):06d}.ticks")
+
+        self._segment = open(path, "ab")
+        # Drop a torn record left by a crashed writer before appending.
+        whole = self._segment.tell() // TICK_DTYPE.itemsize * TICK_DTYPE.itemsize
+        if whole != self._segment.tell():
+            self._segment.truncate(whole)
+            self._segment.seek(whole)
+        self._segment_path = path
+        self._segment_day = day
+        return self._segment
+
+    def append(self, symbol, price, volume, timestamp=None):
+        self.append_many([(symbol, price, volume, timestamp)])
+
+    def append_many(self, ticks):
+        # ticks: iterable of (symbol, price, volume, timestamp ns or None).
+        now = time.time_ns()
+        with self._lock:
+            records = []
+            for symbol, price, volume, timestamp in ticks:
+                records.append((now if timestamp is None else timestamp, self._symbol_id(symbol), price, volume))
+            if not records:
+                return 0
+            records = np.array(records, dtype=TICK_DTYPE)
+
+            # A batch never straddles a day boundary.
+            days = records["timestamp"] // NS_PER_DAY
+            for day in np.unique(days):
+                batch = records[days == day]
+                segment = self._open_segment(int(batch["timestamp"][0]), batch.nbytes)
+                segment.write(batch.tobytes())
+                segment.flush()
+
+            index = self._slots(int(records["symbol"].max()) + 1)
+            for record in records:
+                if record["timestamp"] >= index["timestamp"][record["symbol"]]:
+                    index[record["symbol"]] = record
+            return len(records)
+
+    def close(self):
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+            if self._index is not None:
+                self._index.flush()
+                self._index = None
+
+    ######## replay ########
+
+    def replay(self, start=None, end=None, symbols=None, chunk_size=65536):
+        # Streams ticks in log order as TICK_DTYPE chunks, one segment at a
+        # time, optionally limited to [start, end] (ns) and some symbols.
+        # Segments outside the window are skipped by name.
+        first_day = None if start is None else segment_day(start)
+        last_day = None if end is None else segment_day(end)
+        wanted = None
+        if symbols is not None:
+            with self._lock:
+                self._load_symbols()
+                wanted = np.array([self._ids[s] for s in symbols if s in self._ids], dtype=np.int32)
+
+        for path in self.segments():
+            day = os.path.basename(path)[:8]
+            if (first_day is not None and day < first_day) or (last_day is not None and day > last_day):
+                continue
+            ticks = load_segment(path)
+            for offset in range(0, len(ticks), chunk_size):
+                chunk = ticks[offset:offset + chunk_size]
+                keep = np.ones(len(chunk), dtype=bool)
+                if start is not None:
+                    keep &= chunk["timestamp"] >= start
+                if end is not None:
+                    keep &= chunk["timestamp"] <= end
+                if wanted is not None:
+                    keep &= np.isin(chunk["symbol"], wanted)
+                if keep.any():
+                    yield np.array(chunk[keep])
+
+    def replay_rows(self, start=None, end=None, symbols=None):
+        # Same stream as replay, one (symbol, price, volume, timestamp ns) at a time.
+        for chunk in self.replay(start, end, symbols):
+            for tick in chunk:
+                yield self.symbol_of(int(tick["symbol"])), float(tick["price"]), int(tick["volume"]), int(tick["timestamp"])
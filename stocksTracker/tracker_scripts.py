@@ -1,15 +1,43 @@
 import os
 import csv
+import json
+import threading
+import time
+import numpy as np
 import pandas as pd
 import logging
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
 
+from . import price_store
+from .bar_aggregator import BarAggregator
+from .data_version import bump_data_version, data_version
+from .fetch_engine import FetchEngine
+from .frame_cache import FrameCache
+from .indicators import (
+    align_panel,
+    crossover_signals,
+    empty_signals,
+    forward_fill,
+    StreamingCrossover,
+    ma_column,
+    pack_panel,
+    panel_crossover_signals,
+    rolling_means_panel,
+)
+from .metrics import COMPUTE_SECONDS, ERRORS, STORE_SECONDS, register_collector, timed
+from .providers import build_provider
+from .quote_cache import QuoteCache
+from .rate_limiter import BULK, INTERACTIVE, RateLimitError, RequestScheduler, SharedBudget
+from .simulator import execute_events, signals_to_events
+from .tick_store import TickStore, datetime_to_ns, ns_to_datetime
+from .trade_history import TradeHistory
+
 load_dotenv()
 
 API_KEY = os.environ.get('ALPHA_VANTAGE_API_KEY')
-BASE_URL = "https://www.alphavantage.co/query"
+BASE_URL = os.environ.get("ALPHA_VANTAGE_BASE_URL", "https://www.alphavantage.co/query")
 STOCK_SYMBOLS = [
     "AAPL",
     "GOOGL",
@@ -28,85 +56,213 @@ STOCK_SYMBOLS = [
     "INTC",
 ]
 
-realTimeStocksData = "real_time_stock_data.csv"
+# Every quote is appended to the tick log; latest quotes come from its index.
+TICK_STORE = TickStore()
+
+# Quotes also build 1m/5m/1h bars, written to the price store in batches.
+BAR_AGGREGATOR = BarAggregator(flush_at=int(os.environ.get("INTRADAY_FLUSH_BARS", 256)))
+
+# When False (the web app, see apps.py) lookups never call the provider on
+# the request path; they read whatever the background refresher last stored.
+FETCH_ON_READ = os.environ.get("MARKET_DATA_FETCH_ON_READ", "1") == "1"
+
+# outputsize used for cold symbols and gaps wider than the compact window.
+HISTORICAL_FULL_OUTPUTSIZE = os.environ.get("HISTORICAL_FULL_OUTPUTSIZE", "full")
+
+# Performance is measured from the open of the first bar in the last
+# PERFORMANCE_WINDOW_BARS daily bars: Alpha Vantage's compact window, which
+# is all the app stored before bars were synced incrementally. Pinning it
+# keeps results independent of how much history a full sync stored.
+PERFORMANCE_WINDOW_BARS = int(os.environ.get("PERFORMANCE_WINDOW_BARS", 100))
+
+# Free-tier Alpha Vantage budgets; override for premium keys. The budget
+# belongs to the API key, so every process on this machine shares it through
+# ALPHA_VANTAGE_BUDGET_FILE.
+PROVIDER_SCHEDULER = RequestScheduler(
+    per_minute=int(os.environ.get("ALPHA_VANTAGE_PER_MINUTE", 5)),
+    per_day=int(os.environ.get("ALPHA_VANTAGE_PER_DAY", 25)),
+    max_wait=float(os.environ.get("ALPHA_VANTAGE_MAX_WAIT", 60)),
+    clock=time.time,
+    budget=SharedBudget(os.environ.get("ALPHA_VANTAGE_BUDGET_FILE", "provider_budget.json")),
+)
+FETCH_ENGINE = FetchEngine(api_key=API_KEY, base_url=BASE_URL, scheduler=PROVIDER_SCHEDULER)
+
+# "alphavantage" (ALPHA_VANTAGE_BULK=1 for the premium bulk quote endpoint)
+# or "replay", which serves recorded responses from MARKET_DATA_REPLAY_DIR.
+PROVIDER = build_provider(
+    os.environ.get("MARKET_DATA_PROVIDER", "alphavantage"),
+    FETCH_ENGINE,
+    replay_dir=os.environ.get("MARKET_DATA_REPLAY_DIR", "recordings"),
+    bulk=os.environ.get("ALPHA_VANTAGE_BULK", "0") == "1",
+)
+
+QUOTE_CACHE = QuoteCache(
+    ttl=float(os.environ.get("QUOTE_CACHE_TTL", 300)),
+    max_entries=int(os.environ.get("QUOTE_CACHE_SIZE", 1024)),
+)
+
+# Parsed historical frames, reused until their file changes.
+FRAME_CACHE = FrameCache(max_bytes=int(os.environ.get("DATAFRAME_CACHE_MB", 64)) * 1024 * 1024)
+
+
+def market_data_metrics():
+    # Counters the cache, scheduler and bar aggregator already keep, read at
+    # scrape time so the hot paths pay nothing extra for them.
+    cache = QUOTE_CACHE.stats()
+    frames = FRAME_CACHE.stats()
+    scheduler = PROVIDER_SCHEDULER.metrics()
+    return [
+        ("stocks_quote_cache_lookups_total", "counter", "Quote cache lookups by outcome.", [
+            ({"result": "hit"}, cache["hits"]),
+            ({"result": "miss"}, cache["misses"]),
+            ({"result": "stale"}, cache["stale"]),
+        ]),
+        ("stocks_quote_cache_loads_total", "counter", "Quote cache loader calls.", [({}, cache["loads"])]),
+        ("stocks_quote_cache_evictions_total", "counter", "Quotes evicted from the cache.", [({}, cache["evictions"])]),
+        ("stocks_quote_cache_entries", "gauge", "Quotes held in the cache.", [({}, cache["entries"])]),
+        ("stocks_frame_cache_lookups_total", "counter", "Historical DataFrame cache lookups by outcome.", [
+            ({"result": "hit"}, frames["hits"]),
+            ({"result": "miss"}, frames["misses"]),
+        ]),
+        ("stocks_frame_cache_evictions_total", "counter", "Frames evicted to stay within the budget.", [({}, frames["evictions"])]),
+        ("stocks_frame_cache_bytes", "gauge", "Memory held by cached frames.", [({}, frames["bytes"])]),
+        ("stocks_provider_round_trips_total", "counter", "Requests made to the market data provider.", [
+            ({"provider": PROVIDER.name}, PROVIDER.round_trips),
+        ]),
+        ("stocks_provider_scheduled_total", "counter", "Provider calls through the scheduler by outcome.", [
+            ({"result": "requested"}, scheduler["requests"]),
+            ({"result": "coalesced"}, scheduler["coalesced"]),
+            ({"result": "rejected"}, scheduler["rejected"]),
+            ({"result": "throttled"}, scheduler["throttled"]),
+        ]),
+        ("stocks_provider_queue_depth", "gauge", "Calls waiting for a rate limit slot.", [({}, scheduler["queue_depth"])]),
+        ("stocks_provider_wait_max_seconds", "gauge", "Longest rate limit wait so far.", [({}, scheduler["wait_max"])]),
+        ("stocks_provider_tokens", "gauge", "Provider calls left in each budget.", [
+            ({"window": "minute"}, scheduler["minute_tokens"]),
+            ({"window": "day"}, scheduler["day_tokens"]),
+        ]),
+        ("stocks_intraday_bars_flushed_total", "counter", "Intraday bars written to the store.", [({}, BAR_AGGREGATOR.flushed)]),
+        ("stocks_intraday_late_quotes_total", "counter", "Quotes older than the open bar, dropped.", [({}, BAR_AGGREGATOR.late)]),
+    ]
+
+
+register_collector(market_data_metrics)
 
 ######################################## PART 1 ########################################
-def fetch_real_time_data_all():
-    fields = ["symbol", "price", "volume", "timestamp"]
+def fetch_real_time_data_all(symbols=None, on_progress=None):
+    symbols = STOCK_SYMBOLS if symbols is None else symbols
 
     try:
-        with open(realTimeStocksData, mode = "w", newline="") as stocks_file:
-            writer = csv.DictWriter(stocks_file, fieldnames=fields)
-            writer.writeheader()
-
-            toReturn = []
-
-            for symbol in STOCK_SYMBOLS:
-                params = {
-                    "function" : "GLOBAL_QUOTE",
-                    "symbol" : symbol,
-                    "apikey" : API_KEY
-                }
-
-                try:
-                    response = requests.get(BASE_URL, params=params)
-                    data = response.json().get("Global Quote", {})
-
-                    if data:
-                        row = {
-                            "symbol": data.get("01. symbol", "N/A"),
-                            "price": data.get("05. price", "N/A"),
-                            "volume": data.get("06. volume", "N/A"),
-                            "timestamp": datetime.now()
-                        }
-
-                        toReturn.append(row)
-
-                        writer.writerow(row)
-                        print("row added")
-                except requests.RequestException as e:
-                    print(f"Error fetching data for {symbol}: {e}")
-                except KeyError as e:
-                    print(f"Key error while processing data for {symbol}: {e}")
-
-        print(f"Real time data saved to {realTimeStocksData} file.")
+        toReturn = []
+
+        quotes, errors = PROVIDER.fetch_quotes(symbols, on_result=on_progress)
+        for symbol, e in errors.items():
+            print(f"Error fetching data for {symbol}: {e}")
+
+        for symbol in symbols:
+            if symbol not in quotes:
+                continue
+            try:
+                row = quote_row(quotes[symbol])
+                toReturn.append(row)
+                print("row added")
+            except KeyError as e:
+                ERRORS.inc(where="fetch_real_time_data_all")
+                print(f"Key error while processing data for {symbol}: {e}")
+
+        record_quotes(toReturn)
+        print(f"Real time data saved to {TICK_STORE.directory}.")
+        # End of a refresh cycle: store every bar whose interval is over.
+        if BAR_AGGREGATOR.flush(time.time_ns()):
+            bump_data_version()
 
         return toReturn
     except IOError as e:
+        ERRORS.inc(where="fetch_real_time_data_all")
         print(f"File I/O error: {e}")
 
 # fetch_real_time_data()
 
-def fetch_real_time_data(symbol):
-    fields = ["symbol", "price", "volume", "timestamp"]
+def quote_row(quote):
+    return {
+        "symbol": quote["symbol"],
+        "price": quote["price"],
+        "volume": quote["volume"],
+        "timestamp": datetime.now()
+    }
+
+
+def record_quotes(rows):
+    # Appends the quotes to the tick log, then updates the cache, the live
+    # signals (saved once for the batch) and the intraday bars. Rows without
+    # a numeric price are not stored.
+    ticks = []
+    flush = False
+    for row in rows:
+        try:
+            price = float(row["price"])
+        except ValueError:
+            continue
+        try:
+            volume = int(row["volume"])
+        except ValueError:
+            volume = 0
+        timestamp = datetime_to_ns(row["timestamp"])
+        ticks.append((row["symbol"], price, volume, timestamp))
+        QUOTE_CACHE.put(row["symbol"], price, row["volume"])
+        update_live_signal(row)
+        flush = BAR_AGGREGATOR.update(row["symbol"], price, volume, timestamp) or flush
+    TICK_STORE.append_many(ticks)
+    save_live_signals()
+    if flush:
+        BAR_AGGREGATOR.flush()
+    if ticks:
+        bump_data_version()
+
+
+def read_quote_rows():
+    for symbol, (price, volume, _) in TICK_STORE.latest_all().items():
+        yield symbol, price, volume
+
+
+@timed(STORE_SECONDS, store="ticks")
+def stored_real_time_data():
+    # Latest stored quote per symbol.
+    return [
+        {
+            "symbol": symbol,
+            "price": price,
+            "volume": volume,
+            "timestamp": ns_to_datetime(timestamp),
+        }
+        for symbol, (price, volume, timestamp) in TICK_STORE.latest_all().items()
+    ]
 
-    try:
-        with open(realTimeStocksData, mode = "a", newline="") as stocks_file:
-            writer = csv.DictWriter(stocks_file, fieldnames=fields)
-
-            params = {
-                "function" : "GLOBAL_QUOTE",
-                "symbol" : symbol,
-                "apikey" : API_KEY
-            }
-            try: 
-                response = requests.get(BASE_URL, params=params)
-                data = response.json().get("Global Quote", {})
-                if data:
-                    row = {
-                        "symbol": data.get("01. symbol", "N/A"),
-                        "price": data.get("05. price", "N/A"),
-                        "volume": data.get("06. volume", "N/A"),
-                        "timestamp": datetime.now()
-                    }
-                    writer.writerow(row)
-                    print("row added")
-                    return float(row["price"]), row["volume"]
-            except requests.RequestException as e:
-                print(f"Error fetching data for {symbol}: {e}")
-                return None, None
 
+@timed(STORE_SECONDS, store="ticks")
+def reload_quote_from_store(symbol):
+    # Store-only loader: the tick index is shared with the refresher
+    # process, so this sees its latest quote without re-reading any file.
+    entry = TICK_STORE.latest(symbol)
+    if entry is None:
+        return None, None
+    return entry[0], entry[1]
+
+
+def fetch_real_time_data(symbol):
+    try:
+        quote = PROVIDER.fetch_quote(symbol, priority=INTERACTIVE)
+        if quote:
+            row = quote_row(quote)
+            record_quotes([row])
+            print("row added")
+            return float(row["price"]), row["volume"]
+    except (requests.RequestException, RateLimitError) as e:
+        ERRORS.inc(where="fetch_real_time_data")
+        print(f"Error fetching data for {symbol}: {e}")
+        return None, None
     except IOError as e:
+        ERRORS.inc(where="fetch_real_time_data")
         print(f"File I/O error: {e}")
         return None, None
 
@@ -120,76 +276,111 @@ def create_folder(folder_name):
         print(f"Folder '{folder_name}' already exists.")
 
 
-def fetch_historical_data_in_file_all():
-    for symbol in STOCK_SYMBOLS:
-        params = {
-            "function" : "TIME_SERIES_DAILY",
-            "symbol" : symbol,
-            "apikey" : API_KEY,
-            "outputsize" : "compact"
-        }
+def daily_series_to_bars(data):
+    df = pd.DataFrame.from_dict(data=data, orient="index")
+    df.columns = ["open", "high", "low", "close", "volume"]
+    df.index.name = "date"
+    return price_store.dataframe_to_bars(df)
+
+
+@timed(STORE_SECONDS, store="bars")
+def load_bars(symbol, frequency=price_store.DAILY):
+    # Prefer the packed bar store; symbols that were never migrated fall
+    # back to the legacy CSV (and None means neither exists). Intraday bars
+    # only come from aggregated quotes, never from the provider.
+    if frequency != price_store.DAILY:
+        return price_store.load_bars(symbol, frequency=frequency)
+    bars = price_store.load_bars(symbol)
+    if bars is None and FETCH_ON_READ and not os.path.isfile(f"historical/{symbol}_historical.csv"):
+        fetch_historical_data_in_file(symbol)
+        bars = price_store.load_bars(symbol)
+    return bars
+
+
+def sync_historical_data(symbols, full=False, priority=BULK, on_progress=None):
+    # Symbols with stored bars only need the compact series; the last stored
+    # bar is revised and newer bars are appended. Cold symbols, or ones
+    # whose gap is wider than the compact window, get the full series merged
+    # into what is already stored. on_progress(symbol, error_or_None) fires
+    # once per symbol when it is done.
+    on_progress = on_progress or (lambda symbol, error: None)
+    create_folder(price_store.STORE_DIR)
+    last_dates = {}
+    for symbol in dict.fromkeys(symbols):
+        legacy_csv = f"historical/{symbol}_historical.csv"
+        if price_store.load_bars(symbol) is None and os.path.isfile(legacy_csv):
+            price_store.write_bars(symbol, price_store.read_csv_bars(legacy_csv))
+        last_dates[symbol] = None if full else price_store.last_date(symbol)
+
+    warm = [symbol for symbol, last in last_dates.items() if last is not None]
+    cold = [symbol for symbol, last in last_dates.items() if last is None]
+    synced = {}
+
+    series, errors = PROVIDER.fetch_daily_series(warm, outputsize="compact", priority=priority)
+    for symbol, e in errors.items():
+        print(f"Error fetching historical data for {symbol}: {e}")
+        on_progress(symbol, e)
 
-        
-        try: 
-            response = requests.get(BASE_URL, params=params)
-            data = response.json().get("Time Series (Daily)", {})
+    for symbol in warm:
+        if symbol in errors:
+            continue
+        data = series.get(symbol, {})
+        if not data:
+            print(f"No historical data received for {symbol}. Skipping.")
+            on_progress(symbol, ValueError(f"No historical data received for {symbol}."))
+            continue
+        try:
+            bars = daily_series_to_bars(data)
+            if bars["date"].min() > last_dates[symbol].value:
+                cold.append(symbol)
+                continue
+            synced[symbol] = price_store.append_bars(symbol, bars)
+            print(f"Wrote {synced[symbol]} new or revised bars for {symbol} to {price_store.bars_path(symbol)}")
+            on_progress(symbol, None)
+        except Exception as e:
+            ERRORS.inc(where="sync_historical_data")
+            print(f"Error processing data for {symbol}: {e}")
+            on_progress(symbol, e)
 
-            if not data:
-                    print(f"No historical data received for {symbol}. Skipping.")
-                    continue
-            try:
-                df = pd.DataFrame.from_dict(data=data, orient="index")
-                df.columns = ["open", "high", "low", "close", "volume"]
-                df.index.name = "date"
-                create_folder("historical")
-
-                csv_file = f"historical/{symbol}_historical.csv"
-                df.to_csv(csv_file)
-                print(f"Historical data for {symbol} saved to {csv_file}")
-            
-            except Exception as e:
-                print(f"Error processing data for {symbol}: {e}")
-        
-        except requests.RequestException as e:
-            print(f"Error fetching historical data for {symbol}: {e}")
+    series, errors = PROVIDER.fetch_daily_series(cold, outputsize=HISTORICAL_FULL_OUTPUTSIZE, priority=priority)
+    for symbol, e in errors.items():
+        print(f"Error fetching historical data for {symbol}: {e}")
+        on_progress(symbol, e)
 
+    for symbol in cold:
+        if symbol in errors:
+            continue
+        data = series.get(symbol, {})
+        if not data:
+            print(f"No historical data received for {symbol}. Skipping.")
+            on_progress(symbol, ValueError(f"No historical data received for {symbol}."))
+            continue
+        try:
+            # Fresh bars win where dates collide with stored ones.
+            synced[symbol] = price_store.merge_bars(symbol, daily_series_to_bars(data))
+            print(f"Historical data for {symbol} saved to {price_store.bars_path(symbol)}")
+            on_progress(symbol, None)
+        except Exception as e:
+            ERRORS.inc(where="sync_historical_data")
+            print(f"Error processing data for {symbol}: {e}")
+            on_progress(symbol, e)
 
-# fetch_historical_data_in_file_all()
+    if any(synced.values()):
+        bump_data_version()
+    return synced
 
 
+def fetch_historical_data_in_file_all(full=False, symbols=None, on_progress=None):
+    symbols = STOCK_SYMBOLS if symbols is None else symbols
+    return sync_historical_data(symbols, full=full, on_progress=on_progress)
 
-def fetch_historical_data_in_file(symbol):
-    params = {
-        "function" : "TIME_SERIES_DAILY",
-        "symbol" : symbol,
-        "apikey" : API_KEY,
-        "outputsize" : "compact"
-    }
 
-    try:
-            
-        response = requests.get(BASE_URL, params=params)
-        data = response.json().get("Time Series (Daily)", {})
+# fetch_historical_data_in_file_all()
 
-        if not data:
-            print(f"No historical data received for {symbol}.")
-            return
-        
-        try :
-            df = pd.DataFrame.from_dict(data=data, orient="index")
-            df.columns = ["open", "high", "low", "close", "volume"]
-            df.index.name = "date"
-            create_folder("historical")
-
-            symbol_file = f"historical/{symbol}_historical.csv"
-            df.to_csv(symbol_file)
-            print(f"Historical data for {symbol} saved to {symbol_file}")
-        
-        except Exception as e:
-            print(f"Error processing data for {symbol}: {e}")
-    
-    except requests.RequestException as e:
-        print(f"Error fetching historical data for {symbol}: {e}")
+
+
+def fetch_historical_data_in_file(symbol, full=False):
+    return sync_historical_data([symbol], full=full, priority=INTERACTIVE)
 
 
 
@@ -218,25 +409,22 @@ def create_portfolio():
 
 def fetch_realtime_data_from_file(symbol):
 
-    try:    
-        if not os.path.isfile(realTimeStocksData):
-            fetch_real_time_data()
-        with open (realTimeStocksData, "r") as file:
-            reader = csv.reader(file)
-            next(reader)
-            for row in reader:
-                if row[0] == symbol:
-                    return float(row[1]), row[2]
+    try:
+        # The tick index is read on cold start and again whenever the data
+        # version changes (any process stored quotes), so versioned pages
+        # never render quotes older than the store. Between bumps quotes
+        # come from the cache and stale or missing ones are refetched
+        # upstream (or re-read from the index when FETCH_ON_READ is off).
+        QUOTE_CACHE.warm(read_quote_rows, version=data_version()[0])
 
         # Returning price and volume values
-        return fetch_real_time_data(symbol=symbol)
-    except FileNotFoundError:
-        print(f"Error: Real-time data file '{realTimeStocksData}' not found.")
-        return None, None
+        return QUOTE_CACHE.get(symbol, fetch_real_time_data if FETCH_ON_READ else reload_quote_from_store)
     except ValueError as ve:
+        ERRORS.inc(where="fetch_realtime_data_from_file")
         print(f"Error parsing real-time data for {symbol}: {ve}")
         return None, None
     except Exception as e:
+        ERRORS.inc(where="fetch_realtime_data_from_file")
         print(f"An unexpected error occurred while fetching real-time data: {e}")
         return None, None
 
@@ -247,62 +435,153 @@ def fetch_historical_data_from_file(symbol):
 
     try:
 
+        bars = load_bars(symbol)
+        if bars is not None:
+            # Returning open and close values of the first bar in the
+            # performance window
+            first = max(0, len(bars) - PERFORMANCE_WINDOW_BARS)
+            return float(bars["open"][first]), float(bars["close"][first])
+
         symbol_historical_file = f"historical/{symbol}_historical.csv"
-        if not os.path.isfile(symbol_historical_file):
-            fetch_historical_data_in_file(symbol)
-        
         with open(symbol_historical_file, mode="r") as file:
             reader = csv.reader(file)
             next(reader)
 
+            # Newest first, so the window starts PERFORMANCE_WINDOW_BARS rows in
             data = list(reader)
-            last_day = data[-1]
+            last_day = data[min(len(data), PERFORMANCE_WINDOW_BARS) - 1]
             
             # Returning open and close values
             return float(last_day[1]), float(last_day[4])
     
     except FileNotFoundError:
+        ERRORS.inc(where="fetch_historical_data_from_file")
         print(f"Error: Historical data file for {symbol} not found.")
         return None, None
     except ValueError as ve:
+        ERRORS.inc(where="fetch_historical_data_from_file")
         print(f"Error parsing historical data for {symbol}: {ve}")
         return None, None
     except Exception as e:
+        ERRORS.inc(where="fetch_historical_data_from_file")
         print(f"An unexpected error occurred while fetching historical data: {e}")
         return None, None
 
 
 
-def calculate_portfolio_value():
+def fetch_latest_prices(symbols):
+    # Latest price per symbol as a float array, NaN where unavailable.
+    prices = np.full(len(symbols), np.nan)
+    for j, symbol in enumerate(symbols):
+        price, _ = fetch_realtime_data_from_file(symbol)
+        if price is not None:
+            prices[j] = price
+    return prices
+
+
+def fetch_baseline_prices(symbols):
+    # Baseline (open at the start of the performance window) per symbol,
+    # NaN where unavailable.
+    prices = np.full(len(symbols), np.nan)
+    for j, symbol in enumerate(symbols):
+        price, _ = fetch_historical_data_from_file(symbol)
+        if price is not None:
+            prices[j] = price
+    return prices
+
+
+class PriceContext:
+    """Latest and baseline prices for the symbols one request needs.
+
+    Every symbol is loaded once, both prices together, the first time it is
+    asked for; after that the valuation and performance functions read the
+    same numbers instead of going back to the quote cache and the bar store.
+    Missing prices are NaN in the arrays and None from latest()/baseline().
+    """
+
+    def __init__(self, symbols=()):
+        self._latest = {}
+        self._baseline = {}
+        self.load(symbols)
+
+    @classmethod
+    def from_prices(cls, symbols, latest_prices, baseline_prices):
+        # For callers that loaded the arrays themselves (the async views).
+        context = cls()
+        for symbol, latest, baseline in zip(symbols, latest_prices, baseline_prices):
+            context._latest[symbol] = float(latest)
+            context._baseline[symbol] = float(baseline)
+        return context
+
+    def load(self, symbols):
+        missing = [symbol for symbol in dict.fromkeys(symbols) if symbol not in self._latest]
+        if missing:
+            for symbol, latest, baseline in zip(missing, fetch_latest_prices(missing), fetch_baseline_prices(missing)):
+                self._latest[symbol] = float(latest)
+                self._baseline[symbol] = float(baseline)
+        return self
+
+    def latest_prices(self, symbols):
+        self.load(symbols)
+        return np.array([self._latest[symbol] for symbol in symbols], dtype=float)
+
+    def baseline_prices(self, symbols):
+        self.load(symbols)
+        return np.array([self._baseline[symbol] for symbol in symbols], dtype=float)
+
+    def latest(self, symbol):
+        price = self.latest_prices([symbol])[0]
+        return None if np.isnan(price) else float(price)
+
+    def baseline(self, symbol):
+        price = self.baseline_prices([symbol])[0]
+        return None if np.isnan(price) else float(price)
+
+
+def portfolio_holdings(portfolio=None):
+    # {symbol: total shares} for a portfolio dict ({"stocks": [...]}),
+    # defaulting to the CLI's PORTFOLIO. Repeated symbols are merged so each
+    # one is priced once.
+    portfolio = PORTFOLIO if portfolio is None else portfolio
+    holdings = {}
+    for item in portfolio.get("stocks", []):
+        holdings[item["stock"]] = holdings.get(item["stock"], 0) + item["shares"]
+    return holdings
+
+
+def calculate_portfolio_value(portfolio=None, prices=None):
     try:
+        holdings = portfolio_holdings(portfolio)
+        prices = PriceContext(holdings) if prices is None else prices
         total_value = 0
-        for item in PORTFOLIO["stocks"]:
-            price, _ = fetch_realtime_data_from_file(item["stock"])
+        for symbol, shares in holdings.items():
+            price = prices.latest(symbol)
             if price is None:
-                print(f"Skipping stock {item['stock']} due to data error.")
+                print(f"Skipping stock {symbol} due to data error.")
                 continue
-            total_value += price * item["shares"]
+            total_value += price * shares
         
         return total_value
     except Exception as e:
+        ERRORS.inc(where="calculate_portfolio_value")
         print(f"An unexpected error occurred while calculating portfolio value: {e}")
         return 0
 
 
-def calculate_performance():
+def calculate_performance(portfolio=None, prices=None):
 
     try:    
-        current_value = calculate_portfolio_value()
+        holdings = portfolio_holdings(portfolio)
+        prices = PriceContext(holdings) if prices is None else prices
+        current_value = calculate_portfolio_value(portfolio, prices)
         initial_value = 0
         gains = {}
 
-        for item in PORTFOLIO["stocks"]:
-            st = item["stock"]
-            sh = item["shares"]
+        for st, sh in holdings.items():
             
-            initial_price, _ = fetch_historical_data_from_file(symbol=st)
+            initial_price = prices.baseline(st)
             initial_value += initial_price * sh
-            price, _ = fetch_realtime_data_from_file(st)
+            price = prices.latest(st)
 
 
             gain_loss = ((price - initial_price) / initial_price) * 100
@@ -312,9 +591,11 @@ def calculate_performance():
         return current_value, initial_value, portfolio_gain_loss, gains
     
     except ZeroDivisionError:
+        ERRORS.inc(where="calculate_performance")
         print("Error: Initial portfolio value is zero. Cannot calculate performance.")
         return 0, 0, 0, {}
     except Exception as e:
+        ERRORS.inc(where="calculate_performance")
         print(f"An unexpected error occurred while calculating performance: {e}")
         return 0, 0, 0, {}
 
@@ -331,6 +612,7 @@ def display_portfolio_summary():
         for symbol, gain_loss in gains.items():
             print(f"{symbol}: {gain_loss:.2f}%")
     except Exception as e:
+        ERRORS.inc(where="display_portfolio_summary")
         print(f"An unexpected error occurred while displaying portfolio summary: {e}")
 
 
@@ -338,11 +620,31 @@ def display_portfolio_summary():
 
 ######################################## PART 3 ########################################
 
-def get_stock_dataframe(symbol):
+@timed(STORE_SECONDS, store="dataframe")
+def get_stock_dataframe(symbol, frequency=price_store.DAILY):
+    # Served from FRAME_CACHE while the backing file is unchanged. Callers
+    # may add columns (calculate_moving_averages does); that never reaches
+    # the cached frame or other callers.
+    try:
+        path = price_store.bars_path(symbol, frequency=frequency)
+    except ValueError as e:
+        ERRORS.inc(where="get_stock_dataframe")
+        print(f"Error processing data for {symbol}: {e}")
+        return None
+    if frequency == price_store.DAILY and not os.path.isfile(path):
+        path = f"historical/{symbol}_historical.csv"
+    return FRAME_CACHE.get(path, lambda: read_stock_dataframe(symbol, frequency))
+
+
+def read_stock_dataframe(symbol, frequency=price_store.DAILY):
     stock_file = f"historical/{symbol}_historical.csv"
     try: 
-        if not os.path.isfile(stock_file):
-            fetch_historical_data_in_file(symbol=symbol)
+        bars = load_bars(symbol, frequency)
+        if bars is not None:
+            return price_store.bars_to_dataframe(bars)
+        if frequency != price_store.DAILY:
+            print(f"Error: No {frequency} bars stored for {symbol}.")
+            return None
         
         df = pd.read_csv(stock_file)
         df["close"] = df["close"].astype(float)
@@ -353,175 +655,253 @@ def get_stock_dataframe(symbol):
         # print(df.index)
         return df
     except FileNotFoundError:
+        ERRORS.inc(where="get_stock_dataframe")
         print(f"Error: Historical data file for {symbol} not found.")
     except pd.errors.EmptyDataError:
+        ERRORS.inc(where="get_stock_dataframe")
         print(f"Error: Historical data file for {symbol} is empty.")
     except Exception as e:
+        ERRORS.inc(where="get_stock_dataframe")
         print(f"Error processing data for {symbol}: {e}")
     return None
 
 
 
-def calculate_moving_averages(df):
+@timed(COMPUTE_SECONDS, operation="moving_averages")
+def calculate_moving_averages(df, short_window=5, long_window=20):
     try:    
-        df["MA_5"] = df["close"].rolling(window=5).mean()
-        df["MA_20"] = df["close"].rolling(window=20).mean()
+        df[ma_column(short_window)] = df["close"].rolling(window=short_window).mean()
+        df[ma_column(long_window)] = df["close"].rolling(window=long_window).mean()
     except KeyError as e:
+        ERRORS.inc(where="calculate_moving_averages")
         print(f"Error: Missing required columns in the DataFrame - {e}")
     except Exception as e:
+        ERRORS.inc(where="calculate_moving_averages")
         print(f"Unexpected error while calculating moving averages: {e}")
 
 
 
 
-def generate_trade_signals(df, symbol):
-    signals = []
+@timed(COMPUTE_SECONDS, operation="trade_signals")
+def generate_trade_signals(df, symbol, short_window=5, long_window=20):
+    # Returns a DataFrame with one row per crossover (stock, date, signal).
     try:
-        for i in range(1, len(df)):
-            if df["MA_5"].iloc[i] > df["MA_20"].iloc[i] and df["MA_5"].iloc[i-1] <= df["MA_20"].iloc[i-1]:
-                signals.append({
-                    "stock" : symbol,
-                    "date" : df.index[i],
-                    "signal" : "BUY"
-                })
-            elif df["MA_5"].iloc[i] < df["MA_20"].iloc[i] and df["MA_5"].iloc[i-1] >= df["MA_20"].iloc[i-1]:
-                signals.append({
-                    "stock" : symbol,
-                    "date" : df.index[i],
-                    "signal" : "BUY"
-                })
+        return crossover_signals(
+            df.index,
+            df[ma_column(short_window)].to_numpy(),
+            df[ma_column(long_window)].to_numpy(),
+            symbol,
+        )
     except KeyError as e:
+        ERRORS.inc(where="generate_trade_signals")
         print(f"Error: Missing required columns in the DataFrame for {symbol} - {e}")
     except Exception as e:
+        ERRORS.inc(where="generate_trade_signals")
         print(f"Unexpected error generating trade signals for {symbol}: {e}")
     
-    return signals
+    return empty_signals()
 
 
 
-def trade_analyzer(stocks_list):
-    all_signals = []
+@timed(STORE_SECONDS, store="panel")
+def load_price_panel(stocks_list, column="close", frequency=price_store.DAILY):
+    # Aligns every requested symbol on one date axis: (dates, symbols, values).
+    series = {}
+    for stock in dict.fromkeys(stocks_list):
+        try:
+            bars = load_bars(stock, frequency)
+            if bars is not None:
+                series[stock] = (np.asarray(bars["date"]), np.asarray(bars[column], dtype=float))
+            else:
+                df = get_stock_dataframe(stock, frequency)
+                if df is not None:
+                    series[stock] = (df.index.values.astype("datetime64[ns]").view("i8"), df[column].to_numpy(dtype=float))
+        except Exception as e:
+            ERRORS.inc(where="load_price_panel")
+            print(f"Error loading data for {stock}: {e}")
+
+        if stock not in series:
+            print(f"failed to fetch data for {stock}.")
+    return align_panel(series)
+
+
+
+@timed(COMPUTE_SECONDS, operation="analyze_panel")
+def analyze_panel(dates, symbols, closes, short_window=5, long_window=20):
+    packed, rows = pack_panel(closes)
+    means = rolling_means_panel(packed, (short_window, long_window))
+    return panel_crossover_signals(dates, symbols, means[short_window], means[long_window], rows)
 
+
+
+def trade_analyzer(stocks_list, short_window=5, long_window=20, frequency=price_store.DAILY):
+    # Loads the whole universe into one dates x symbols panel and computes
+    # moving averages and crossovers for every symbol in a single pass.
     try:
-        for stock in stocks_list:
-            print(f"Processing {stock}")
-            df = get_stock_dataframe(stock)
-            if df is not None:
-                calculate_moving_averages(df)
-                signals = generate_trade_signals(df, stock)
-                all_signals.extend(signals)
-            else:
-                print(f"failed to fetch data for {stock}.")
+        dates, symbols, closes = load_price_panel(stocks_list, frequency=frequency)
+        return analyze_panel(dates, symbols, closes, short_window, long_window)
     except Exception as e:
+        ERRORS.inc(where="trade_analyzer")
         print(f"Unexpected error analyzing trades: {e}")
-    return all_signals
+    return empty_signals()
 
 
 
 
-def display_signals(signals):
-    print("\n\nTrade Signals\n")
-    for signal in signals:
-        print(f"Stock: {signal['stock']}, Date: {signal['date'].strftime('%Y-%m-%d')}, Signal: {signal['signal']}")
+INDICATOR_STATE_DIR = "indicator_state"
+LIVE_SHORT_WINDOW = 5
+LIVE_LONG_WINDOW = 20
+STREAMING_INDICATORS = {}
+STREAMING_LOCK = threading.Lock()
+# Symbols whose streaming state changed since save_live_signals last ran.
+LIVE_DIRTY = set()
 
 
+def load_streaming_indicator(symbol):
+    # The persisted state, or on a true cold start the tail of the stored
+    # daily bars; None without either.
+    state_file = os.path.join(INDICATOR_STATE_DIR, f"{symbol}.json")
+    if os.path.isfile(state_file):
+        with open(state_file, "r") as file:
+            return StreamingCrossover.from_dict(json.load(file))
+    bars = price_store.load_bars(symbol)
+    if bars is not None and len(bars):
+        tail = bars[-(LIVE_LONG_WINDOW + 1):]
+        dates = [pd.Timestamp(int(d)).strftime("%Y-%m-%d") for d in tail["date"]]
+        return StreamingCrossover.from_history(tail["close"], dates, LIVE_SHORT_WINDOW, LIVE_LONG_WINDOW)
+    return None
 
 
-def simulate_trades(signals, df, initial_capital = 10000):
-    capital = initial_capital
-    portfolio_stocks = PORTFOLIO["stocks"]
-    trade_history = []
+def get_streaming_indicator(symbol):
+    # In-memory first, then whatever load_streaming_indicator finds.
+    indicator = STREAMING_INDICATORS.get(symbol)
+    if indicator is not None:
+        return indicator
 
-    for signal in signals:
-        try:
-            date = signal["date"]
-            stock = signal["stock"]
-            action = signal["signal"]
+    try:
+        indicator = load_streaming_indicator(symbol)
+    except Exception as e:
+        ERRORS.inc(where="get_streaming_indicator")
+        print(f"Error restoring indicator state for {symbol}: {e}")
+
+    if indicator is None:
+        indicator = StreamingCrossover(LIVE_SHORT_WINDOW, LIVE_LONG_WINDOW)
+    STREAMING_INDICATORS[symbol] = indicator
+    return indicator
+
+
+def save_streaming_indicator(symbol, indicator):
+    os.makedirs(INDICATOR_STATE_DIR, exist_ok=True)
+    state_file = os.path.join(INDICATOR_STATE_DIR, f"{symbol}.json")
+    tmp_file = f"{state_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "w") as file:
+        json.dump(indicator.to_dict(), file)
+    os.replace(tmp_file, state_file)
 
-            if date not in df.index:
-                logging.warning(f"Missing data for date {date} for stock")
+
+def update_live_signal(row):
+    # Feeds a live quote into the symbol's streaming MA_5/MA_20 state and
+    # returns "BUY", "SELL" or None for today's bar. The state is written by
+    # save_live_signals, once per batch of quotes.
+    try:
+        symbol = row["symbol"]
+        with STREAMING_LOCK:
+            indicator = get_streaming_indicator(symbol)
+            signal = indicator.update(float(row["price"]), row["timestamp"].strftime("%Y-%m-%d"))
+            LIVE_DIRTY.add(symbol)
+        return signal
+    except Exception as e:
+        ERRORS.inc(where="update_live_signal")
+        print(f"Error updating live signal for {row.get('symbol')}: {e}")
+        return None
+
+
+def save_live_signals():
+    # Persists the streaming state of every symbol updated since the last
+    # call, so other processes (and the next run) see it.
+    with STREAMING_LOCK:
+        for symbol in sorted(LIVE_DIRTY):
+            try:
+                save_streaming_indicator(symbol, STREAMING_INDICATORS[symbol])
+            except OSError as e:
+                ERRORS.inc(where="save_live_signals")
+                print(f"Error saving indicator state for {symbol}: {e}")
                 continue
+            LIVE_DIRTY.discard(symbol)
 
-            close_price = df.loc[date, "close"]
 
-            if action == "BUY":
-                if capital < close_price:
-                    logging.warning(
-                        f"Insufficient funds to BUY {stock} on {date}. Capital: {capital}, Price: {close_price}"
-                    )
-                    continue
+def live_signal(symbol):
+    # The symbol's streaming signal as of the last saved batch of quotes,
+    # whichever process fed them; None when there is no state or history.
+    try:
+        indicator = load_streaming_indicator(symbol)
+    except Exception as e:
+        ERRORS.inc(where="live_signal")
+        print(f"Error reading indicator state for {symbol}: {e}")
+        return None
+    if indicator is None:
+        return None
+    return {
+        "stock": symbol,
+        "date": indicator.last_date,
+        ma_column(indicator.short_window): None if np.isnan(indicator.short_ma) else indicator.short_ma,
+        ma_column(indicator.long_window): None if np.isnan(indicator.long_ma) else indicator.long_ma,
+        "signal": indicator.signal,
+    }
 
-                capital -= close_price
-                stock_entry = next((item for item in portfolio_stocks if item["stock"] == stock), None)
-                if stock_entry:
-                    stock_entry["shares"] += 1
-                else:
-                    portfolio_stocks.append({"stock": stock, "shares": 1})
 
+def live_signals(symbols):
+    return [signal for signal in (live_signal(symbol) for symbol in symbols) if signal is not None]
 
-                trade_history.append({
-                    "data" : date,
-                    "stock" : stock,
-                    "action" : "BUY",
-                    "price" : close_price
-                })
 
-                logging.info(f"Buy : {stock} at ${close_price:.2f} on {date}. Remaining Capital: ${capital:.2f}")
 
-            elif action == "SELL":
-                stock_entry = next((item for item in portfolio_stocks if item["stock"] == stock), None)
-                if not stock_entry or stock_entry["shares"] <= 0:
-                    logging.warning(f"No holdings to SELL {stock} on {date}.")
-                    continue
 
-                capital += close_price
-                stock_entry["shares"] -= 1
+def display_signals(signals):
+    print("\n\nTrade Signals\n")
+    for signal in signals.itertuples(index=False):
+        print(f"Stock: {signal.stock}, Date: {signal.date.strftime('%Y-%m-%d')}, Signal: {signal.signal}")
 
-                if stock_entry["shares"] == 0:
-                    portfolio_stocks.remove(stock_entry)
 
-                trade_history.append({
-                    "date": date,
-                    "stock": stock,
-                    "action": "SELL",
-                    "price": close_price
-                })
 
-                logging.info(f"SELL: {stock} at ${close_price:.2f} on {date}. Remaining Capital: ${capital:.2f}")
 
-        except KeyError as e:
-            logging.error(f"Key error processing signal {signal}: {e}")
-        except Exception as e:
-            logging.error(f"Unexpected error during trade simulation: {e}")
+@timed(COMPUTE_SECONDS, operation="simulate_trades")
+def simulate_trades(signals, dates, symbols, closes, initial_capital = 10000, initial_positions = None):
+    # One chronological pass over every symbol's signals, merged into a
+    # single date-sorted stream. Each fill is priced from its own symbol's
+    # bar and positions live in an array indexed by panel column.
+    rows, cols, directions = signals_to_events(signals, dates, symbols)
+    if len(rows) < len(signals):
+        logging.warning(f"Skipping {len(signals) - len(rows)} signals with no matching price data.")
 
-        
-        portfolio_value = sum(
-            df.loc[signals[-1]['date'], "close"] * stock["shares"]
-            for stock in portfolio_stocks
-            )
+    result = execute_events(closes, rows, cols, directions, initial_capital, initial_positions)
+    if result["skipped"]:
+        logging.warning(f"Skipped {result['skipped']} signals for insufficient funds or holdings.")
 
+    trade_history = TradeHistory(
+        dates, symbols, result["fill_rows"], result["fill_cols"], result["fill_shares"], result["fill_prices"]
+    )
 
-    
-    return capital, portfolio_value, trade_history
+    # Holdings marked to market at the latest bar of each symbol.
+    last_prices = forward_fill(closes)[-1] if len(closes) else np.zeros(len(symbols))
+    portfolio_value = float(np.dot(result["positions"], np.nan_to_num(last_prices)))
+
+    return result["cash"], portfolio_value, trade_history
 
 
 
-def run_simulator():
+@timed(COMPUTE_SECONDS, operation="run_simulator")
+def run_simulator(portfolio=None):
     # CREATE PORTFOLIO
     # create_portfolio()
-    total_capital = 0
-    total_portfolio_value = 0
-    full_trade_history = []
-    
-    signals = trade_analyzer(stock["stock"] for stock in PORTFOLIO.get("stocks", []))
-    for item in PORTFOLIO["stocks"]:
+    holdings = portfolio_holdings(portfolio)
 
-        df = get_stock_dataframe(item["stock"])
-        
-        capital, portfolio_value, trade_history = simulate_trades(signals=signals, df=df, initial_capital=10000)
-        total_capital = capital
-        total_portfolio_value += portfolio_value
-        full_trade_history.extend(trade_history)
+    dates, symbols, closes = load_price_panel(holdings)
+    signals = analyze_panel(dates, symbols, closes)
+    initial_positions = [holdings[symbol] for symbol in symbols]
+
+    total_capital, total_portfolio_value, full_trade_history = simulate_trades(
+        signals, dates, symbols, closes, initial_capital=10000, initial_positions=initial_positions
+    )
     
     logging.info("Simulation completed.")
     logging.info(f"Final Capital: ${total_capital:.2f}, Portfolio Value: ${total_portfolio_value:.2f}")
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["date", "stock", "action", "price"]
+
+
+class TradeHistory:
+    """A simulation's fills as parallel arrays instead of a list of dicts.
+
+    A fill costs four array slots (about 32 bytes) rather than a dict, and
+    trades only become dicts when they are read: by index or slice (which is
+    what the paginated API does), by iterating, or as CSV/NDJSON chunks for
+    the streaming exports.
+    """
+
+    def __init__(self, dates, symbols, rows, cols, shares, prices):
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.shares = np.asarray(shares, dtype=float)
+        self.prices = np.asarray(prices, dtype=float)
+
+    def to_bytes(self):
+        # Compact .npz form, for handing a history between processes.
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            dates=np.asarray(self.dates).astype("datetime64[ns]").view("i8"),
+            symbols=np.array(self.symbols, dtype=str),
+            rows=self.rows, cols=self.cols, shares=self.shares, prices=self.prices,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        arrays = np.load(io.BytesIO(data))
+        dates = pd.DatetimeIndex(arrays["dates"].view("datetime64[ns]"), name="date")
+        return cls(dates, arrays["symbols"].tolist(), arrays["rows"], arrays["cols"], arrays["shares"], arrays["prices"])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def _trade(self, i):
+        return {
+            "date": self.dates[self.rows[i]],
+            "stock": self.symbols[self.cols[i]],
+            "action": "BUY" if self.shares[i] > 0 else "SELL",
+            "price": float(self.prices[i]),
+        }
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._trade(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("trade index out of range")
+        return self._trade(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._trade(i)
+
+    def iter_csv(self, chunk_size=1000):
+        # The history as CSV text, header first, one chunk per chunk_size trades.
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(COLUMNS)
+        for start in range(0, len(self), chunk_size):
+            for trade in self[start:start + chunk_size]:
+                writer.writerow([trade["date"].isoformat(), trade["stock"], trade["action"], trade["price"]])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def iter_ndjson(self, chunk_size=1000):
+        # One JSON object per line, in chunks of chunk_size trades.
+        for start in range(0, len(self), chunk_size):
+            yield "".join(
+                json.dumps({**trade, "date": trade["date"].isoformat()}) + "\n"
+                for trade in self[start:start + chunk_size]
+            )
@@ -0,0 +1,58 @@
+import hashlib
+
+from .data_version import per_version
+from .models import TrackedSymbol
+
+# The symbol universe lives in the TrackedSymbol table (seeded with
+# tracker_scripts.STOCK_SYMBOLS, extended with `manage.py load_symbols`).
+# Workers split it into shards with rendezvous hashing: each shard scores a
+# symbol and the highest score wins. A symbol's shard depends only on the
+# symbol and the shard count, so adding or removing symbols never moves any
+# other symbol, and going from N to N+1 shards moves only the 1/(N+1) of
+# symbols the new shard wins.
+
+
+def symbol_universe():
+    return list(TrackedSymbol.objects.filter(active=True).order_by("symbol").values_list("symbol", flat=True))
+
+
+# The universe as of the current data version (load_symbols bumps it), for
+# pages that read it on every request.
+cached_symbol_universe = per_version(symbol_universe)
+
+
+@per_version
+def universe_digest():
+    return hashlib.sha1(",".join(cached_symbol_universe()).encode()).hexdigest()
+
+
+def parse_shard(value):
+    # "i/N" -> (i, N) with 0 <= i < N.
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {value!r}.")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be in 0..N-1, got {value!r}.")
+    return index, count
+
+
+def shard_labels(count):
+    # Labels for a universe split count ways; one shard means no label.
+    return [""] if count <= 1 else [f"{index}/{count}" for index in range(count)]
+
+
+def _score(shard, symbol):
+    return hashlib.blake2b(f"{shard}:{symbol}".encode(), digest_size=8).digest()
+
+
+def shard_for(symbol, count):
+    return max(range(count), key=lambda shard: _score(shard, symbol))
+
+
+def shard_symbols(symbols, shard=""):
+    # The symbols that belong to a shard label ("" keeps all of them).
+    if not shard:
+        return list(symbols)
+    index, count = parse_shard(shard)
+    return [symbol for symbol in symbols if shard_for(symbol, count) == index]
@@ -6,9 +6,11 @@ urlpatterns = [
     path('signals/', views.stock_signals_view, name='stock_signals'),
     
     path('data-collection/', views.data_collection_view, name='data_collection'),
+    path('data-collection/status/', views.data_collection_status_api, name='data_collection_status'),
 
     path('portfolio/create/', views.portfolio_view, name='portfolio_form'),
     path('portfolio/details/', views.portfolio_details_view, name='portfolio_details'),
+    path('portfolio/value/', views.calculate_portfolio_value_view, name='portfolio_value'),
     path('portfolio/performance/', views.calculate_performance_view, name='portfolio_performance'),
     path('portfolio/summary/', views.portfolio_summary_view, name='portfolio_summary'),
     path('stocks/signals/', views.stock_signals_view, name='stock_signals'),
@@ -16,4 +18,15 @@ urlpatterns = [
     path('trade-analyzer/', views.trade_analyzer_view, name='trade_analyzer'),
 
     path('run-simulation/', views.run_simulation_view, name='run_simulation'),
+    path('api/simulation/trades/', views.simulation_trades_api, name='simulation_trades_api'),
+    path('api/simulation/trades.csv', views.simulation_trades_export, {"export_format": "csv"}, name='simulation_trades_csv'),
+    path('api/simulation/trades.ndjson', views.simulation_trades_export, {"export_format": "ndjson"}, name='simulation_trades_ndjson'),
+
+    path('api/jobs/', views.jobs_api, name='jobs_api'),
+    path('api/jobs/<int:pk>/', views.job_status_api, name='job_status_api'),
+    path('api/jobs/<int:pk>/result/', views.job_result_api, name='job_result_api'),
+
+    path('api/portfolios/valuation/', views.portfolio_valuation_api, name='portfolio_valuation_api'),
+
+    path('metrics', views.metrics_view, name='metrics'),
 ]
@@ -0,0 +1,51 @@
+import numpy as np
+
+from .tracker_scripts import PriceContext, portfolio_holdings
+
+
+def holdings_matrix(portfolios):
+    # portfolios x distinct symbols share counts, plus the symbol order.
+    holdings = [portfolio_holdings(portfolio) for portfolio in portfolios]
+    symbols = sorted({symbol for held in holdings for symbol in held})
+    column_of = {symbol: j for j, symbol in enumerate(symbols)}
+
+    matrix = np.zeros((len(portfolios), len(symbols)))
+    for i, held in enumerate(holdings):
+        for symbol, shares in held.items():
+            matrix[i, column_of[symbol]] = shares
+    return matrix, symbols
+
+
+def value_portfolios(portfolios, prices=None):
+    # Values every portfolio at once: each distinct symbol is priced a
+    # single time (through prices, a PriceContext, when the caller has one),
+    # then values are one matrix-vector product per price set. A symbol
+    # missing either price is left out of both totals, as
+    # calculate_performance_view does.
+    portfolios = list(portfolios)
+    matrix, symbols = holdings_matrix(portfolios)
+    prices = PriceContext(symbols) if prices is None else prices
+    latest = prices.latest_prices(symbols)
+    baseline = prices.baseline_prices(symbols)
+
+    priced = ~np.isnan(latest) & ~np.isnan(baseline) & (baseline != 0)
+    priced_matrix = matrix * priced
+    current_values = priced_matrix @ np.where(priced, latest, 0.0)
+    initial_values = priced_matrix @ np.where(priced, baseline, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        symbol_gains = np.where(priced, (latest - baseline) / baseline * 100, np.nan)
+        portfolio_gains = np.where(initial_values != 0, (current_values - initial_values) / initial_values * 100, np.nan)
+
+    results = []
+    for i, portfolio in enumerate(portfolios):
+        held = np.flatnonzero(priced_matrix[i])
+        results.append({
+            "id": portfolio.get("id"),
+            "name": portfolio.get("name"),
+            "current_value": float(current_values[i]),
+            "initial_value": float(initial_values[i]),
+            "portfolio_gain_loss": None if np.isnan(portfolio_gains[i]) else float(portfolio_gains[i]),
+            "gains": {symbols[j]: float(symbol_gains[j]) for j in held},
+        })
+    return results
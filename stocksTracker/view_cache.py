@@ -0,0 +1,96 @@
+import functools
+import hashlib
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .data_version import data_version
+from .metrics import counter
+from .refresher import market_data_freshness
+
+VIEW_CACHE = counter("stocks_view_cache_total", "Cached view lookups by outcome.")
+
+
+def cache_on_data_version(name, vary=None, private=False):
+    """Caches a page until the market data it was built from changes.
+
+    The cache key is (name, data version, *vary(request)); the refresh
+    pipeline bumps the data version, so a refresh invalidates every page at
+    once and nothing expires on a timer. Each response carries an ETag
+    derived from the key, so a client polling with If-None-Match gets a 304
+    without the page being looked up at all. Shared pages also send
+    Last-Modified (the time of the last bump); private ones, which vary by
+    session, can't, because the same date would match another session's
+    page.
+
+    Pages are neither cached nor served from cache while the data is stale,
+    since the stale banner's wording changes by the minute, nor when
+    rendering them consumed flash messages.
+    """
+
+    def decorator(view):
+        def lookup(request):
+            # (key, etag, last_modified, cached response or None); a None key
+            # bypasses the cache.
+            if request.method not in ("GET", "HEAD") or market_data_freshness()["stale"]:
+                return None, None, None, None
+            version, modified = data_version()
+            parts = [name, version, *(vary(request) if vary else ())]
+            key = "view:" + hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+            etag = f'"{key[5:29]}"'
+            last_modified = None if private or modified is None else int(modified)
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                VIEW_CACHE.inc(view=name, result="not_modified")
+                return key, etag, last_modified, response
+            cached = cache.get(key)
+            if cached is not None:
+                VIEW_CACHE.inc(view=name, result="hit")
+                content, content_type = cached
+                return key, etag, last_modified, HttpResponse(content, content_type=content_type)
+            VIEW_CACHE.inc(view=name, result="miss")
+            return key, etag, last_modified, None
+
+        def store(request, key, response):
+            messages = getattr(request, "_messages", None)
+            if response.status_code != 200 or response.streaming or (messages is not None and messages.used):
+                return False
+            # Old versions are never read again; the backend's own eviction
+            # clears them out.
+            cache.set(key, (response.content, response["Content-Type"]), None)
+            return True
+
+        def finish(response, etag, last_modified, cacheable):
+            if cacheable:
+                response["ETag"] = etag
+                if last_modified is not None:
+                    response["Last-Modified"] = http_date(last_modified)
+            if private:
+                patch_cache_control(response, no_cache=True, private=True)
+            else:
+                patch_cache_control(response, no_cache=True)
+            return response
+
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                # lookup may hit the database once per data version.
+                key, etag, last_modified, response = await sync_to_async(lookup)(request)
+                if response is not None:
+                    return finish(response, etag, last_modified, True)
+                response = await view(request, *args, **kwargs)
+                return finish(response, etag, last_modified, key is not None and store(request, key, response))
+        else:
+            @functools.wraps(view)
+            def wrapper(request, *args, **kwargs):
+                key, etag, last_modified, response = lookup(request)
+                if response is not None:
+                    return finish(response, etag, last_modified, True)
+                response = view(request, *args, **kwargs)
+                return finish(response, etag, last_modified, key is not None and store(request, key, response))
+        return wrapper
+    return decorator
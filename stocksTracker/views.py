@@ -1,8 +1,44 @@
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render,HttpResponse
-
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+
+from stocksTracker.async_loaders import acurrent_portfolio, alive_signals, aprice_context, atrade_analyzer
+from stocksTracker.data_version import data_version
 from stocksTracker.forms import PortfolioForm
-from .tracker_scripts import calculate_performance, fetch_historical_data_from_file, fetch_historical_data_in_file, fetch_historical_data_in_file_all, fetch_real_time_data, fetch_real_time_data_all, fetch_realtime_data_from_file, run_simulator,trade_analyzer
+from stocksTracker.jobs import latest_simulation, simulation_result, submit_job, submit_simulation
+from stocksTracker.metrics import ERRORS, render as render_metrics
+from stocksTracker.models import Holding, Job, Portfolio, load_portfolio, load_portfolios
+from stocksTracker.permissions import OwnPortfoliosOnly, StaffForRefreshJobs
+from stocksTracker.refresher import latest_refresh, market_data_freshness, request_refresh
+from stocksTracker.serializers import JobRequestSerializer, TradeSerializer, ValuationRequestSerializer, ValuationSerializer
+from stocksTracker.universe import cached_symbol_universe, universe_digest
+from stocksTracker.valuation import holdings_matrix, value_portfolios
+from stocksTracker.view_cache import cache_on_data_version
+from .tracker_scripts import calculate_performance, stored_real_time_data, trade_analyzer
+
+logger = logging.getLogger(__name__)
+
+
+def current_portfolio(request):
+    # The portfolio this session created, as a {"name", ..., "stocks"} dict.
+    portfolio_id = request.session.get("portfolio_id")
+    if portfolio_id is None:
+        return {}
+    return load_portfolio(portfolio_id) or {}
+
 
 def index(request):
     return render(request, 'index.html')
@@ -11,8 +47,14 @@ def testing(request):
     return HttpResponse()
 
 
+def metrics_view(request):
+    # Prometheus text exposition of this process's metrics.
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@cache_on_data_version("portfolio_summary", vary=lambda request: [request.session.get("portfolio_id")], private=True)
 def portfolio_summary_view(request):
-    current_value, initial_value, portfolio_gain_loss, gains = calculate_performance()
+    current_value, initial_value, portfolio_gain_loss, gains = calculate_performance(current_portfolio(request))
     context = {
         "initial_value": initial_value,
         "current_value": current_value,
@@ -22,33 +64,42 @@ def portfolio_summary_view(request):
     return render(request, 'stocksTracker/portfolio_summary.html', context)
 
 
-def stock_signals_view(request):
-    stocks = ["AAPL", "GOOGL", "MSFT"]
-    signals = trade_analyzer(stocks)
-    context = {"signals": signals}
-    return render(request, 'stocksTracker/stock_signals.html', context)
+@cache_on_data_version("stock_signals", vary=lambda request: [universe_digest()])
+async def stock_signals_view(request):
+    stocks = await sync_to_async(cached_symbol_universe)()
+    signals, live = await asyncio.gather(atrade_analyzer(stocks), alive_signals(stocks))
+    context = {"signals": signals.to_dict("records"), "live_signals": live}
+    return await sync_to_async(render)(request, 'stocksTracker/stock_signals.html', context)
 
 
-def data_collection_view(request):
+async def data_collection_view(request):
+    # Fetching happens in the refresh_market_data worker; this view only
+    # queues a refresh and shows what is already stored.
     if request.method == "POST":
-        real_time_data = fetch_real_time_data_all()
-        
-        fetch_historical_data_in_file_all()
-        
-        context = {
-            "real_time_data": real_time_data,
-        }
-        return render(request, 'stocksTracker/data_collection.html', context)
-    else:
-        return render(request, 'stocksTracker/data_collection.html')
+        await sync_to_async(request_refresh)()
+        return redirect("data_collection")
 
+    real_time_data, refresh = await asyncio.gather(
+        sync_to_async(stored_real_time_data, thread_sensitive=False)(),
+        sync_to_async(latest_refresh)(),
+    )
+    context = {
+        "real_time_data": real_time_data,
+        "refresh": refresh,
+    }
+    return await sync_to_async(render)(request, 'stocksTracker/data_collection.html', context)
 
-PORTFOLIO = {}
 
+@api_view(["GET"])
+def data_collection_status_api(request):
+    run = latest_refresh()
+    return Response({
+        "refresh": run.to_dict() if run else None,
+        "freshness": market_data_freshness(),
+    })
 
-def portfolio_view(request):
-    global PORTFOLIO
 
+def portfolio_view(request):
     if request.method == "POST":
         form = PortfolioForm(request.POST)
         if form.is_valid():
@@ -59,20 +110,27 @@ def portfolio_view(request):
             stocks_input = form.cleaned_data["stocks"]
 
             try:
-                stocks_list = []
+                shares_by_symbol = {}
                 for stock_entry in stocks_input.split(","):
                     symbol, shares = stock_entry.strip().split(":")
-                    stocks_list.append({"stock": symbol.strip(), "shares": int(shares.strip())})
-                
-                PORTFOLIO["name"] = name
-                PORTFOLIO["email"] = email
-                PORTFOLIO["phone"] = phone
-                PORTFOLIO["stocks"] = stocks_list
+                    symbol = symbol.strip()
+                    shares = int(shares.strip())
+                    if shares < 0:
+                        raise ValueError("The number of shares cannot be negative.")
+                    shares_by_symbol[symbol] = shares_by_symbol.get(symbol, 0) + shares
 
             except ValueError:
                 form.add_error(None, "Invalid stock input format. Please use the correct format.")
                 return render(request, 'stocksTracker/portfolio.html', {"form": form})
 
+            with transaction.atomic():
+                portfolio = Portfolio.objects.create(name=name, email=email, phone=phone)
+                Holding.objects.bulk_create([
+                    Holding(portfolio=portfolio, symbol=symbol, shares=shares)
+                    for symbol, shares in shares_by_symbol.items()
+                ])
+            request.session["portfolio_id"] = portfolio.pk
+
             return redirect("portfolio_details")
     else:
         form = PortfolioForm()
@@ -83,73 +141,59 @@ def portfolio_view(request):
 
 
 def portfolio_details_view(request):
-    global PORTFOLIO
-
-    context = {"portfolio": PORTFOLIO}
+    context = {"portfolio": current_portfolio(request)}
     return render(request, 'stocksTracker/portfolio_details.html', context)
 
 
-def calculate_portfolio_value_view(request):
-    global PORTFOLIO
-
+async def calculate_portfolio_value_view(request):
+    # Valued through value_portfolios, like the performance page and the
+    # valuation API, so all three agree on which holdings count.
     try:
-        total_value = 0
-        for item in PORTFOLIO.get("stocks", []):
-            price, _ = fetch_realtime_data_from_file(item["stock"])
-            if price is None:
-                continue
-            total_value += price * item["shares"]
-
-        return render(request, 'stocksTracker/portfolio_value.html', {"total_value": total_value})
-    except Exception as e:
-        return render(request, 'stocksTracker/portfolio_value.html', {"error": str(e)})
-
+        portfolio = await acurrent_portfolio(request)
+        _, symbols = holdings_matrix([portfolio])
+        result, = value_portfolios([portfolio], await aprice_context(symbols))
 
-def calculate_performance_view(request):
-    global PORTFOLIO
+        for symbol in symbols:
+            if symbol not in result["gains"]:
+                logger.warning("Skipping stock %s due to data error.", symbol)
+                ERRORS.inc(where="calculate_portfolio_value_view")
 
-    try:
-        current_value = 0
-        initial_value = 0
-        gains = {}
-
-        for item in PORTFOLIO.get("stocks", []):
-            symbol = item["stock"]
-            shares = item["shares"]
-
-            initial_price, _ = fetch_historical_data_from_file(symbol)
-            price, _ = fetch_realtime_data_from_file(symbol)
-
-            if initial_price is None or price is None:
-                continue
+        context = {"total_value": result["current_value"]}
+    except Exception as e:
+        context = {"error": str(e)}
+    return await sync_to_async(render)(request, 'stocksTracker/portfolio_value.html', context)
 
-            initial_value += initial_price * shares
-            current_value += price * shares
 
-            gains[symbol] = ((price - initial_price) / initial_price) * 100
+async def calculate_performance_view(request):
+    try:
+        portfolio = await acurrent_portfolio(request)
+        _, symbols = holdings_matrix([portfolio])
+        result, = value_portfolios([portfolio], await aprice_context(symbols))
 
-        portfolio_gain_loss = ((current_value - initial_value) / initial_value) * 100
+        if result["portfolio_gain_loss"] is None:
+            raise ZeroDivisionError("Initial portfolio value is zero.")
 
         context = {
-            "current_value": current_value,
-            "initial_value": initial_value,
-            "portfolio_gain_loss": portfolio_gain_loss,
-            "gains": gains
+            "current_value": result["current_value"],
+            "initial_value": result["initial_value"],
+            "portfolio_gain_loss": result["portfolio_gain_loss"],
+            "gains": result["gains"]
         }
-        return render(request, 'stocksTracker/portfolio_performance.html', context)
     except Exception as e:
-        return render(request, 'stocksTracker/portfolio_performance.html', {"error": str(e)})
+        context = {"error": str(e)}
+    return await sync_to_async(render)(request, 'stocksTracker/portfolio_performance.html', context)
 
 
 
 # Trade Analyzer View
+@cache_on_data_version("trade_analyzer", vary=lambda request: [universe_digest()])
 def trade_analyzer_view(request):
-    stocks_list = ["AAPL", "GOOG", "MSFT"]  # Example stock symbols
+    stocks_list = cached_symbol_universe()
     trade_signals = trade_analyzer(stocks_list)
 
     # Format the trade signals for display
     formatted_signals = {}
-    for signal in trade_signals:
+    for signal in trade_signals.to_dict("records"):
         stock = signal["stock"]
         signal_text = f"- {signal['signal']} on {signal['date'].strftime('%b. %d, %Y, midnight')}"
         if stock not in formatted_signals:
@@ -161,17 +205,191 @@ def trade_analyzer_view(request):
 
 
 
+def visible_job(request, pk, kind=None):
+    # Job pk if this session may see it: simulation jobs only for the
+    # session's own portfolio. Refresh jobs are shared, like the refresh
+    # status on the data collection page.
+    job = Job.objects.filter(pk=pk).first()
+    if job is None or (kind is not None and job.kind != kind):
+        return None
+    if job.kind == "simulation" and job.params.get("portfolio_id") != request.session.get("portfolio_id"):
+        return None
+    return job
+
+
+def current_simulation(request):
+    # (job, result) for simulation job ?job=<id>, or else the session
+    # portfolio's latest simulation; (None, None) when there is none this
+    # session may see. Reading never queues a backtest (POST
+    # /run-simulation/ does). result is run_simulator's (capital, value,
+    # TradeHistory) once the job is done and None until then; it stays in
+    # the cache for JOBS_RESULT_CACHE_SECONDS so paging through a long
+    # history doesn't reload it.
+    job_id = request.GET.get("job")
+    if job_id:
+        job = visible_job(request, int(job_id), kind="simulation") if job_id.isdigit() else None
+    else:
+        job = latest_simulation(request.session.get("portfolio_id"))
+    if job is None:
+        return None, None
+    if job.state != Job.DONE:
+        return job, None
+    key = f"simulation:{job.pk}"
+    result = cache.get(key)
+    if result is None:
+        result = simulation_result(job)
+        cache.set(key, result, settings.JOBS_RESULT_CACHE_SECONDS)
+    return job, result
+
+
+def job_status_code(job):
+    # 202 while a job is queued or running, 500 once it has failed.
+    return status.HTTP_500_INTERNAL_SERVER_ERROR if job.state == Job.FAILED else status.HTTP_202_ACCEPTED
+
+
 def run_simulation_view(request):
-    if not PORTFOLIO or not PORTFOLIO.get("stocks", []):
+    portfolio = current_portfolio(request)
+    if not portfolio or not portfolio.get("stocks", []):
         messages.error(request, "Your portfolio is not recorded. Please create your portfolio first.")
         return redirect('portfolio_form')
 
-    # Run the simulation
-    total_capital, total_portfolio_value, full_trade_history = run_simulator()
+    if request.method == "POST":
+        # Queues a backtest, or reuses the one for the current market data.
+        job = submit_simulation(portfolio["id"])
+        return redirect(f"{reverse('run_simulation')}?job={job.pk}")
 
-    # Render the simulation results
-    return render(request, "stocksTracker/simulation_results.html", {
-        "total_capital": total_capital,
-        "total_portfolio_value": total_portfolio_value,
-        "full_trade_history": full_trade_history,
-    })
\ No newline at end of file
+    # Shows the latest simulation; while it is queued or running the page
+    # reloads itself until it is done.
+    job, result = current_simulation(request)
+    context = {
+        "job": job,
+        "outdated": job is not None and job.params.get("version") != data_version()[0],
+    }
+    if result is not None:
+        total_capital, total_portfolio_value, full_trade_history = result
+
+        # Render the simulation results, one page of trades at a time
+        context.update({
+            "total_capital": total_capital,
+            "total_portfolio_value": total_portfolio_value,
+            "trades": Paginator(full_trade_history, 100).get_page(request.GET.get("page")),
+        })
+    return render(request, "stocksTracker/simulation_results.html", context)
+
+
+class TradePagination(LimitOffsetPagination):
+    default_limit = 500
+    max_limit = 5000
+
+
+@api_view(["GET"])
+def simulation_trades_api(request):
+    # ?limit=&offset= pages of the simulated trade history; ?job=<id> picks
+    # a simulation job other than the session's.
+    job, result = current_simulation(request)
+    if job is None:
+        return Response({"detail": "Run a simulation first."}, status=status.HTTP_404_NOT_FOUND)
+    if result is None:
+        return Response(job.to_dict(), status=job_status_code(job))
+    paginator = TradePagination()
+    page = paginator.paginate_queryset(result[2], request)
+    return paginator.get_paginated_response(TradeSerializer(page, many=True).data)
+
+
+def simulation_trades_export(request, export_format):
+    # The whole trade history as CSV or NDJSON, streamed in chunks so the
+    # response never holds more than one chunk of text.
+    job, result = current_simulation(request)
+    if job is None:
+        return HttpResponse("Run a simulation first.", status=404, content_type="text/plain")
+    if result is None:
+        return JsonResponse(job.to_dict(), status=job_status_code(job))
+    history = result[2]
+    if export_format == "csv":
+        response = StreamingHttpResponse(history.iter_csv(), content_type="text/csv")
+    else:
+        response = StreamingHttpResponse(history.iter_ndjson(), content_type="application/x-ndjson")
+    response["Content-Disposition"] = f'attachment; filename="trades.{export_format}"'
+    return response
+
+
+@api_view(["POST"])
+@permission_classes([StaffForRefreshJobs])
+def jobs_api(request):
+    # POST {"kind": "simulation"} (the session's portfolio) or, for staff,
+    # {"kind": "refresh", "shard": "i/N", "symbols": [...], "full": false}
+    # with tracked symbols only. Answers 202 with the queued job; poll its
+    # url for progress.
+    serializer = JobRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+
+    if data["kind"] == "simulation":
+        # Only the session's own portfolio can be simulated.
+        portfolio_id = request.session.get("portfolio_id")
+        if portfolio_id is None or not Portfolio.objects.filter(pk=portfolio_id).exists():
+            return Response({"detail": "Create a portfolio first."}, status=status.HTTP_404_NOT_FOUND)
+        if data.get("portfolio_id", portfolio_id) != portfolio_id:
+            return Response({"detail": "You can only simulate your own portfolio."}, status=status.HTTP_403_FORBIDDEN)
+        job = submit_simulation(portfolio_id)
+    else:
+        job = submit_job("refresh", {"shard": data["shard"], "symbols": data.get("symbols"), "full": data["full"]})
+
+    url = reverse("job_status_api", args=[job.pk])
+    return Response({**job.to_dict(), "url": url}, status=status.HTTP_202_ACCEPTED, headers={"Location": url})
+
+
+@api_view(["GET"])
+def job_status_api(request, pk):
+    job = visible_job(request, pk)
+    if job is None:
+        return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(job.to_dict())
+
+
+@api_view(["GET"])
+def job_result_api(request, pk):
+    # The job's result once it is done; 202 with its status until then.
+    job = visible_job(request, pk)
+    if job is None:
+        return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+    if job.state != Job.DONE:
+        return Response(job.to_dict(), status=job_status_code(job))
+    result = dict(job.result)
+    if job.kind == "simulation":
+        result["trades_url"] = f"{reverse('simulation_trades_api')}?job={job.pk}"
+    return Response(result)
+
+
+
+@api_view(["GET", "POST"])
+@permission_classes([OwnPortfoliosOnly])
+def portfolio_valuation_api(request):
+    # GET ?ids=1,2,3 values stored portfolios;
+    # POST {"portfolio_ids": [...], "portfolios": [{"stocks": [...]}, ...]}
+    # values stored and inline portfolios together in one pass. Stored
+    # portfolios must be the session's own (OwnPortfoliosOnly), and one
+    # request values at most VALUATION_MAX_PORTFOLIOS.
+    if request.method == "GET":
+        ids = request.query_params.get("ids")
+        if not ids:
+            return Response({"detail": "ids is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            portfolio_ids = [int(pk) for pk in ids.split(",")]
+        except ValueError:
+            return Response({"detail": "ids must be a comma-separated list of integers."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(portfolio_ids) > settings.VALUATION_MAX_PORTFOLIOS:
+            return Response({"detail": f"At most {settings.VALUATION_MAX_PORTFOLIOS} ids per request."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        portfolios = load_portfolios(portfolio_ids)
+    else:
+        serializer = ValuationRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        portfolio_ids = serializer.validated_data.get("portfolio_ids")
+        portfolios = load_portfolios(portfolio_ids) if portfolio_ids else []
+        portfolios.extend(serializer.validated_data.get("portfolios", []))
+
+    results = value_portfolios(portfolios)
+    return Response(ValuationSerializer(results, many=True).data)